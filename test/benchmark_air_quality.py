@@ -0,0 +1,67 @@
+import json
+import time
+import random
+
+from weather_advisor_agent.utils.air_quality import summarize_air_quality, summarize_air_quality_batch, WHO_THRESHOLDS
+
+HOURS = 168
+LOCATIONS = [1, 10, 50, 200]
+REPEATS = 20
+
+def _series(hours: int):
+  base = random.uniform(5, 60)
+  return [round(max(0.0, base + random.gauss(0, 8)), 1) for _ in range(hours)]
+
+def _python_summary(pm10, pm2_5, start):
+  """Plain-Python reduction of one location, what we would do without NumPy"""
+  summary = {}
+  for pollutant, values in (("pm10", pm10), ("pm2_5", pm2_5)):
+    next_24h = [v for v in values[start:start + 24] if v is not None]
+    next_6h = next_24h[:6]
+    summary[pollutant] = {
+      "current": next_24h[0] if next_24h else None,
+      "next_6h": {"max": max(next_6h), "mean": sum(next_6h) / len(next_6h)},
+      "next_24h": {"max": max(next_24h), "mean": sum(next_24h) / len(next_24h)},
+      "hours_above_who_24h": sum(v > WHO_THRESHOLDS[pollutant] for v in next_24h)
+    }
+  windows = []
+  for offset in range(22):
+    a = pm2_5[start + offset:start + offset + 3]
+    b = pm10[start + offset:start + offset + 3]
+    windows.append((max(sum(a) / len(a) / WHO_THRESHOLDS["pm2_5"], sum(b) / len(b) / WHO_THRESHOLDS["pm10"]), offset))
+  summary["worst_window"] = max(windows)[1]
+  return summary
+
+def _timed(fn):
+  start = time.perf_counter()
+  for _ in range(REPEATS):
+    fn()
+  return (time.perf_counter() - start) / REPEATS * 1000
+
+def main():
+  random.seed(7)
+  print(f"{'N':>5} | {'raw tokens':>10} | {'summary tokens':>14} | {'python ms':>9} | {'loop ms':>8} | {'batch ms':>8}")
+  print("-" * 70)
+
+  for n in LOCATIONS:
+    pm10 = [_series(HOURS) for _ in range(n)]
+    pm2_5 = [_series(HOURS) for _ in range(n)]
+    starts = [random.randint(0, 23) for _ in range(n)]
+
+    raw = [{"hourly": {"pm10": a, "pm2_5": b}} for a, b in zip(pm10, pm2_5)]
+    summaries = summarize_air_quality_batch(pm10, pm2_5, starts)
+    raw_tokens = len(json.dumps(raw)) // 4
+    summary_tokens = len(json.dumps(summaries)) // 4
+
+    python_ms = _timed(lambda: [_python_summary(a, b, s) for a, b, s in zip(pm10, pm2_5, starts)])
+    loop_ms = _timed(lambda: [summarize_air_quality(a, b, s) for a, b, s in zip(pm10, pm2_5, starts)])
+    batch_ms = _timed(lambda: summarize_air_quality_batch(pm10, pm2_5, starts))
+
+    print(f"{n:>5} | {raw_tokens:>10} | {summary_tokens:>14} | {python_ms:>9.3f} | {loop_ms:>8.3f} | {batch_ms:>8.3f}")
+
+  print("\nraw tokens: hourly lists that used to reach the prompt, summary tokens: what Aether reads now (bytes/4).")
+  print("python: plain loops over each location, loop: one NumPy call per location, batch: one N x H pass.")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,87 @@
+import os
+import sys
+import json
+import time
+
+from weather_advisor_agent.config import TheophrastusConfiguration
+from weather_advisor_agent.utils.gazetteer import Theophrastus_Gazetteer
+from weather_advisor_agent.utils.entity_extractor import extract_entities
+
+REPEATS = 50
+
+# Queries of test/test_agent_evaluation.py with the place / activity a correct extraction returns
+# ("known" = the message points at the location options already in state)
+CASES = [
+  ("I love swimming and camping. Can you remember that for me?", None, "swimming"),
+  ("What outdoor activities do I enjoy?", None, None),
+  ("How is the weather in my city Guadalajara, Jalisco?", "Guadalajara", None),
+  ("I want to go see the auroras borealis this weekend near Stockholm. What are some good locations?", "Stockholm", "stargazing"),
+  ("What is the weather like in those locations?", "known", None),
+  ("Generate a recommendations report.", None, None)
+]
+
+LLM_PROMPT = """Extract the place and the one-word outdoor activity from the user message.
+Answer with JSON only: {"place": string or null, "activity": string or null, "refers_to_known_locations": boolean}.
+User message: """
+
+def _local(query: str):
+  entities = extract_entities(query)
+  place = "known" if entities.refers_to_known_locations and not entities.place else (entities.place or {}).get("name")
+  return place, entities.activity
+
+def _llm(client, query: str):
+  response = client.models.generate_content(model=TheophrastusConfiguration.worker_model, contents=LLM_PROMPT + query)
+  text = (response.text or "").strip().removeprefix("```json").removeprefix("```").removesuffix("```")
+  data = json.loads(text)
+  place = "known" if data.get("refers_to_known_locations") and not data.get("place") else data.get("place")
+  return place, data.get("activity")
+
+def _matches(got, expected_place, expected_activity):
+  place, activity = got
+  place_ok = (place or None) == expected_place or (place and expected_place and expected_place.lower() in place.lower())
+  activity_ok = (activity or None) == expected_activity or (activity and expected_activity and expected_activity in activity.lower())
+  return bool(place_ok), bool(activity_ok)
+
+def _report(label: str, results, latencies):
+  places = sum(r[0] for r in results)
+  activities = sum(r[1] for r in results)
+  avg_ms = sum(latencies) / len(latencies)
+  print(f"{label:>6} | place {places}/{len(results)} | activity {activities}/{len(results)} | avg {avg_ms:9.3f} ms | max {max(latencies):9.3f} ms")
+
+def main():
+  if not Theophrastus_Gazetteer.available():
+    print(f"No gazetteer index at {TheophrastusConfiguration.gazetteer_index_path}, places cannot be resolved locally (see README).")
+
+  results, latencies = [], []
+  for query, place, activity in CASES:
+    got = _local(query)
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+      _local(query)
+    latencies.append((time.perf_counter() - start) / REPEATS * 1000)
+    results.append(_matches(got, place, activity))
+    print(f"  local  {str(got):<40} {query[:60]}")
+  _report("local", results, latencies)
+
+  if not os.environ.get("GOOGLE_API_KEY"):
+    print("GOOGLE_API_KEY not set, LLM extraction skipped.")
+    return
+
+  from google import genai
+  client = genai.Client()
+  results, latencies = [], []
+  for query, place, activity in CASES:
+    start = time.perf_counter()
+    try:
+      got = _llm(client, query)
+    except Exception as e:
+      print(f"  llm    failed ({type(e).__name__}) {query[:60]}", file=sys.stderr)
+      got = (None, None)
+    latencies.append((time.perf_counter() - start) * 1000)
+    results.append(_matches(got, place, activity))
+    print(f"  llm    {str(got):<40} {query[:60]}")
+  _report("llm", results, latencies)
+
+
+if __name__ == "__main__":
+  main()
@@ -11,6 +11,7 @@ from weather_advisor_agent.agent import root_agent
 from weather_advisor_agent.utils import Theophrastus_Observability
 from weather_advisor_agent.utils import TheophrastusEvaluator
 from weather_advisor_agent.utils import session_cache
+from weather_advisor_agent.utils import Theophrastus_SnapshotPrefetcher
 
 DATA_DIR = Path("weather_advisor_agent/data")
 DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -103,6 +104,7 @@ async def main():
     print(f"{'='*80}")
     
     last_user_facing_text = None
+    first_chunk_time = None
     start_time = time.time()
 
     captured_session_state = None
@@ -122,6 +124,10 @@ async def main():
           parts=[genai_types.Part.from_text(text=query)]
         )
       ):
+        if getattr(event, "partial", False) and event.content and event.content.parts:
+          if first_chunk_time is None:
+            first_chunk_time = time.time()
+          continue
         if not event.is_final_response():
           continue 
         content = getattr(event, "content", None)
@@ -156,6 +162,8 @@ async def main():
     print(f"\n{"="*80}\n")
     
     print(f"Response time: {duration:.2f} seconds")
+    if first_chunk_time is not None:
+      print(f"First streamed chunk: {first_chunk_time - start_time:.2f} seconds")
     
     evaluation_state = session_cache.get_evaluation_data(SESSION_ID)
     
@@ -196,6 +204,9 @@ async def main():
       print(f"  Average Score: {cat_stats['avg_score']:.1%}.")
       print(f"  Pass Rate: {cat_stats['pass_rate']:.1%}.")
   
+  # The test session ends here, drop any speculative fetch still pending
+  Theophrastus_SnapshotPrefetcher.cancel_session(SESSION_ID)
+  
   print("\n" + "="*80)
   print("OBSERVABILITY DATA")
   print("="*80 + "\n")
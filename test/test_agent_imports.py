@@ -0,0 +1,36 @@
+import importlib
+from importlib import metadata
+from pathlib import Path
+
+import pytest
+
+REQUIREMENTS = Path(__file__).resolve().parent.parent / "requirements.txt"
+AGENT_MODULES = [
+  "weather_advisor_agent.sub_agents.zephyr_env_data_agent",
+  "weather_advisor_agent.sub_agents.aether_env_risk_agent",
+  "weather_advisor_agent.sub_agents.aurora_env_advice_writer",
+  "weather_advisor_agent.sub_agents.atlas_env_location_agent",
+  "weather_advisor_agent.agent"
+]
+
+def _pinned_adk_version() -> str:
+  for line in REQUIREMENTS.read_text().splitlines():
+    if line.startswith("google-adk=="):
+      return line.split("==", 1)[1].strip()
+  raise AssertionError("google-adk is not pinned in requirements.txt")
+
+def test_agents_import_against_pinned_adk():
+  """The agents are pydantic models, a callback field the pinned ADK lacks fails at import time"""
+  pinned = _pinned_adk_version()
+  try:
+    installed = metadata.version("google-adk")
+  except metadata.PackageNotFoundError:
+    pytest.skip("google-adk is not installed")
+  if installed != pinned:
+    pytest.skip(f"google-adk {installed} installed, {pinned} pinned")
+
+  from google.adk.agents import BaseAgent
+  for name in AGENT_MODULES:
+    importlib.import_module(name)
+  root_agent = importlib.import_module("weather_advisor_agent.agent").root_agent
+  assert isinstance(root_agent, BaseAgent)
@@ -0,0 +1,52 @@
+import sys
+
+import httpx
+
+from weather_advisor_agent.config import TheophrastusConfiguration
+from weather_advisor_agent.tools import geocode_place_name
+from weather_advisor_agent.utils import Theophrastus_HttpClient
+from weather_advisor_agent.utils.gazetteer import TheophrastusGazetteer, build_index
+from weather_advisor_agent.utils.geocode_cache import TheophrastusGeocodeCache
+
+web_access_tools = sys.modules["weather_advisor_agent.tools.web_access_tools"]
+
+# GeoNames main dump rows: a town named like the first words of a longer place, and a volcano
+DUMP_ROWS = [
+  ["3520000", "San Pedro", "San Pedro", "", "19.5", "-97.5", "P", "PPL", "MX", "", "21", "", "", "", "1200"],
+  ["3521000", "Pico de Orizaba", "Pico de Orizaba", "Citlaltepetl", "19.03", "-97.27", "T", "VLC", "MX", "", "30", "", "", "", "0"]
+]
+
+def _gazetteer(tmp_path) -> TheophrastusGazetteer:
+  dump = tmp_path / "dump.txt"
+  dump.write_text("".join("\t".join(row + ["", "", "", ""]) + "\n" for row in DUMP_ROWS), encoding="utf-8")
+  index = tmp_path / "gazetteer.sqlite"
+  build_index(str(dump), str(index))
+  return TheophrastusGazetteer(str(index), 0, 0.3, 0.9)
+
+def test_truncated_names_are_left_to_the_api(tmp_path, monkeypatch):
+  requests = []
+  def handler(request: httpx.Request) -> httpx.Response:
+    requests.append(request.url.params["name"])
+    if request.url.params["name"] == "San Pedro Martir":
+      return httpx.Response(200, json={"results": [
+        {"name": "Sierra de San Pedro Martir", "latitude": 30.98, "longitude": -115.46, "country": "Mexico", "admin1": "Baja California", "population": 0}
+      ]})
+    return httpx.Response(200, json={})
+
+  monkeypatch.setattr(TheophrastusConfiguration, "gazetteer_enabled", True)
+  monkeypatch.setattr(web_access_tools, "Theophrastus_Gazetteer", _gazetteer(tmp_path))
+  monkeypatch.setattr(web_access_tools, "Theophrastus_GeocodeCache", TheophrastusGeocodeCache(str(tmp_path / "geocode.sqlite"), 3600, 3600, 100))
+  monkeypatch.setattr(Theophrastus_HttpClient, "_client", httpx.Client(transport=httpx.MockTransport(handler)))
+
+  # "San Pedro" is an exact gazetteer hit for a truncation only, the full name goes to the API
+  out = geocode_place_name("San Pedro Martir", max_results=1)
+  assert out["source"] != "offline_gazetteer"
+  assert "San Pedro Martir" in requests
+  assert (out["results"][0]["latitude"], out["results"][0]["longitude"]) == (30.98, -115.46)
+
+  # The name without its suffix is still answered offline
+  requests.clear()
+  out = geocode_place_name("Pico de Orizaba Volcano", max_results=1)
+  assert out["source"] == "offline_gazetteer"
+  assert out["query"] == "Pico de Orizaba"
+  assert requests == []
@@ -0,0 +1,66 @@
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import httpx
+
+import weather_advisor_agent.sub_agents  # noqa: F401 (registers the agent modules in sys.modules)
+from weather_advisor_agent.config import TheophrastusConfiguration
+from weather_advisor_agent.utils import Theophrastus_HttpClient
+from weather_advisor_agent.utils.geocode_cache import TheophrastusGeocodeCache
+from weather_advisor_agent.utils.validation_checkers import EnvLocationGeoValidationChecker
+
+atlas = sys.modules["weather_advisor_agent.sub_agents.atlas_env_location_agent"]
+web_access_tools = sys.modules["weather_advisor_agent.tools.web_access_tools"]
+
+# Atlas-Geocoder output: one location geocoded, one kept with null coordinates
+GEOCODER_OUTPUT = [
+  {"name": "Desierto de los Leones", "latitude": 19.29, "longitude": -99.31, "country": "Mexico", "admin1": "Mexico City", "activity": "hiking", "source": "discovery+geocode"},
+  {"name": "Nevado de Toluca", "latitude": None, "longitude": None, "region_hint": "State of Mexico", "activity": "hiking", "source": "discovery+geocode"}
+]
+
+def _geocoding_handler(requests):
+  async def handler(request: httpx.Request) -> httpx.Response:
+    requests.append(request.url.params["name"])
+    return httpx.Response(200, json={"results": [
+      {"name": "Nevado de Toluca", "latitude": 19.108, "longitude": -99.758, "country": "Mexico", "admin1": "State of Mexico", "population": 0}
+    ]})
+  return handler
+
+async def _run(agent, context):
+  """Runs one agent and applies its state deltas the way the runner does"""
+  events = []
+  async for event in agent._run_async_impl(context):
+    context.session.state.update(event.actions.state_delta or {})
+    events.append(event)
+  return events
+
+async def _location_loop(requests):
+  Theophrastus_HttpClient._async_clients[asyncio.get_running_loop()] = httpx.AsyncClient(transport=httpx.MockTransport(_geocoding_handler(requests)))
+  session = SimpleNamespace(id="retry_session", state={"env_location_options": list(GEOCODER_OUTPUT)})
+  context = SimpleNamespace(invocation_id="e-retry", session=session)
+  checker = EnvLocationGeoValidationChecker(name="location_geo_validation_agent")
+  try:
+    first = await _run(checker, context)
+    await _run(atlas.atlas_env_location_stage, context)
+    second = await _run(checker, context)
+  finally:
+    await Theophrastus_HttpClient.aclose()
+  return first, second, session.state
+
+def test_partially_failed_geocode_is_retried(tmp_path, monkeypatch):
+  monkeypatch.setattr(TheophrastusConfiguration, "gazetteer_enabled", False)
+  monkeypatch.setattr(web_access_tools, "Theophrastus_GeocodeCache", TheophrastusGeocodeCache(str(tmp_path / "geocode.sqlite"), 3600, 3600, 100))
+  requests = []
+
+  first, second, state = asyncio.run(_location_loop(requests))
+
+  # The first pass keeps the geocoded option and asks for another iteration for the other one only
+  assert not first[-1].actions.escalate
+  assert [item["name"] for item in first[-1].actions.state_delta["env_location_failures"]["items"]] == ["Nevado de Toluca"]
+  assert requests and all("Desierto" not in name for name in requests)
+  # The retry geocoded it without rerunning discovery, and the loop now ends
+  assert second[-1].actions.escalate
+  assert state["env_location_failures"]["items"] == []
+  names = {loc["name"]: (loc["latitude"], loc["longitude"]) for loc in state["env_location_options"]}
+  assert names == {"Desierto de los Leones": (19.29, -99.31), "Nevado de Toluca": (19.108, -99.758)}
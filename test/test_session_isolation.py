@@ -0,0 +1,73 @@
+import json
+import uuid
+import random
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import httpx
+
+from weather_advisor_agent.tools import fetch_and_store_snapshot_async, fetch_and_store_snapshots_batch_async
+from weather_advisor_agent.sub_agents.zephyr_env_data_agent import zephyr_data_callback
+from weather_advisor_agent.utils import (Theophrastus_HttpClient,
+  Theophrastus_SnapshotCache,
+  Theophrastus_SnapshotRegistry
+)
+
+SESSIONS = 100
+
+def _open_meteo_handler():
+  """Fake Open-Meteo answering with the requested latitude as temperature, after a random delay"""
+  async def handler(request: httpx.Request) -> httpx.Response:
+    await asyncio.sleep(random.uniform(0.0, 0.05))
+    latitudes = [float(v) for v in request.url.params["latitude"].split(",")]
+    payloads = [{
+      "current": {"temperature_2m": lat, "apparent_temperature": lat, "relative_humidity_2m": 50, "wind_speed_10m": 1.0},
+      "hourly": {"pm10": [10.0], "pm2_5": [5.0]}
+    } for lat in latitudes]
+    return httpx.Response(200, json=payloads[0] if len(payloads) == 1 else payloads)
+  return handler
+
+async def _run_session(index: int):
+  """One session turn: Zephyr fetches one or two locations, then its after_agent_callback runs"""
+  invocation_id = f"e-{uuid.uuid4()}"
+  session = SimpleNamespace(id=f"session_{index}", state={})
+  tool_context = SimpleNamespace(invocation_id=invocation_id, state=session.state)
+  latitudes = [-60.0 + index]
+
+  if index % 2:
+    await fetch_and_store_snapshot_async(tool_context, latitudes[0], 10.0)
+  else:
+    latitudes.append(latitudes[0] + 0.5)
+    await fetch_and_store_snapshots_batch_async(tool_context, latitudes, [10.0, 10.0], [f"A{index}", f"B{index}"])
+
+  await asyncio.sleep(random.uniform(0.0, 0.02))
+  zephyr_data_callback(SimpleNamespace(invocation_id=invocation_id, session=session, state=session.state))
+  return latitudes, session.state
+
+async def main():
+  logging.basicConfig(level=logging.WARNING)
+  Theophrastus_SnapshotCache.clear()
+  Theophrastus_HttpClient._async_clients[asyncio.get_running_loop()] = httpx.AsyncClient(transport=httpx.MockTransport(_open_meteo_handler()))
+
+  results = await asyncio.gather(*(_run_session(i) for i in range(SESSIONS)))
+
+  leaked = 0
+  for latitudes, state in results:
+    stored = json.loads(state["env_snapshot"])
+    snapshots = stored if isinstance(stored, list) else [stored]
+    temperatures = [s["current"]["temperature_c"] for s in snapshots]
+    if sorted(temperatures) != sorted(latitudes):
+      leaked += 1
+
+  print(f"{SESSIONS} concurrent sessions, {leaked} got another session's data, {Theophrastus_SnapshotRegistry.pending_invocations()} unclaimed invocations")
+  await Theophrastus_HttpClient.aclose()
+  return leaked
+
+def test_concurrent_sessions_get_their_own_snapshots():
+  assert asyncio.run(main()) == 0
+  assert Theophrastus_SnapshotRegistry.pending_invocations() == 0
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
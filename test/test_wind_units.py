@@ -0,0 +1,65 @@
+import asyncio
+
+import httpx
+
+from weather_advisor_agent.tools import fetch_env_snapshot_from_open_meteo_async, fetch_env_snapshots_batch_async
+from weather_advisor_agent.utils import Theophrastus_HttpClient, Theophrastus_SnapshotCache
+from weather_advisor_agent.utils.risk_engine import build_risk_report
+
+WIND_MS = 12.0
+
+def _open_meteo_payload(latitude: float, longitude: float, wind_unit: str) -> dict:
+  """Forecast answer as Open-Meteo sends it, wind in the requested unit (km/h unless asked otherwise)"""
+  wind = WIND_MS if wind_unit == "ms" else round(WIND_MS * 3.6, 1)
+  times = [f"2026-10-18T{h:02d}:00" for h in range(24)]
+  return {
+    "latitude": latitude,
+    "longitude": longitude,
+    "generationtime_ms": 0.08,
+    "utc_offset_seconds": -21600,
+    "timezone": "America/Mexico_City",
+    "timezone_abbreviation": "GMT-6",
+    "elevation": 2135.0,
+    "current_units": {
+      "time": "iso8601",
+      "interval": "seconds",
+      "temperature_2m": "°C",
+      "apparent_temperature": "°C",
+      "relative_humidity_2m": "%",
+      "wind_speed_10m": "m/s" if wind_unit == "ms" else "km/h"
+    },
+    "current": {
+      "time": "2026-10-18T12:00",
+      "interval": 900,
+      "temperature_2m": 21.4,
+      "apparent_temperature": 19.8,
+      "relative_humidity_2m": 48,
+      "wind_speed_10m": wind
+    },
+    "hourly_units": {"time": "iso8601", "pm10": "μg/m³", "pm2_5": "μg/m³"},
+    "hourly": {"time": times, "pm10": [20.0] * 24, "pm2_5": [8.0] * 24}
+  }
+
+async def _handler(request: httpx.Request) -> httpx.Response:
+  params = request.url.params
+  unit = params.get("wind_speed_unit", "kmh")
+  coordinates = list(zip(params["latitude"].split(","), params["longitude"].split(",")))
+  payloads = [_open_meteo_payload(float(lat), float(lon), unit) for lat, lon in coordinates]
+  return httpx.Response(200, json=payloads[0] if len(payloads) == 1 else payloads)
+
+async def _fetch():
+  Theophrastus_SnapshotCache.clear()
+  Theophrastus_HttpClient._async_clients[asyncio.get_running_loop()] = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+  try:
+    single = await fetch_env_snapshot_from_open_meteo_async(19.04, -98.2)
+    batch = await fetch_env_snapshots_batch_async([45.0, 46.0], [7.0, 8.0], ["A", "B"])
+  finally:
+    await Theophrastus_HttpClient.aclose()
+  return [single] + batch
+
+def test_wind_speed_is_requested_and_classified_in_ms():
+  snapshots = asyncio.run(_fetch())
+  for snapshot in snapshots:
+    assert snapshot["current"]["wind_speed_10m_ms"] == WIND_MS
+  # 12 m/s is moderate on the default [10, 17] m/s bounds, the km/h value (43.2) would be high
+  assert build_risk_report(snapshots[0])["wind_risk"] == "moderate"
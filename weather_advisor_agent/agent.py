@@ -1,11 +1,16 @@
 import json
+import time
 import logging
 import datetime
 
+from typing import AsyncGenerator
+
 from google.genai.types import Content, Part
 from google.adk.tools import FunctionTool
-from google.adk.agents import LlmAgent
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.events import Event, EventActions
 from google.adk.models.google_llm import Gemini
+from google.adk.agents.invocation_context import InvocationContext
 
 from weather_advisor_agent.config import TheophrastusConfiguration
 
@@ -14,6 +19,13 @@ from weather_advisor_agent.sub_agents import (robust_env_data_agent,
   robust_env_location_agent
 )
 
+from weather_advisor_agent.utils import Theophrastus_HttpClient, Theophrastus_Observability, Theophrastus_CacheWarmer
+from weather_advisor_agent.utils.intent_router import Theophrastus_IntentRouter, LOCATION_SEARCH
+from weather_advisor_agent.utils.entity_extractor import extract_entities, place_candidates
+from weather_advisor_agent.utils.cache_warmer import cache_warmer_seed_callback, QUERY_INTEREST
+from weather_advisor_agent.utils.snapshot_prefetcher import prefetch_after_turn_callback
+from weather_advisor_agent.utils.model_call_metrics import model_metrics_before_model, model_metrics_after_model
+
 from weather_advisor_agent.tools import (save_env_report_to_file,
   store_user_preference,
   get_user_preferences,
@@ -22,11 +34,20 @@ from weather_advisor_agent.tools import (save_env_report_to_file,
   search_query_history,
   store_favorite_location,
   get_favorite_locations,
-  remove_favorite_location
+  remove_favorite_location,
+  prefetch_env_snapshot,
+  resolve_place_coordinates
 )
+from weather_advisor_agent.tools.memory_tools import append_query_history
 
 logger = logging.getLogger(__name__)
 
+if TheophrastusConfiguration.http_warmup_on_start:
+  Theophrastus_HttpClient.warm_up()
+
+if TheophrastusConfiguration.cache_warmer_enabled:
+  Theophrastus_CacheWarmer.start(resolve_place_coordinates, prefetch_env_snapshot)
+
 def Theophrastus_root_callback(*args, **kwargs):
   snapshot = {}
   ctx = kwargs.get("callback_context")
@@ -71,7 +92,7 @@ def Theophrastus_root_callback(*args, **kwargs):
 
   return None
 
-root_agent = LlmAgent(
+envi_llm_root_agent = LlmAgent(
   name="envi_root_agent",
   model=Gemini(model=TheophrastusConfiguration.worker_model,retry_options=TheophrastusConfiguration.retry_config),
   description="Interactive environmental intelligence assistant.",
@@ -191,5 +212,61 @@ root_agent = LlmAgent(
     FunctionTool(get_favorite_locations),
     FunctionTool(remove_favorite_location)
   ],
-  after_agent_callback=Theophrastus_root_callback
-)
\ No newline at end of file
+  before_model_callback=model_metrics_before_model,
+  after_model_callback=model_metrics_after_model,
+  before_agent_callback=None if TheophrastusConfiguration.intent_router_enabled else cache_warmer_seed_callback,
+  after_agent_callback=None if TheophrastusConfiguration.intent_router_enabled else [prefetch_after_turn_callback, Theophrastus_root_callback]
+)
+
+def _user_message(context: InvocationContext) -> str:
+  content = getattr(context, "user_content", None)
+  if content is None or not content.parts:
+    return ""
+  return " ".join(part.text for part in content.parts if getattr(part, "text", None))
+
+class TheophrastusRouterAgent(BaseAgent):
+  """Local intent router in front of the LLM root: confident turns go straight to their pipeline."""
+  async def _run_async_impl(self, context: InvocationContext) -> AsyncGenerator[Event, None]:
+    start_time = time.time()
+    llm_root = self.sub_agents[0]
+    message = _user_message(context)
+    state_delta = {"last_user_message": message}
+
+    decision = Theophrastus_IntentRouter.classify(message)
+    Theophrastus_Observability.log_intent_route(decision.intent, decision.confidence, decision.dispatch)
+    logger.info(f"Intent router: {decision.intent} ({decision.confidence:.2f}) in {(time.time() - start_time) * 1000:.3f} ms, rules={decision.rule_scores}")
+
+    if decision.dispatch and decision.intent != LOCATION_SEARCH:
+      # The LLM root calls add_to_query_history after a weather answer, direct dispatch skips it
+      entities = extract_entities(message)
+      place = (entities.place or {}).get("name") or next((text for text, _ in place_candidates(message)), None)
+      if place:
+        state_delta["user:query_history"] = append_query_history(context.session.state.get("user:query_history"), place, entities.activity)
+        Theophrastus_CacheWarmer.record_interest(place, QUERY_INTEREST)
+
+    yield Event(author=self.name, actions=EventActions(state_delta=state_delta))
+
+    if not decision.dispatch:
+      async for event in llm_root.run_async(context):
+        yield event
+      return
+
+    if decision.intent == LOCATION_SEARCH:
+      pipeline = [llm_root.find_sub_agent("robust_env_location_agent")]
+    else:
+      pipeline = [llm_root.find_sub_agent("robust_env_data_agent"), llm_root.find_sub_agent("robust_env_risk_agent")]
+
+    for agent in pipeline:
+      async for event in agent.run_async(context):
+        yield event
+
+if TheophrastusConfiguration.intent_router_enabled:
+  root_agent = TheophrastusRouterAgent(
+    name="theophrastus_router",
+    description="Routes each turn to the location search or the data -> risk -> advice chain, the LLM root handles the rest.",
+    sub_agents=[envi_llm_root_agent],
+    before_agent_callback=cache_warmer_seed_callback,
+    after_agent_callback=[prefetch_after_turn_callback, Theophrastus_root_callback]
+  )
+else:
+  root_agent = envi_llm_root_agent
\ No newline at end of file
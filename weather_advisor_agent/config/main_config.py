@@ -36,4 +36,94 @@ class TheophrastusConfiguration:
   default_location_name: str = "Ciudad de México, México"
   
   enable_tracing: bool = True
-  log_level: str = "INFO"
\ No newline at end of file
+  log_level: str = "INFO"
+
+  geocode_cache_path: str = "weather_advisor_agent/data/geocode_cache.sqlite"
+  geocode_cache_ttl_seconds: int = 7 * 24 * 3600
+  geocode_cache_negative_ttl_seconds: int = 6 * 3600
+  geocode_cache_max_entries: int = 5000
+  geocode_concurrent_candidates: bool = False
+  geocode_max_concurrency: int = 4
+
+  http_pool_max_connections: int = 20
+  http_pool_max_keepalive: int = 10
+  http_keepalive_expiry_seconds: float = 30.0
+  http_connect_timeout_seconds: float = 5.0
+  http_enable_http2: bool = False
+  http_warmup_on_start: bool = False
+  geocode_timeout_seconds: float = 20.0
+  forecast_timeout_seconds: float = 10.0
+  forecast_batch_chunk_size: int = 50
+  parallel_fetch_max_concurrency: int = 4
+  # Speculative snapshot fetch of the validated location options, off by default
+  snapshot_prefetch_enabled: bool = False
+  snapshot_prefetch_max_per_session: int = 8
+
+  snapshot_cache_grid_degrees: float = 0.05
+  snapshot_cache_max_bytes: int = 64 * 1024 * 1024
+  forecast_model_update_interval_minutes: int = 60
+  forecast_model_update_offset_minutes: int = 10
+  snapshot_stale_while_revalidate: bool = True
+  snapshot_stale_window_seconds: int = 900
+  snapshot_refresh_workers: int = 2
+  # Background warming of the most favorited / queried locations, off by default
+  cache_warmer_enabled: bool = False
+  cache_warmer_max_locations: int = 20
+  cache_warmer_request_budget: int = 30
+  cache_warmer_delay_seconds: int = 60
+  snapshot_registry_max_invocations: int = 1000
+  raw_payload_store_max_entries: int = 256
+
+  air_quality_worst_window_hours: int = 3
+
+  gazetteer_enabled: bool = True
+  gazetteer_index_path: str = "weather_advisor_agent/data/gazetteer.sqlite"
+  gazetteer_mmap_bytes: int = 256 * 1024 * 1024
+  gazetteer_fuzzy_threshold: float = 0.72
+  gazetteer_geocode_min_similarity: float = 0.9
+
+  entity_extractor_enabled: bool = True
+  entity_extractor_min_confidence: float = 0.8
+
+  advice_template_fast_path: bool = True
+  advice_streaming_enabled: bool = True
+
+  # USD per million tokens, used for the estimated cost of each model call (thinking tokens count as output)
+  model_pricing_usd_per_million = {
+    "gemini-2.5-pro": {"input": 1.25, "output": 10.0},
+    "gemini-2.5-flash": {"input": 0.30, "output": 2.50},
+    "gemini-2.5-flash-lite": {"input": 0.10, "output": 0.40},
+    "gemini-2.0-flash": {"input": 0.10, "output": 0.40},
+    "gemini-2.0-flash-lite": {"input": 0.075, "output": 0.30}
+  }
+
+  llm_cache_enabled: bool = False
+  llm_cache_path: str = "weather_advisor_agent/data/llm_cache.sqlite"
+  llm_cache_ttl_seconds: int = 3600
+  llm_cache_max_entries: int = 2000
+  # Agents whose answers are cached -> state keys their instruction reads (part of the key)
+  llm_cache_agents = {
+    "aether_env_risk_agent": ["env_snapshot", "env_activity_profile"],
+    "aether_env_rationale_agent": ["env_snapshot", "env_risk_report", "env_activity_profile"],
+    "aurora_env_advice_writer": ["env_snapshot", "env_risk_report", "env_activity_profile", "env_location_options", "env_snapshot_errors"]
+  }
+  # Agents whose answer also depends on the wording of the user message
+  llm_cache_message_agents = ["aurora_env_advice_writer"]
+
+  intent_router_enabled: bool = True
+  intent_router_min_confidence: float = 0.75
+
+  risk_engine_enabled: bool = True
+  risk_llm_rationale: bool = False
+  risk_rationale_model: str = "gemini-2.0-flash-lite"
+  # [moderate, high] bounds per activity; heat/cold use the apparent temperature, cold triggers at or below
+  risk_thresholds = {
+    "default": {"heat_c": [32, 38], "cold_c": [5, -5], "wind_ms": [10, 17], "pm2_5": [15, 35], "pm10": [45, 100]},
+    "hiking": {"heat_c": [30, 36], "cold_c": [3, -8], "wind_ms": [10, 15]},
+    "running": {"heat_c": [27, 32], "cold_c": [0, -10], "wind_ms": [8, 14], "pm2_5": [12, 25], "pm10": [40, 80]},
+    "cycling": {"heat_c": [30, 35], "wind_ms": [7, 12], "pm2_5": [12, 25], "pm10": [40, 80]},
+    "camping": {"wind_ms": [9, 15]},
+    "climbing": {"heat_c": [30, 35], "wind_ms": [7, 12]},
+    "swimming": {"heat_c": [35, 40], "cold_c": [22, 18], "wind_ms": [8, 12]},
+    "kayaking": {"cold_c": [12, 5], "wind_ms": [6, 10]}
+  }
\ No newline at end of file
@@ -1,18 +1,23 @@
-from .zephyr_env_data_agent import zephyr_env_data_agent, robust_env_data_agent
-from .aether_env_risk_agent import aether_env_risk_agent, robust_env_risk_agent
-from.aurora_env_advice_writer import aurora_env_advice_writer
+from .zephyr_env_data_agent import zephyr_env_data_agent, zephyr_env_data_stage, robust_env_data_agent
+from .aether_env_risk_agent import aether_env_risk_agent, aether_env_risk_engine, robust_env_risk_agent
+from.aurora_env_advice_writer import aurora_env_advice_writer, aurora_env_advice_router
 from .atlas_env_location_agent import (
   atlas_env_location_geocode_agent,
   atlas_env_location_discovery_agent,
+  atlas_env_location_stage,
   robust_env_location_agent
 )
 __all__ = [
   "zephyr_env_data_agent",
+  "zephyr_env_data_stage",
   "robust_env_data_agent",
   "aether_env_risk_agent",
+  "aether_env_risk_engine",
   "robust_env_risk_agent",
   "aurora_env_advice_writer",
+  "aurora_env_advice_router",
   "atlas_env_location_discovery_agent",
   "atlas_env_location_geocode_agent",
+  "atlas_env_location_stage",
   "robust_env_location_agent"
 ]
@@ -1,15 +1,23 @@
 import json
+import time
 import logging
 
-from google.adk.agents import Agent, LoopAgent
+from typing import AsyncGenerator
+
+from google.adk.agents import Agent, BaseAgent, LoopAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
 
 from weather_advisor_agent.config import TheophrastusConfiguration
 
 from weather_advisor_agent.utils import Theophrastus_Observability, session_cache
+from weather_advisor_agent.utils.risk_engine import build_risk_report, resolve_activity
+from weather_advisor_agent.utils.llm_response_cache import llm_cache_before_model, llm_cache_after_model
+from weather_advisor_agent.utils.model_call_metrics import model_metrics_before_model, model_metrics_after_model
 
 from weather_advisor_agent.utils.validation_checkers import EnvRiskValidationChecker
 
-from weather_advisor_agent.sub_agents.aurora_env_advice_writer import aurora_env_advice_writer
+from weather_advisor_agent.sub_agents.aurora_env_advice_writer import aurora_env_advice_router
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +75,10 @@ aether_env_risk_agent = Agent(
   INPUT:
   - You will receive an environmental snapshot stored in the `env_snapshot`
     state key. This is your ONLY data source.
+  - Air quality comes pre-summarized under `air_quality` for `pm2_5` and `pm10` (µg/m³):
+    `current`, `next_6h` / `next_24h` max and mean, and `hours_above_who_24h` (hours over the
+    WHO 24h guideline: 15 for PM2.5, 45 for PM10). `worst_window` is the worst stretch of the
+    next 24 hours. Base air_quality_risk on these numbers (null means no data).
 
   YOUR TASK:
   - Estimate qualitative risk levels:
@@ -107,16 +119,76 @@ aether_env_risk_agent = Agent(
     in `env_snapshot`.
   """,
   output_key="env_risk_report",
+  before_model_callback=[llm_cache_before_model, model_metrics_before_model],
+  after_model_callback=[model_metrics_after_model, llm_cache_after_model],
   after_agent_callback=aether_risk_callback
 )
 
+aether_env_rationale_agent = Agent(
+  model=TheophrastusConfiguration.risk_rationale_model,
+  name="aether_env_rationale_agent",
+  description="Writes the rationale text of the rule-based risk report.",
+  instruction="""
+  You are Aether, an environmental risk analyst. The risk levels are ALREADY decided:
+
+  Risk report: {env_risk_report?}
+  Snapshot: {env_snapshot?}
+
+  Write 1-3 plain sentences explaining why the overall risk is what it is, citing the numbers
+  from the snapshot. Do NOT change any level, do NOT output JSON, do NOT address the user.
+  """,
+  output_key="env_risk_rationale",
+  before_model_callback=[llm_cache_before_model, model_metrics_before_model],
+  after_model_callback=[model_metrics_after_model, llm_cache_after_model]
+)
+
+class EnvRiskEngineAgent(BaseAgent):
+  """Rule-based replacement for Aether: classifies the snapshots without calling the critic model."""
+  async def _run_async_impl(self, context: InvocationContext) -> AsyncGenerator[Event, None]:
+    start_time = time.time()
+    Theophrastus_Observability.log_agent_start("aether_env_risk_engine", {"session_id": context.session.id})
+    state = context.session.state
+
+    snapshot = state.get("env_snapshot")
+    if isinstance(snapshot, str):
+      try:
+        snapshot = json.loads(snapshot)
+      except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse env_snapshot JSON: {e}")
+        snapshot = None
+
+    activity = resolve_activity(state.get("env_activity_profile"))
+    risk_report = build_risk_report(snapshot, activity)
+    logger.info(f"Risk engine: overall_risk={risk_report['overall_risk']} ({activity}).")
+
+    if TheophrastusConfiguration.risk_llm_rationale and self.sub_agents and risk_report["overall_risk"] != "unknown":
+      # The rationale agent reads the report from state, the runner applies this delta before it runs
+      yield Event(author=self.name, actions=EventActions(state_delta={"env_risk_report": risk_report}))
+      async for event in self.sub_agents[0].run_async(context):
+        yield event
+      rationale = state.get("env_risk_rationale")
+      if isinstance(rationale, str) and rationale.strip():
+        risk_report = {**risk_report, "rationale": rationale.strip()}
+
+    session_cache.store_evaluation_data(context.session.id, {"env_risk_report": risk_report})
+    duration_ms = (time.time() - start_time) * 1000
+    Theophrastus_Observability.log_agent_complete("aether_env_risk_engine", "env_risk_report", success=risk_report["overall_risk"] != "unknown", duration_ms=duration_ms)
+
+    yield Event(author=self.name, actions=EventActions(state_delta={"env_risk_report": risk_report}))
+
+aether_env_risk_engine = EnvRiskEngineAgent(
+  name="aether_env_risk_engine",
+  description="Classifies environmental risk with per-activity rules, the LLM only writes the rationale (optional).",
+  sub_agents=[aether_env_rationale_agent]
+)
+
 robust_env_risk_agent = LoopAgent(
   name="robust_env_risk_agent",
   description="Risk analysis pipeline that automatically generates advice",
   sub_agents=[
-    aether_env_risk_agent,
+    aether_env_risk_engine if TheophrastusConfiguration.risk_engine_enabled else aether_env_risk_agent,
     EnvRiskValidationChecker(name="env_risk_validation_checker"),
-    aurora_env_advice_writer
+    aurora_env_advice_router
   ],
   max_iterations=1
 )
\ No newline at end of file
@@ -1,16 +1,25 @@
 import json
+import time
+import asyncio
 import logging
 
-from google.adk.agents import Agent, LoopAgent
+from typing import AsyncGenerator, Dict, Any, List, Optional
+
+from google.adk.agents import Agent, BaseAgent, LoopAgent
 from google.adk.tools import FunctionTool, google_search
+from google.adk.events import Event, EventActions
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
 
 from weather_advisor_agent.config import TheophrastusConfiguration
 
-from weather_advisor_agent.tools import geocode_place_name
+from weather_advisor_agent.tools import geocode_place_name_async, prefetch_env_snapshot_async
 
-from weather_advisor_agent.utils import Theophrastus_Observability, session_cache
+from weather_advisor_agent.utils import Theophrastus_Observability, Theophrastus_SnapshotPrefetcher, session_cache
+from weather_advisor_agent.utils.entity_extractor import extract_entities, apply_entities, known_location_targets
+from weather_advisor_agent.utils.model_call_metrics import model_metrics_before_model, model_metrics_after_model
 
-from weather_advisor_agent.utils.validation_checkers import EnvLocationGeoValidationChecker
+from weather_advisor_agent.utils.validation_checkers import EnvLocationGeoValidationChecker, failed_items
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +67,15 @@ def atlas_location_callback(*args, **kwargs):
     
     return None
 
+def atlas_discovery_extract_callback(callback_context: CallbackContext):
+  """Fills env_extracted_place / env_extracted_activity before discovery runs"""
+  content = callback_context.user_content
+  message = " ".join(part.text for part in content.parts if getattr(part, "text", None)) if content and content.parts else ""
+  entities = extract_entities(message)
+  apply_entities(callback_context.state, entities)
+  logger.info(f"Extracted region={entities.place_text!r} activity={entities.activity!r} (confidence {entities.confidence}).")
+  return None
+
 atlas_env_location_geocode_agent = Agent(
   model=TheophrastusConfiguration.mapper_model,
   name="atlas_env_location_geocode_agent",
@@ -70,14 +88,14 @@ atlas_env_location_geocode_agent = Agent(
   - Each entry has: {"name": "...", "region_hint": "...", "activity": "..."}
 
   YOUR TASK:
-  For each location, call the geocode_place_name tool to obtain:
+  For each location, call the geocode_place_name_async tool to obtain:
   - latitude (float)
   - longitude (float) 
   - country (string)
   - admin1 (state/province)
 
-  IMPORTANT: Pass the "region_hint" parameter to geocode_place_name to improve accuracy.
-  Example: geocode_place_name(place_name="Golden Gate Park", region_hint="San Francisco, California")
+  IMPORTANT: Pass the "region_hint" parameter to geocode_place_name_async to improve accuracy.
+  Example: geocode_place_name_async(place_name="Golden Gate Park", region_hint="San Francisco, California")
 
   OUTPUT FORMAT (CRITICAL):
   You MUST write to `env_location_options` a valid JSON array like this:
@@ -98,16 +116,20 @@ atlas_env_location_geocode_agent = Agent(
   1. Output ONLY a valid JSON array - no markdown, no explanations, no code blocks
   2. Do NOT wrap the array in an object (don't do {"locations": [...]})
   3. Use ONLY real geocoding results - never guess coordinates
-  4. If geocoding fails for a location, skip it (don't include it in output)
+  4. If geocoding fails for a location, keep it with "latitude": null and "longitude": null and its
+     "region_hint" (it is geocoded again automatically, do not retry it yourself)
   5. Ensure latitude is between -90 and 90, longitude between -180 and 180
   6. Preserve the "activity" field from the input
-  7. ALWAYS pass region_hint to geocode_place_name for better accuracy
+  7. ALWAYS pass region_hint to geocode_place_name_async for better accuracy
 
   EXAMPLE OUTPUT:
-  [{"name": "Yosemite Valley", "latitude": 37.7455, "longitude": -119.5936, "country": "United States", "admin1": "California", "activity": "hiking", "source": "discovery+geocode"}]
+  [{"name": "Yosemite Valley", "latitude": 37.7455, "longitude": -119.5936, "country": "United States", "admin1": "California", "activity": "hiking", "source": "discovery+geocode"},
+   {"name": "Mist Trail", "latitude": null, "longitude": null, "region_hint": "Yosemite, California", "activity": "hiking", "source": "discovery+geocode"}]
   """,
-  tools=[FunctionTool(geocode_place_name)],
+  tools=[FunctionTool(geocode_place_name_async)],
   output_key="env_location_options",
+  before_model_callback=model_metrics_before_model,
+  after_model_callback=model_metrics_after_model,
   after_agent_callback=atlas_location_callback
 )
 
@@ -119,8 +141,13 @@ atlas_env_location_discovery_agent = Agent(
   instruction="""
   You are Atlas-Discovery. Your job is to discover REAL outdoor locations near the user's requested area.
 
+  PRE-EXTRACTED VALUES (may be empty):
+  - Activity: {env_extracted_activity?}
+  - Region: {env_extracted_place?}
+  When a value is present, use it as-is and do not re-extract it.
+
   IMPORTANT:
-  You MUST extract two things from the user's message:
+  Otherwise you MUST extract two things from the user's message:
   1. ACTIVITY (one word: hiking, running, cycling, climbing, etc.)
   2. REGION (a city, state, country, or place)
 
@@ -158,12 +185,86 @@ atlas_env_location_discovery_agent = Agent(
   """,
   tools=[google_search],
   output_key="env_location_options",
+  before_model_callback=model_metrics_before_model,
+  after_model_callback=model_metrics_after_model,
+  before_agent_callback=atlas_discovery_extract_callback,
   after_agent_callback=atlas_location_callback
 )
 
+def atlas_latest_locations_callback(callback_context: CallbackContext):
+  """Marks the validated options as the places written last, a follow-up turn without a place
+  ("what's the weather there?") is about them and not about an older snapshot"""
+  if known_location_targets(callback_context.state):
+    callback_context.state["env_latest_locations"] = "options"
+  return None
+
+def atlas_prefetch_callback(callback_context: CallbackContext):
+  """Starts the background snapshot fetch of the validated options, the follow-up weather turn
+  then finds them in the snapshot cache"""
+  if not TheophrastusConfiguration.snapshot_prefetch_enabled:
+    return None
+  options = known_location_targets(callback_context.state)
+  if options:
+    Theophrastus_SnapshotPrefetcher.schedule(
+      callback_context.session.id,
+      callback_context.invocation_id,
+      [(loc["latitude"], loc["longitude"]) for loc in options],
+      prefetch_env_snapshot_async
+    )
+  return None
+
+async def _geocode_failed(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+  try:
+    out = await geocode_place_name_async(item["name"], max_results=1, region_hint=item.get("region_hint"))
+  except Exception as e:
+    Theophrastus_Observability.log_error("atlas_env_location_retry", e)
+    return None
+  results = out.get("results") or []
+  if not results:
+    return None
+  best = results[0]
+  return {
+    "name": item["name"],
+    "latitude": best.get("latitude"),
+    "longitude": best.get("longitude"),
+    "country": best.get("country"),
+    "admin1": best.get("admin1"),
+    "admin2": best.get("admin2"),
+    "activity": item.get("activity"),
+    "source": "discovery+geocode_retry"
+  }
+
+class AtlasLocationStage(BaseAgent):
+  """Runs discovery -> geocode. On a retry it only geocodes the locations the validation checker
+  rejected, without running discovery (and its google_search) or the geocode model again."""
+  async def _run_async_impl(self, context: InvocationContext) -> AsyncGenerator[Event, None]:
+    start_time = time.time()
+    state = context.session.state
+    failures = failed_items(state, "env_location_failures", context.invocation_id)
+    if not failures:
+      for agent in self.sub_agents:
+        async for event in agent.run_async(context):
+          yield event
+      return
+
+    Theophrastus_Observability.log_agent_start("atlas_env_location_retry", {"session_id": context.session.id, "locations": len(failures)})
+    geocoded = [loc for loc in await asyncio.gather(*(_geocode_failed(item) for item in failures)) if loc]
+    locations: List[Dict[str, Any]] = list(state.get("env_location_options") or []) + geocoded
+    session_cache.store_evaluation_data(context.session.id, {"env_location_options": locations})
+    Theophrastus_Observability.log_agent_complete("atlas_env_location_retry", "env_location_options", success=bool(geocoded), duration_ms=(time.time() - start_time) * 1000)
+    logger.info(f"Geocoded {len(geocoded)}/{len(failures)} failed location(s) again without rerunning discovery.")
+    yield Event(author=self.name, actions=EventActions(state_delta={"env_location_options": locations}))
+
+atlas_env_location_stage = AtlasLocationStage(
+  name="atlas_env_location_stage",
+  description="Discovers and geocodes locations, on a retry geocodes only the ones that failed.",
+  sub_agents=[atlas_env_location_discovery_agent, atlas_env_location_geocode_agent]
+)
+
 robust_env_location_agent = LoopAgent(
   name="robust_env_location_agent",
   description="Runs the Atlas location pipeline: discovery → geocode → validation.",
-  sub_agents=[atlas_env_location_discovery_agent,atlas_env_location_geocode_agent,EnvLocationGeoValidationChecker(name="location_geo_validation_agent")],
-  max_iterations=2
+  sub_agents=[atlas_env_location_stage,EnvLocationGeoValidationChecker(name="location_geo_validation_agent")],
+  max_iterations=2,
+  after_agent_callback=[atlas_latest_locations_callback, atlas_prefetch_callback]
 )
\ No newline at end of file
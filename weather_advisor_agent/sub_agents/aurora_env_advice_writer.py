@@ -1,16 +1,44 @@
+import json
+import time
 import logging
+import threading
+from collections import OrderedDict
+
+from typing import AsyncGenerator, Optional
 
 from weather_advisor_agent.config import TheophrastusConfiguration
 
-from google.adk.agents import Agent
+from google.adk.agents import Agent, BaseAgent
 from google.genai.types import Content, Part
+from google.adk.events import Event, EventActions
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
 
 from weather_advisor_agent.utils import Theophrastus_Observability, session_cache
+from weather_advisor_agent.utils.advice_renderer import classify_query_type, render_current_conditions
+from weather_advisor_agent.utils.llm_response_cache import llm_cache_before_model, llm_cache_after_model
+from weather_advisor_agent.utils.model_call_metrics import model_metrics_before_model, model_metrics_after_model
 
 logger = logging.getLogger(__name__)
 
-def aurora_advice_callback(callback_context: CallbackContext) -> Content:
+# Invocations whose answer already reached the caller as streamed chunks. Kept in memory only so
+# nothing leaks into the persisted session state, the oldest are dropped past MAX_STREAMED
+MAX_STREAMED = 1024
+_streamed_invocations: "OrderedDict[str, bool]" = OrderedDict()
+_streamed_lock = threading.Lock()
+
+def _mark_streamed(invocation_id: str) -> None:
+  with _streamed_lock:
+    _streamed_invocations[invocation_id] = True
+    while len(_streamed_invocations) > MAX_STREAMED:
+      _streamed_invocations.popitem(last=False)
+
+def _was_streamed(invocation_id: str) -> bool:
+  with _streamed_lock:
+    return _streamed_invocations.pop(invocation_id, False)
+
+def aurora_advice_callback(callback_context: CallbackContext) -> Optional[Content]:
   """Callback for aurora advice writer"""
   raw_output = callback_context.state.get("env_advice_markdown")
 
@@ -21,6 +49,9 @@ def aurora_advice_callback(callback_context: CallbackContext) -> Content:
 
     Theophrastus_Observability.log_agent_complete("aurora_env_advice_writer", "env_advice_markdown", success=True)
 
+    # Streamed: the caller already got the chunks and the final model event, don't send it twice
+    if _was_streamed(callback_context.invocation_id):
+      return None
     return Content(parts=[Part(text=text)])
 
   Theophrastus_Observability.log_agent_complete("aurora_env_advice_writer", "env_advice_markdown", success=False)
@@ -71,6 +102,7 @@ aurora_env_advice_writer = Agent(
   -`env_snapshot`: current environmental snapshot for one or more locations.
   -`env_risk_report`: structured risk assessment matching the snapshots.
   -`env_location_options`: list of candidate locations with names and coordinates.
+  -`env_snapshot_errors`: locations whose data could not be fetched this turn; mention them briefly.
 
   Treat these state keys as your ground truth when building the response.
   Do NOT ask the user to repeat this information if it is already present.
@@ -197,6 +229,7 @@ aurora_env_advice_writer = Agent(
 
   - Data sources used: External weather APIs and internal processing
   - [Mention any missing data]
+  - [If a snapshot has "stale": true, say its data is about age_seconds/60 minutes old and being refreshed]
   - Disclaimer: This is advisory information, not medical or safety-of-life guidance
 
   ===================================
@@ -222,7 +255,8 @@ aurora_env_advice_writer = Agent(
   7. **Language**: Respond in the user's language (Spanish if they write in Spanish, etc.)
 
   8. **Uncertainty**: If data is missing or unreliable, acknowledge it briefly but still provide 
-    what you can.
+    what you can. Snapshots carry `age_seconds` and `stale`; when `stale` is true, mention how old
+    the data is.
 
   ===================================
   EXAMPLES
@@ -291,5 +325,70 @@ aurora_env_advice_writer = Agent(
   - Never wrap output in code blocks.
   """,
   output_key="env_advice_markdown",
+  before_model_callback=[llm_cache_before_model, model_metrics_before_model],
+  after_model_callback=[model_metrics_after_model, llm_cache_after_model],
   after_agent_callback=aurora_advice_callback
 )
+
+
+def _user_message(context: InvocationContext) -> str:
+  content = getattr(context, "user_content", None)
+  if content is None or not content.parts:
+    return ""
+  return " ".join(part.text for part in content.parts if getattr(part, "text", None))
+
+def _streaming_context(context: InvocationContext) -> InvocationContext:
+  """Copy of the context with SSE streaming on, so Aurora's chunks reach the caller of
+  Runner.run_async as partial events while the rest of the turn runs unchanged"""
+  run_config = context.run_config or RunConfig()
+  if run_config.streaming_mode != StreamingMode.NONE:
+    return context
+  return context.model_copy(update={"run_config": run_config.model_copy(update={"streaming_mode": StreamingMode.SSE})})
+
+def _load(value):
+  if isinstance(value, str):
+    try:
+      return json.loads(value)
+    except json.JSONDecodeError:
+      return None
+  return value
+
+class EnvAdviceRouterAgent(BaseAgent):
+  """Renders simple weather answers from the template, runs Aurora for everything else."""
+  async def _run_async_impl(self, context: InvocationContext) -> AsyncGenerator[Event, None]:
+    start_time = time.time()
+    state = context.session.state
+
+    markdown = None
+    if TheophrastusConfiguration.advice_template_fast_path and classify_query_type(_user_message(context)) == 1:
+      markdown = render_current_conditions(_load(state.get("env_snapshot")), _load(state.get("env_risk_report")), state.get("env_snapshot_errors"))
+
+    if markdown is None:
+      if TheophrastusConfiguration.advice_streaming_enabled:
+        context = _streaming_context(context)
+      streamed = False
+      async for event in self.sub_agents[0].run_async(context):
+        yield event
+        if event.partial and not streamed:
+          # Chunks reached the caller (not a cache hit): Aurora's callback must not resend the text
+          streamed = True
+          _mark_streamed(context.invocation_id)
+      return
+
+    Theophrastus_Observability.log_agent_start("aurora_env_advice_template", {"session_id": context.session.id})
+    session_cache.store_evaluation_data(context.session.id, {"env_advice_markdown": markdown})
+    duration_ms = (time.time() - start_time) * 1000
+    Theophrastus_Observability.log_agent_complete("aurora_env_advice_template", "env_advice_markdown", success=True, duration_ms=duration_ms)
+    logger.info(f"Rendered current conditions from the template in {duration_ms:.3f} ms.")
+
+    yield Event(
+      author=self.name,
+      content=Content(role="model", parts=[Part(text=markdown)]),
+      actions=EventActions(state_delta={"env_advice_markdown": markdown})
+    )
+
+aurora_env_advice_router = EnvAdviceRouterAgent(
+  name="aurora_env_advice_router",
+  description="Answers simple weather queries from a template, delegates the rest to Aurora.",
+  sub_agents=[aurora_env_advice_writer]
+)
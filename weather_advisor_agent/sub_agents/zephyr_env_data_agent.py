@@ -1,38 +1,91 @@
 import json
+import time
 import logging
 
+from typing import AsyncGenerator, Dict, Any, List, Tuple, Optional, Set
+
 from google.genai.types import Content, Part
 from google.adk.tools import FunctionTool
-from google.adk.agents import Agent, LoopAgent
+from google.adk.agents import Agent, BaseAgent, LoopAgent
+from google.adk.events import Event, EventActions
 from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
 
 from weather_advisor_agent.config import TheophrastusConfiguration
 
-from weather_advisor_agent.tools import (geocode_place_name,fetch_and_store_snapshot,get_last_snapshot)
+from weather_advisor_agent.tools import (fetch_weather_for_place_async,
+  fetch_and_store_snapshot_async,
+  fetch_and_store_snapshots_batch_async,
+  fetch_and_store_snapshots_parallel_async
+)
+from weather_advisor_agent.tools.web_access_tools import location_id
 
-from weather_advisor_agent.utils import Theophrastus_Observability, session_cache
+from weather_advisor_agent.utils import Theophrastus_Observability, Theophrastus_SnapshotRegistry, session_cache
+from weather_advisor_agent.utils.entity_extractor import (extract_entities,
+  entities_state_delta,
+  is_confident,
+  known_location_targets,
+  snapshot_location_targets,
+  latest_location_targets
+)
 
-from weather_advisor_agent.utils.validation_checkers import EnvSnapshotValidationChecker
+from weather_advisor_agent.utils.model_call_metrics import model_metrics_before_model, model_metrics_after_model
+from weather_advisor_agent.utils.validation_checkers import EnvSnapshotValidationChecker, failed_items
 
 
 logger = logging.getLogger(__name__)
 
-def zephyr_data_callback(callback_context: CallbackContext) -> Content:
-  """Callback for zephyr agent - stores weather snapshot data"""
-  last_snapshot = get_last_snapshot()
+def _stored_snapshots(state: Dict[str, Any], replaced_ids: Set[str]) -> List[dict]:
+  """Snapshots already in state, minus the locations that are being refetched"""
+  stored = state.get("env_snapshot")
+  if isinstance(stored, str):
+    try:
+      stored = json.loads(stored)
+    except json.JSONDecodeError:
+      return []
+  stored = stored if isinstance(stored, list) else [stored] if isinstance(stored, dict) else []
+  kept = []
+  for snapshot in stored:
+    location = (snapshot.get("location") if isinstance(snapshot, dict) else None) or {}
+    if not isinstance(location.get("latitude"), (int, float)) or not isinstance(location.get("longitude"), (int, float)):
+      continue
+    if location_id(location["latitude"], location["longitude"]) not in replaced_ids:
+      kept.append(snapshot)
+  return kept
+
+def _invocation_snapshots_delta(state: Dict[str, Any], session_id: str, invocation_id: str, agent_name: str, replaced_ids: Optional[Set[str]] = None) -> Dict[str, Any]:
+  """State delta with the snapshots fetched in this invocation (taken from the registry), empty
+  when there are none. With `replaced_ids` (a partial retry) they are merged into the stored
+  snapshots instead of replacing them"""
+  snapshots = Theophrastus_SnapshotRegistry.pop(invocation_id)
+  if not snapshots:
+    return {}
+  if replaced_ids is not None:
+    snapshots = _stored_snapshots(state, replaced_ids) + snapshots
+
+  last_snapshot = snapshots[0] if len(snapshots) == 1 else snapshots
+  session_cache.store_evaluation_data(session_id,{"env_snapshot": last_snapshot})
   
-  if last_snapshot:
-    callback_context.session.state["env_snapshot"] = json.dumps(last_snapshot)
-    session_cache.store_evaluation_data(callback_context.session.id,{"env_snapshot": last_snapshot})
-    
-    Theophrastus_Observability.log_agent_complete("zephyr_env_data_agent", "env_snapshot", success=True)
-    logger.info("Stored snapshot. | ")
-    
-    current = last_snapshot.get("current", {})
+  Theophrastus_Observability.log_agent_complete(agent_name, "env_snapshot", success=True)
+  logger.info(f"Stored {len(snapshots)} snapshot(s). | ")
+  
+  saved = Theophrastus_Observability.metrics.get_turn_compaction(invocation_id)
+  if saved:
+    logger.info(f"Compact snapshots saved {saved['bytes_saved']} bytes (~{saved['tokens_saved']} tokens) this turn. |")
+  
+  for snapshot in snapshots:
+    current = snapshot.get("current", {})
     temp = current.get("temperature_c", "?")
     wind = current.get("wind_speed_10m_ms", "?")
     logger.info(f"Data: {temp}°C, {wind} m/s wind. |")
-    
+  return {"env_snapshot": json.dumps(last_snapshot), "env_latest_locations": "snapshot"}
+
+def zephyr_data_callback(callback_context: CallbackContext) -> Content:
+  """Callback for zephyr agent - stores the weather snapshots fetched in this invocation"""
+  delta = _invocation_snapshots_delta(callback_context.state, callback_context.session.id, callback_context.invocation_id, "zephyr_env_data_agent")
+  if delta:
+    for key, value in delta.items():
+      callback_context.state[key] = value
     return Content(parts=[])
   else:
     logger.warning("No snapshot found.")
@@ -46,15 +99,120 @@ zephyr_env_data_agent = Agent(
   description="Fetches live environmental data.",
   instruction="""
   Extract location from user message.
-  Call geocode_place_name, then call fetch_and_store_snapshot with coordinates.
+  Place already recognized in the message (may be empty): {env_extracted_place?}
+  Call fetch_weather_for_place_async ONCE with the place name (and region_hint if the user gave a
+  city, state or country). It geocodes and fetches in the same call, do not geocode separately.
+  - status "ok": done. If "ambiguous" is true and the user's wording points to one of the
+    "alternatives", call it again with that alternative's admin1/country as region_hint.
+  - status "not_found": retry once with a simpler name or a region_hint, then stop.
+  If the user already gave coordinates, call fetch_and_store_snapshot_async with them instead.
+
+  If the user asks about several locations (for example "those locations" or a comparison/report
+  over the known location options below), do NOT fetch them one by one. Call
+  fetch_and_store_snapshots_batch_async ONCE with the lists of latitudes, longitudes and names.
+
+  Known location options (may be empty): {env_location_options?}
   """,
-  tools=[FunctionTool(fetch_and_store_snapshot),FunctionTool(geocode_place_name)],
+  tools=[FunctionTool(fetch_and_store_snapshot_async),
+    FunctionTool(fetch_and_store_snapshots_batch_async),
+    FunctionTool(fetch_weather_for_place_async)
+  ],
+  before_model_callback=model_metrics_before_model,
+  after_model_callback=model_metrics_after_model,
   after_agent_callback=zephyr_data_callback
 )
 
+def _user_message(context: InvocationContext) -> str:
+  content = getattr(context, "user_content", None)
+  if content is None or not content.parts:
+    return ""
+  return " ".join(part.text for part in content.parts if getattr(part, "text", None))
+
+def _fast_path_targets(context: InvocationContext) -> Tuple[str, List[Tuple[float, float, str]], Dict[str, Any]]:
+  """Where the coordinates come from, the (lat, lon, name) to fetch without Zephyr (none when the
+  message names a place that is not resolved confidently) and the extracted entities' state delta"""
+  state = context.session.state
+  entities = extract_entities(_user_message(context))
+  delta = entities_state_delta(state, entities)
+
+  if is_confident(entities):
+    place = entities.place
+    return "gazetteer", [(place["latitude"], place["longitude"], place["name"])], delta
+  if entities.refers_to_known_locations:
+    locations = known_location_targets(state) or snapshot_location_targets(state)
+  elif not entities.mentions_place:
+    # Follow-up without a place ("what's the weather there?"): reuse the coordinates written last
+    locations = latest_location_targets(state)
+  else:
+    locations = []
+  return "state", [(l["latitude"], l["longitude"], l.get("name") or "") for l in locations], delta
+
+class ZephyrDataStage(BaseAgent):
+  """Fetches the snapshots directly when the place is resolved locally or the turn is about places
+  whose coordinates are already in state, Zephyr only runs when neither applies. On a retry it
+  refetches only the locations the validation checker rejected."""
+  async def _retry_failed(self, context: InvocationContext, failures: List[dict]) -> Tuple[int, Dict[str, Any]]:
+    """Refetches the rejected locations, returns how many succeeded and the state delta that
+    merges them into env_snapshot"""
+    latitudes = [f["latitude"] for f in failures]
+    longitudes = [f["longitude"] for f in failures]
+    names = [f.get("name") or "" for f in failures]
+    Theophrastus_Observability.log_agent_start("zephyr_env_data_retry", {"session_id": context.session.id, "locations": len(failures)})
+    errors = {}
+    try:
+      result = await fetch_and_store_snapshots_parallel_async(context, latitudes, longitudes, names)
+      errors = result["errors"]
+    except Exception as e:
+      Theophrastus_Observability.log_error("zephyr_env_data_retry", e)
+    replaced_ids = {location_id(lat, lon) for lat, lon in zip(latitudes, longitudes)}
+    delta = {"env_snapshot_errors": list(errors.values())}
+    delta.update(_invocation_snapshots_delta(context.session.state, context.session.id, context.invocation_id, "zephyr_env_data_retry", replaced_ids))
+    return len(failures) - len(errors), delta
+
+  async def _run_async_impl(self, context: InvocationContext) -> AsyncGenerator[Event, None]:
+    start_time = time.time()
+    failures = failed_items(context.session.state, "env_snapshot_failures", context.invocation_id)
+    if failures:
+      fetched, delta = await self._retry_failed(context, failures)
+      logger.info(f"Retried {len(failures)} failed location(s), {fetched} recovered in {(time.time() - start_time) * 1000:.1f} ms.")
+      yield Event(author=self.name, actions=EventActions(state_delta=delta))
+      return
+
+    source, targets, delta = _fast_path_targets(context) if TheophrastusConfiguration.entity_extractor_enabled else ("", [], {})
+    delta["env_snapshot_errors"] = []
+
+    if targets:
+      Theophrastus_Observability.log_agent_start("zephyr_env_data_fast_path", {"session_id": context.session.id, "locations": len(targets), "coordinates": source})
+      latitudes, longitudes, names = (list(column) for column in zip(*targets))
+      errors = {}
+      try:
+        # The invocation context carries the invocation_id the store tools key the registry on
+        result = await fetch_and_store_snapshots_parallel_async(context, latitudes, longitudes, names)
+        errors = result["errors"]
+      except Exception as e:
+        Theophrastus_Observability.log_error("zephyr_env_data_fast_path", e)
+      delta["env_snapshot_errors"] = list(errors.values())
+      stored = _invocation_snapshots_delta(context.session.state, context.session.id, context.invocation_id, "zephyr_env_data_fast_path")
+      if stored:
+        logger.info(f"Fetched {len(targets) - len(errors)}/{len(targets)} location(s) without Zephyr in {(time.time() - start_time) * 1000:.1f} ms.")
+        yield Event(author=self.name, actions=EventActions(state_delta={**delta, **stored}))
+        return
+      logger.warning("Fast path returned no snapshot, falling back to Zephyr.")
+
+    # Zephyr's instruction reads the extracted place, the runner applies the delta before it runs
+    yield Event(author=self.name, actions=EventActions(state_delta=delta))
+    async for event in self.sub_agents[0].run_async(context):
+      yield event
+
+zephyr_env_data_stage = ZephyrDataStage(
+  name="zephyr_env_data_stage",
+  description="Resolves the place locally and fetches its data, falls back to Zephyr when unsure.",
+  sub_agents=[zephyr_env_data_agent]
+)
+
 robust_env_data_agent = LoopAgent(
   name="robust_env_data_agent",
   description="Robust environmental data fetcher with retries.",
-  sub_agents=[zephyr_env_data_agent,EnvSnapshotValidationChecker(name="env_snapshot_validation_checker")],
+  sub_agents=[zephyr_env_data_stage,EnvSnapshotValidationChecker(name="env_snapshot_validation_checker")],
   max_iterations=2
 )
\ No newline at end of file
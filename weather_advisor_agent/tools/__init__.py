@@ -2,7 +2,18 @@ from .creation_tools import save_env_report_to_file
 from .web_access_tools import (geocode_place_name, 
   fetch_env_snapshot_from_open_meteo,
   fetch_and_store_snapshot, 
-  get_last_snapshot
+  geocode_place_name_async,
+  fetch_env_snapshot_from_open_meteo_async,
+  fetch_and_store_snapshot_async,
+  fetch_env_snapshots_batch,
+  fetch_env_snapshots_batch_async,
+  fetch_and_store_snapshots_batch_async,
+  fetch_weather_for_place,
+  fetch_weather_for_place_async,
+  fetch_and_store_snapshots_parallel_async,
+  prefetch_env_snapshot,
+  prefetch_env_snapshot_async,
+  resolve_place_coordinates
 )
 from .memory_tools import (store_user_preference,
   get_user_preferences,
@@ -18,7 +29,18 @@ __all__ = ["save_env_report_to_file",
   "geocode_place_name",
   "fetch_env_snapshot_from_open_meteo",
   "fetch_and_store_snapshot", 
-  "get_last_snapshot",
+  "geocode_place_name_async",
+  "fetch_env_snapshot_from_open_meteo_async",
+  "fetch_and_store_snapshot_async",
+  "fetch_env_snapshots_batch",
+  "fetch_env_snapshots_batch_async",
+  "fetch_and_store_snapshots_batch_async",
+  "fetch_weather_for_place",
+  "fetch_weather_for_place_async",
+  "fetch_and_store_snapshots_parallel_async",
+  "prefetch_env_snapshot",
+  "prefetch_env_snapshot_async",
+  "resolve_place_coordinates",
   "parse_json_string",
   "store_user_preference",
   "get_user_preferences",
@@ -1,6 +1,8 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+from weather_advisor_agent.utils.cache_warmer import Theophrastus_CacheWarmer, FAVORITE_INTEREST, QUERY_INTEREST
+
 def store_user_preference(tool_context,preference_type: str,value: str) -> Dict[str, Any]:
   """Store a user preference in session state (persists across sessions)."""
   preferences = tool_context.state.get("user:preferences", {})
@@ -30,19 +32,21 @@ def get_user_preferences(tool_context) -> Dict[str, Any]:
     "count": len(preferences)
   }
 
-def add_to_query_history(tool_context,location: str,activity: Optional[str] = None, weather_summary: Optional[str] = None  ) -> Dict[str, Any]:
-  """Add a location query to the history (persists across sessions)."""
-  history = tool_context.state.get("user:query_history", [])
-  
+def append_query_history(history: Optional[List[Dict[str, Any]]], location: str, activity: Optional[str] = None, weather_summary: Optional[str] = None) -> List[Dict[str, Any]]:
+  """A new history list with the query appended, last 20 kept. Shared by the tool and the router"""
   query = {
     "timestamp": datetime.now().isoformat(),
     "location": location,
     "activity": activity,
     "weather_summary": weather_summary
   }
-  history.append(query)
-  history = history[-20:]
+  return (list(history or []) + [query])[-20:]
+
+def add_to_query_history(tool_context,location: str,activity: Optional[str] = None, weather_summary: Optional[str] = None  ) -> Dict[str, Any]:
+  """Add a location query to the history (persists across sessions)."""
+  history = append_query_history(tool_context.state.get("user:query_history", []), location, activity, weather_summary)
   tool_context.state["user:query_history"] = history
+  Theophrastus_CacheWarmer.record_interest(location, QUERY_INTEREST)
   
   return {
     "status": "success",
@@ -102,6 +106,8 @@ def store_favorite_location(tool_context,location_name: str,notes: Optional[str]
   """Store a favorite location (persists across sessions)."""
   favorites = tool_context.state.get("user:favorite_locations", {})
   
+  if location_name not in favorites:
+    Theophrastus_CacheWarmer.record_interest(location_name, FAVORITE_INTEREST)
   favorites[location_name] = {"notes": notes,"added": datetime.now().isoformat()}
   tool_context.state["user:favorite_locations"] = favorites
   
@@ -142,6 +148,7 @@ def remove_favorite_location(tool_context,location_name: str) -> Dict[str, Any]:
   
   del favorites[location_name]
   tool_context.state["user:favorite_locations"] = favorites
+  Theophrastus_CacheWarmer.record_interest(location_name, -FAVORITE_INTEREST)
   
   return {
     "status": "success",
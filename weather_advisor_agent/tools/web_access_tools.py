@@ -1,79 +1,87 @@
-import requests
 import time
+import asyncio
+import inspect
 import logging
 
-from typing import Dict, List, Any, cast, Optional
+import httpx
 
-from weather_advisor_agent.utils import Theophrastus_Observability
+from contextlib import closing, aclosing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, AsyncIterator, Callable, Iterator, Tuple, cast, Optional
+
+from weather_advisor_agent.config import TheophrastusConfiguration
+
+from weather_advisor_agent.utils import (Theophrastus_Observability,
+  Theophrastus_GeocodeCache,
+  Theophrastus_HttpClient,
+  Theophrastus_SnapshotCache
+)
+from weather_advisor_agent.utils.snapshot_registry import Theophrastus_SnapshotRegistry
+from weather_advisor_agent.utils.env_snapshot import compact_snapshot, location_id
+from weather_advisor_agent.utils.gazetteer import Theophrastus_Gazetteer
+from weather_advisor_agent.utils.air_quality import current_hour_index, summarize_air_quality, summarize_air_quality_batch
+from weather_advisor_agent.utils.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
-def geocode_place_name(place_name: str, max_results: int = 3, region_hint: Optional[str] = None) -> Dict[str, Any]:
-  """Geocodes a place name to coordinates using Open-Meteo Geocoding API"""
-  
-  start_time = time.time()
+GEOCODING_URL = "https://geocoding-api.open-meteo.com/v1/search"
+
+SUFFIXES_TO_REMOVE = [
+  " National Park",
+  " national park",
+  " State Park", 
+  " state park",
+  " Park",
+  " park",
+  " Forest",
+  " forest",
+  " Mountain",
+  " mountain",
+  " Volcano",
+  " volcano",
+  " Trail",
+  " trail",
+  " Reserve",
+  " reserve"
+]
+
+def _call_geocode_api(name: str, count: int) -> Dict[str, Any]:
+  """Single request to the Open-Meteo Geocoding API"""
+  try:
+    resp = Theophrastus_HttpClient.get(
+      GEOCODING_URL,
+      params={
+        "name": name,
+        "count": count,
+        "language": "en",
+        "format": "json"
+      },timeout=TheophrastusConfiguration.geocode_timeout_seconds
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    return {"ok": True, "data": data}
   
-  Theophrastus_Observability.log_tool_call(
-    "geocode_place_name",{
-      "place_name": place_name,
-      "max_results": max_results,
-      "region_hint": region_hint
+  except httpx.TimeoutException:
+    return {
+      "ok": False,
+      "error": "timeout",
+      "message": "Timeout."
+    }
+  except httpx.HTTPError:
+    return {
+      "ok": False,
+      "error": "request_failed",
+      "message": "Request failed."
     }
-  )
-  
-  url = "https://geocoding-api.open-meteo.com/v1/search"
-  
-  def _call_api(name: str, count: int = None) -> Dict[str, Any]:
-    try:
-      resp = requests.get(
-        url,
-        params={
-          "name": name,
-          "count": count or max_results,
-          "language": "en",
-          "format": "json"
-        },timeout=20
-      )
-      resp.raise_for_status()
-      data = resp.json()
-      return {"ok": True, "data": data}
-    
-    except requests.Timeout:
-      return {
-        "ok": False,
-        "error": "timeout",
-        "message": f"Timeout."
-      }
-    except requests.RequestException as e:
-      return {
-        "ok": False,
-        "error": "request_failed",
-        "message": f"Request failed."
-      }
 
+def _full_name_candidates(place_name: str, region_hint: Optional[str]) -> List[str]:
+  """The full name, the name without its suffix and their region-hinted forms. The only variations
+  the offline gazetteer may answer, shorter truncations are left to the API"""
   cleaned = place_name.strip()
   candidates: list[str] = []
   candidates.append(cleaned)
-  suffixes_to_remove = [
-    " National Park",
-    " national park",
-    " State Park", 
-    " state park",
-    " Park",
-    " park",
-    " Forest",
-    " forest",
-    " Mountain",
-    " mountain",
-    " Volcano",
-    " volcano",
-    " Trail",
-    " trail",
-    " Reserve",
-    " reserve"
-  ]
-  
-  for suffix in suffixes_to_remove:
+  
+  for suffix in SUFFIXES_TO_REMOVE:
     if cleaned.endswith(suffix):
       without_suffix = cleaned[:-len(suffix)].strip()
       if without_suffix:
@@ -84,12 +92,18 @@ def geocode_place_name(place_name: str, max_results: int = 3, region_hint: Optio
     region_hint_clean = region_hint.strip()
     if region_hint_clean.lower() not in cleaned.lower():
       candidates.append(f"{cleaned}, {region_hint_clean}")
-      for suffix in suffixes_to_remove:
+      for suffix in SUFFIXES_TO_REMOVE:
         if cleaned.endswith(suffix):
           without_suffix = cleaned[:-len(suffix)].strip()
           if without_suffix:
             candidates.append(f"{without_suffix}, {region_hint_clean}")
           break
+  return candidates
+
+def _build_geocode_candidates(place_name: str, region_hint: Optional[str]) -> List[str]:
+  """Query variations to try, ordered from highest to lowest priority"""
+  cleaned = place_name.strip()
+  candidates = _full_name_candidates(place_name, region_hint)
   
   words = cleaned.split()
   if len(words) >= 3:
@@ -109,49 +123,116 @@ def geocode_place_name(place_name: str, max_results: int = 3, region_hint: Optio
     if c_lower not in seen and c:
       seen.add(c_lower)
       unique_candidates.append(c)
+  return unique_candidates
+
+def _attempt_max_results(priority: int, max_results: int) -> int:
+  return max_results if priority == 0 else min(max_results * 2, 10)
+
+def _format_geocode_results(data: Dict[str, Any], max_results: int) -> List[Dict[str, Any]]:
+  raw_results: List[Dict[str, Any]] = data.get("results") or []
   
-  last_error: Dict[str, Any] | None = None
-  
-  for i, candidate in enumerate(unique_candidates):
-    attempt_max_results = max_results if i == 0 else min(max_results * 2, 10)
-    api_result = _call_api(candidate, attempt_max_results)
-    
-    if not api_result.get("ok"):
-      last_error = api_result
-      continue
-    
-    data = cast(Dict[str, Any], api_result["data"])
-    raw_results: List[Dict[str, Any]] = data.get("results") or []
-    
-    if not raw_results:
-      continue
-    
-    results: List[Dict[str, Any]] = []
-    for r in raw_results:
-      results.append({
-        "name": r.get("name"),
-        "latitude": r.get("latitude"),
-        "longitude": r.get("longitude"),
-        "country": r.get("country"),
-        "admin1": r.get("admin1"),
-        "admin2": r.get("admin2"),
-        "population": r.get("population")
-      })
-    results = results[:max_results]
-    
-    if results:
-      duration_ms = (time.time() - start_time) * 1000
-      Theophrastus_Observability.log_tool_complete("geocode_place_name", success=True, duration_ms=duration_ms)
-      return {
-        "query": candidate,
-        "original_query": place_name,
-        "results": results,
-        "source": "open_meteo_api",
-        "region_hint": region_hint
-      }
+  results: List[Dict[str, Any]] = []
+  for r in raw_results:
+    results.append({
+      "name": r.get("name"),
+      "latitude": r.get("latitude"),
+      "longitude": r.get("longitude"),
+      "country": r.get("country"),
+      "admin1": r.get("admin1"),
+      "admin2": r.get("admin2"),
+      "population": r.get("population")
+    })
+  return results[:max_results]
 
-  duration_ms = (time.time() - start_time) * 1000
+def _iter_candidates_sequential(candidates: List[str], max_results: int) -> Iterator[Tuple[str, Dict[str, Any]]]:
+  """Tries the candidates one after another"""
+  for i, candidate in enumerate(candidates):
+    yield candidate, _call_geocode_api(candidate, _attempt_max_results(i, max_results))
+
+_geocode_executor = ThreadPoolExecutor(max_workers=max(1, TheophrastusConfiguration.geocode_max_concurrency), thread_name_prefix="geocode")
+
+def _iter_candidates_concurrent(candidates: List[str], max_results: int) -> Iterator[Tuple[str, Dict[str, Any]]]:
+  """Sends the candidate queries in parallel but yields them back in priority order.
+  Once the caller stops consuming (a higher-priority hit won), queued queries are cancelled
+  and the answers of the ones already in flight are discarded."""
+  futures = [_geocode_executor.submit(_call_geocode_api, c, _attempt_max_results(i, max_results)) for i, c in enumerate(candidates)]
+  try:
+    for candidate, future in zip(candidates, futures):
+      yield candidate, future.result()
+  finally:
+    for future in futures:
+      future.cancel()
+
+async def _call_geocode_api_async(name: str, count: int) -> Dict[str, Any]:
+  """Single non-blocking request to the Open-Meteo Geocoding API"""
+  try:
+    resp = await Theophrastus_HttpClient.aget(
+      GEOCODING_URL,
+      params={
+        "name": name,
+        "count": count,
+        "language": "en",
+        "format": "json"
+      },timeout=TheophrastusConfiguration.geocode_timeout_seconds
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    return {"ok": True, "data": data}
   
+  except httpx.TimeoutException:
+    return {
+      "ok": False,
+      "error": "timeout",
+      "message": "Timeout."
+    }
+  except httpx.HTTPError:
+    return {
+      "ok": False,
+      "error": "request_failed",
+      "message": "Request failed."
+    }
+
+async def _iter_candidates_async(candidates: List[str], max_results: int) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+  """Async counterpart of the candidate iterators. In concurrent mode the lower-priority
+  requests still in flight are cancelled as soon as the caller stops consuming."""
+  if not TheophrastusConfiguration.geocode_concurrent_candidates or len(candidates) <= 1:
+    for i, candidate in enumerate(candidates):
+      yield candidate, await _call_geocode_api_async(candidate, _attempt_max_results(i, max_results))
+    return
+
+  semaphore = asyncio.Semaphore(max(1, TheophrastusConfiguration.geocode_max_concurrency))
+
+  async def _bounded_call(name: str, count: int) -> Dict[str, Any]:
+    async with semaphore:
+      return await _call_geocode_api_async(name, count)
+
+  tasks = [asyncio.create_task(_bounded_call(c, _attempt_max_results(i, max_results))) for i, c in enumerate(candidates)]
+  try:
+    for candidate, task in zip(candidates, tasks):
+      yield candidate, await task
+  finally:
+    for task in tasks:
+      task.cancel()
+
+def _geocode_hit(place_name: str, region_hint: Optional[str], max_results: int, candidate: str, api_result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+  """Builds (and caches) the tool output for a successful attempt, None if it had no results"""
+  data = cast(Dict[str, Any], api_result["data"])
+  results = _format_geocode_results(data, max_results)
+  if not results:
+    return None
+
+  out = {
+    "query": candidate,
+    "original_query": place_name,
+    "results": results,
+    "source": "open_meteo_api",
+    "region_hint": region_hint
+  }
+  Theophrastus_GeocodeCache.set(place_name, region_hint, max_results, out)
+  return out
+
+def _geocode_miss(place_name: str, region_hint: Optional[str], max_results: int, unique_candidates: List[str], last_error: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+  """Builds the tool output when no candidate produced results"""
   out: Dict[str, Any] = {
     "query": place_name,
     "results": [],
@@ -162,37 +243,159 @@ def geocode_place_name(place_name: str, max_results: int = 3, region_hint: Optio
   if last_error is not None:
     out["error"] = last_error.get("error")
     out["error_message"] = last_error.get("message")
-    logger.warning(f"All attempts failed.\n")
+    logger.warning("All attempts failed.\n")
   else:
-    logger.warning(f"No geocoding results found.\n")
+    logger.warning("No geocoding results found.\n")
+    Theophrastus_GeocodeCache.set(place_name, region_hint, max_results, out, negative=True)
+  return out
+
+def _geocode_uncached(place_name: str, max_results: int, region_hint: Optional[str]) -> Dict[str, Any]:
+  """Tries the candidate variations against the API (sync)"""
+  unique_candidates = _build_geocode_candidates(place_name, region_hint)
+  
+  if TheophrastusConfiguration.geocode_concurrent_candidates and len(unique_candidates) > 1:
+    attempts = _iter_candidates_concurrent(unique_candidates, max_results)
+  else:
+    attempts = _iter_candidates_sequential(unique_candidates, max_results)
+  
+  last_error: Dict[str, Any] | None = None
   
-  Theophrastus_Observability.log_tool_complete("geocode_place_name", success=False, duration_ms=duration_ms)
+  with closing(attempts):
+    for candidate, api_result in attempts:
+      if not api_result.get("ok"):
+        last_error = api_result
+        continue
+      
+      out = _geocode_hit(place_name, region_hint, max_results, candidate, api_result)
+      if out:
+        return out
+
+  return _geocode_miss(place_name, region_hint, max_results, unique_candidates, last_error)
+
+async def _geocode_uncached_async(place_name: str, max_results: int, region_hint: Optional[str]) -> Dict[str, Any]:
+  """Tries the candidate variations against the API (async)"""
+  unique_candidates = _build_geocode_candidates(place_name, region_hint)
+  last_error: Dict[str, Any] | None = None
+  
+  attempts = _iter_candidates_async(unique_candidates, max_results)
+  async with aclosing(attempts):
+    async for candidate, api_result in attempts:
+      if not api_result.get("ok"):
+        last_error = api_result
+        continue
+      
+      out = _geocode_hit(place_name, region_hint, max_results, candidate, api_result)
+      if out:
+        return out
+
+  return _geocode_miss(place_name, region_hint, max_results, unique_candidates, last_error)
+
+def _geocode_offline(place_name: str, max_results: int, region_hint: Optional[str]) -> Optional[Dict[str, Any]]:
+  """First tier: the local gazetteer index, no network. None when it has no match"""
+  if not TheophrastusConfiguration.gazetteer_enabled:
+    return None
+  
+  match = Theophrastus_Gazetteer.geocode(_full_name_candidates(place_name, region_hint), max_results, region_hint)
+  Theophrastus_Observability.log_cache_access("gazetteer", hit=match is not None, key=place_name)
+  if match is None:
+    return None
+  
+  candidate, results = match
+  return {
+    "query": candidate,
+    "original_query": place_name,
+    "results": results,
+    "source": "offline_gazetteer",
+    "region_hint": region_hint
+  }
+
+_geocode_flight = SingleFlight("geocode_place_name")
+
+def geocode_place_name(place_name: str, max_results: int = 3, region_hint: Optional[str] = None) -> Dict[str, Any]:
+  """Geocodes a place name to coordinates, offline gazetteer first, then the Open-Meteo Geocoding API"""
+  
+  start_time = time.time()
+  
+  Theophrastus_Observability.log_tool_call(
+    "geocode_place_name",{
+      "place_name": place_name,
+      "max_results": max_results,
+      "region_hint": region_hint
+    }
+  )
+
+  out = _geocode_sync(place_name, max_results, region_hint)
+  
+  duration_ms = (time.time() - start_time) * 1000
+  Theophrastus_Observability.log_tool_complete("geocode_place_name", success=bool(out.get("results")), duration_ms=duration_ms)
   
   return out
 
-def fetch_env_snapshot_from_open_meteo(latitude: float,longitude: float) -> Dict[str, Any]:
-  """Fetches environmental snapshot from Open-Meteo API"""
+def _geocode_tiers(place_name: str, max_results: int, region_hint: Optional[str], call_api: Callable[[str], Any]) -> Any:
+  """Geocode cache, offline gazetteer, then call_api(cache key). The sync and async tools pass
+  their single-flight API call, the async one awaits the result when it comes from the API"""
+  out = Theophrastus_GeocodeCache.get(place_name, region_hint, max_results)
+  if out is None:
+    out = _geocode_offline(place_name, max_results, region_hint)
+  if out is None:
+    out = call_api(Theophrastus_GeocodeCache.make_key(place_name, region_hint, max_results))
+  return out
+
+def _geocode_sync(place_name: str, max_results: int, region_hint: Optional[str]) -> Dict[str, Any]:
+  return _geocode_tiers(place_name, max_results, region_hint,
+    lambda key: _geocode_flight.do(key, lambda: _geocode_uncached(place_name, max_results, region_hint)))
+
+def resolve_place_coordinates(place_name: str) -> Optional[Tuple[float, float]]:
+  """Coordinates of the best geocoding hit for background callers (the cache warmer), None when
+  nothing was found. Same tiers as geocode_place_name, not logged as a tool call"""
+  results = _geocode_sync(place_name, 1, None).get("results") or []
+  if not results:
+    return None
+  return results[0]["latitude"], results[0]["longitude"]
+
+async def geocode_place_name_async(place_name: str, max_results: int = 3, region_hint: Optional[str] = None) -> Dict[str, Any]:
+  """Geocodes a place name to coordinates (offline gazetteer first, then Open-Meteo) without blocking the event loop"""
+  
   start_time = time.time()
   
-  Theophrastus_Observability.log_tool_call("fetch_env_snapshot_from_open_meteo", {"latitude": latitude,"longitude": longitude})
+  Theophrastus_Observability.log_tool_call(
+    "geocode_place_name_async",{
+      "place_name": place_name,
+      "max_results": max_results,
+      "region_hint": region_hint
+    }
+  )
+
+  out = _geocode_tiers(place_name, max_results, region_hint,
+    lambda key: _geocode_flight.do_async(key, lambda: _geocode_uncached_async(place_name, max_results, region_hint)))
+  if inspect.isawaitable(out):
+    out = await out
+  
+  duration_ms = (time.time() - start_time) * 1000
+  Theophrastus_Observability.log_tool_complete("geocode_place_name_async", success=bool(out.get("results")), duration_ms=duration_ms)
   
+  return out
+
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+
+def _validate_coordinates(tool_name: str, latitude: float, longitude: float) -> None:
   if not isinstance(latitude, (int, float)) or not isinstance(longitude, (int, float)):
     error = ValueError(f"Coordinates must be Num: lat={latitude}, lon={longitude}")
-    Theophrastus_Observability.log_error("fetch_env_snapshot_from_open_meteo", error)
+    Theophrastus_Observability.log_error(tool_name, error)
     raise error
   
   if not (-90 <= latitude <= 90):
     error = ValueError(f"Invalid latitude: {latitude} (must be -90 to 90)")
-    Theophrastus_Observability.log_error("fetch_env_snapshot_from_open_meteo", error)
+    Theophrastus_Observability.log_error(tool_name, error)
     raise error
   
   if not (-180 <= longitude <= 180):
     error = ValueError(f"Invalid longitude: {longitude} (must be -180 to 180)")
-    Theophrastus_Observability.log_error("fetch_env_snapshot_from_open_meteo", error)
+    Theophrastus_Observability.log_error(tool_name, error)
     raise error
-  
-  base_url = "https://api.open-meteo.com/v1/forecast"
-  params = {
+
+def _forecast_params(latitude: float, longitude: float) -> Dict[str, Any]:
+  return {
     "latitude": latitude,
     "longitude": longitude,
     "current": [
@@ -202,78 +405,460 @@ def fetch_env_snapshot_from_open_meteo(latitude: float,longitude: float) -> Dict
       "wind_speed_10m"
     ],
     "hourly": ["pm10", "pm2_5"],
+    # Open-Meteo defaults to km/h, the snapshot and the risk thresholds are in m/s
+    "wind_speed_unit": "ms",
     "timezone": "auto"
   }
+
+def _air_quality_inputs(data: Dict[str, Any]) -> Tuple[Any, Any, int, Any]:
+  current = data.get("current", {})
+  hourly = data.get("hourly", {})
+  times = hourly.get("time")
+  return hourly.get("pm10"), hourly.get("pm2_5"), current_hour_index(times, current.get("time")), times
+
+def _build_snapshot(latitude: float, longitude: float, data: Dict[str, Any], air_quality: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+  current = data.get("current", {})
+  if air_quality is None:
+    air_quality = summarize_air_quality(*_air_quality_inputs(data))
+  
+  return {
+    "location": {
+      "latitude": latitude,
+      "longitude": longitude
+    },
+    "current": {
+      "temperature_c": current.get("temperature_2m"),
+      "apparent_temperature_c": current.get("apparent_temperature"),
+      "relative_humidity_percent": current.get("relative_humidity_2m"),
+      "wind_speed_10m_ms": current.get("wind_speed_10m")
+    },
+    "air_quality": air_quality,
+    "age_seconds": 0,
+    "stale": False,
+    "raw": data
+  }
+
+def _log_fetch_failure(tool_name: str, error: Exception, start_time: float) -> None:
+  duration_ms = (time.time() - start_time) * 1000
   
-  try:
-    logger.debug(f"Calling Open-Meteo API.\n")
-    resp = requests.get(base_url, params=params, timeout=10)
+  if isinstance(error, httpx.TimeoutException):
+    details = f"Timeout after {duration_ms:.0f}ms"
+  elif isinstance(error, httpx.HTTPStatusError):
+    details = f"HTTP {error.response.status_code}: {error.response.text[:200]}"
+  elif isinstance(error, httpx.HTTPError):
+    details = "Request failed"
+  else:
+    details = "Unexpected error during API call"
+  
+  Theophrastus_Observability.log_error(tool_name, error, details=details)
+  Theophrastus_Observability.log_tool_complete(tool_name, success=False, duration_ms=duration_ms)
+
+_forecast_flight = SingleFlight("fetch_env_snapshot_from_open_meteo")
+
+def _with_location(snapshot: Dict[str, Any], latitude: float, longitude: float) -> Dict[str, Any]:
+  """Coalesced callers share the grid-cell data but each gets its own location"""
+  return dict(snapshot, location={"latitude": latitude, "longitude": longitude})
+
+def _fetch_snapshot_upstream(latitude: float, longitude: float) -> Dict[str, Any]:
+  """Calls Open-Meteo and refreshes the snapshot cache, identical in-flight calls are coalesced"""
+  def _fetch() -> Dict[str, Any]:
+    logger.debug("Calling Open-Meteo API.\n")
+    resp = Theophrastus_HttpClient.get(FORECAST_URL, params=_forecast_params(latitude, longitude), timeout=TheophrastusConfiguration.forecast_timeout_seconds)
     resp.raise_for_status()
-    data = resp.json()
-    
-    current = data.get("current", {})
-    hourly = data.get("hourly", {})
-    
-    snapshot = {
-      "location": {
-        "latitude": latitude,
-        "longitude": longitude
-      },
-      "current": {
-        "temperature_c": current.get("temperature_2m"),
-        "apparent_temperature_c": current.get("apparent_temperature"),
-        "relative_humidity_percent": current.get("relative_humidity_2m"),
-        "wind_speed_10m_ms": current.get("wind_speed_10m")
-      },
-      "hourly": {
-        "pm10": hourly.get("pm10"),
-        "pm2_5": hourly.get("pm2_5")
-      },
-      "raw": data
-    }
+    snapshot = _build_snapshot(latitude, longitude, resp.json())
+    Theophrastus_SnapshotCache.set(latitude, longitude, snapshot)
+    return snapshot
 
-    duration_ms = (time.time() - start_time) * 1000
-    Theophrastus_Observability.log_tool_complete("fetch_env_snapshot_from_open_meteo",success=True,duration_ms=duration_ms)
-    
-    logger.info(f"Successfully fetched snapshot for ({latitude}, {longitude}). \n")
-    
+  snapshot = _forecast_flight.do(Theophrastus_SnapshotCache.grid_key(latitude, longitude), _fetch)
+  return _with_location(snapshot, latitude, longitude)
+
+async def _fetch_snapshot_upstream_async(latitude: float, longitude: float) -> Dict[str, Any]:
+  """Calls Open-Meteo without blocking and refreshes the snapshot cache, identical in-flight calls are coalesced"""
+  async def _fetch() -> Dict[str, Any]:
+    logger.debug("Calling Open-Meteo API.\n")
+    resp = await Theophrastus_HttpClient.aget(FORECAST_URL, params=_forecast_params(latitude, longitude), timeout=TheophrastusConfiguration.forecast_timeout_seconds)
+    resp.raise_for_status()
+    snapshot = _build_snapshot(latitude, longitude, resp.json())
+    Theophrastus_SnapshotCache.set(latitude, longitude, snapshot)
     return snapshot
+
+  snapshot = await _forecast_flight.do_async(Theophrastus_SnapshotCache.grid_key(latitude, longitude), _fetch)
+  return _with_location(snapshot, latitude, longitude)
+
+_refresh_executor = ThreadPoolExecutor(max_workers=TheophrastusConfiguration.snapshot_refresh_workers, thread_name_prefix="snapshot-refresh")
+_refresh_tasks: set = set()
+
+def _stale_window_seconds() -> float:
+  if not TheophrastusConfiguration.snapshot_stale_while_revalidate:
+    return 0
+  return TheophrastusConfiguration.snapshot_stale_window_seconds
+
+def _refresh_in_background(latitude: float, longitude: float) -> None:
+  """Refreshes a stale cell off the request path, at most one refresh in flight per cell"""
+  if not Theophrastus_SnapshotCache.begin_refresh(latitude, longitude):
+    return
+
+  def _refresh() -> None:
+    try:
+      _fetch_snapshot_upstream(latitude, longitude)
+      logger.info(f"Background refresh done for ({latitude}, {longitude}).")
+    except Exception as e:
+      logger.warning(f"Background refresh failed for ({latitude}, {longitude}): {e}")
+    finally:
+      Theophrastus_SnapshotCache.end_refresh(latitude, longitude)
+
+  _refresh_executor.submit(_refresh)
+
+def _refresh_in_background_async(latitude: float, longitude: float) -> None:
+  """Async counterpart of _refresh_in_background, runs as a task on the current loop"""
+  if not Theophrastus_SnapshotCache.begin_refresh(latitude, longitude):
+    return
+
+  async def _refresh() -> None:
+    try:
+      await _fetch_snapshot_upstream_async(latitude, longitude)
+      logger.info(f"Background refresh done for ({latitude}, {longitude}).")
+    except Exception as e:
+      logger.warning(f"Background refresh failed for ({latitude}, {longitude}): {e}")
+    finally:
+      Theophrastus_SnapshotCache.end_refresh(latitude, longitude)
+
+  task = asyncio.get_running_loop().create_task(_refresh())
+  _refresh_tasks.add(task)
+  task.add_done_callback(_refresh_tasks.discard)
+
+def _cached_snapshot(latitude: float, longitude: float, refresh: Callable[[float, float], None]) -> Optional[Dict[str, Any]]:
+  """Cache lookup with stale-while-revalidate: stale entries are served and refreshed in the background"""
+  cached = Theophrastus_SnapshotCache.get(latitude, longitude, stale_window_seconds=_stale_window_seconds())
+  if cached is not None and cached.get("stale"):
+    logger.info(f"Serving stale snapshot for ({latitude}, {longitude}), age {cached['age_seconds']}s.")
+    refresh(latitude, longitude)
+  return cached
+
+def prefetch_env_snapshot(latitude: float, longitude: float) -> bool:
+  """Warms the snapshot cache for a location ahead of the turn that needs it, False when the
+  cell is already cached. Not logged as a tool call"""
+  if Theophrastus_SnapshotCache.contains(latitude, longitude):
+    return False
+  _fetch_snapshot_upstream(latitude, longitude)
+  return True
+
+async def prefetch_env_snapshot_async(latitude: float, longitude: float) -> bool:
+  """Warms the snapshot cache for a location ahead of the turn that needs it, False when the
+  cell is already cached. Not logged as a tool call"""
+  if Theophrastus_SnapshotCache.contains(latitude, longitude):
+    return False
+  await _fetch_snapshot_upstream_async(latitude, longitude)
+  return True
+
+def fetch_env_snapshot_from_open_meteo(latitude: float,longitude: float) -> Dict[str, Any]:
+  """Fetches environmental snapshot from Open-Meteo API"""
+  start_time = time.time()
   
-  except requests.Timeout as e:
+  Theophrastus_Observability.log_tool_call("fetch_env_snapshot_from_open_meteo", {"latitude": latitude,"longitude": longitude})
+  _validate_coordinates("fetch_env_snapshot_from_open_meteo", latitude, longitude)
+
+  cached = _cached_snapshot(latitude, longitude, _refresh_in_background)
+  if cached is not None:
     duration_ms = (time.time() - start_time) * 1000
-    Theophrastus_Observability.log_error("fetch_env_snapshot_from_open_meteo",e,details=f"Timeout after {duration_ms:.0f}ms")
-    Theophrastus_Observability.log_tool_complete("fetch_env_snapshot_from_open_meteo",success=False,duration_ms=duration_ms)
+    Theophrastus_Observability.log_tool_complete("fetch_env_snapshot_from_open_meteo",success=True,duration_ms=duration_ms)
+    return cached
+  
+  try:
+    snapshot = _fetch_snapshot_upstream(latitude, longitude)
+  except Exception as e:
+    _log_fetch_failure("fetch_env_snapshot_from_open_meteo", e, start_time)
     raise
+
+  duration_ms = (time.time() - start_time) * 1000
+  Theophrastus_Observability.log_tool_complete("fetch_env_snapshot_from_open_meteo",success=True,duration_ms=duration_ms)
   
-  except requests.HTTPError as e:
+  logger.info(f"Successfully fetched snapshot for ({latitude}, {longitude}). \n")
+  
+  return snapshot
+
+async def fetch_env_snapshot_from_open_meteo_async(latitude: float,longitude: float) -> Dict[str, Any]:
+  """Fetches environmental snapshot from Open-Meteo API without blocking the event loop"""
+  start_time = time.time()
+  
+  Theophrastus_Observability.log_tool_call("fetch_env_snapshot_from_open_meteo_async", {"latitude": latitude,"longitude": longitude})
+  _validate_coordinates("fetch_env_snapshot_from_open_meteo_async", latitude, longitude)
+
+  cached = _cached_snapshot(latitude, longitude, _refresh_in_background_async)
+  if cached is not None:
     duration_ms = (time.time() - start_time) * 1000
-    Theophrastus_Observability.log_error("fetch_env_snapshot_from_open_meteo",e,details=f"HTTP {resp.status_code}: {resp.text[:200]}")
-    Theophrastus_Observability.log_tool_complete("fetch_env_snapshot_from_open_meteo",success=False,duration_ms=duration_ms)
+    Theophrastus_Observability.log_tool_complete("fetch_env_snapshot_from_open_meteo_async",success=True,duration_ms=duration_ms)
+    return cached
+  
+  try:
+    snapshot = await _fetch_snapshot_upstream_async(latitude, longitude)
+  except Exception as e:
+    _log_fetch_failure("fetch_env_snapshot_from_open_meteo_async", e, start_time)
     raise
+
+  duration_ms = (time.time() - start_time) * 1000
+  Theophrastus_Observability.log_tool_complete("fetch_env_snapshot_from_open_meteo_async",success=True,duration_ms=duration_ms)
   
-  except requests.RequestException as e:
-    duration_ms = (time.time() - start_time) * 1000
-    Theophrastus_Observability.log_error("fetch_env_snapshot_from_open_meteo",e,details="Request failed")
-    Theophrastus_Observability.log_tool_complete("fetch_env_snapshot_from_open_meteo",success=False,duration_ms=duration_ms)
+  logger.info(f"Successfully fetched snapshot for ({latitude}, {longitude}). \n")
+  
+  return snapshot
+
+def _validate_batch_shape(tool_name: str, latitudes: List[float], longitudes: List[float], names: Optional[List[str]]) -> None:
+  if len(latitudes) != len(longitudes):
+    error = ValueError(f"Got {len(latitudes)} latitudes but {len(longitudes)} longitudes")
+    Theophrastus_Observability.log_error(tool_name, error)
+    raise error
+  
+  if names is not None and len(names) != len(latitudes):
+    error = ValueError(f"Got {len(names)} names for {len(latitudes)} coordinates")
+    Theophrastus_Observability.log_error(tool_name, error)
+    raise error
+
+def _validate_batch(tool_name: str, latitudes: List[float], longitudes: List[float], names: Optional[List[str]]) -> None:
+  _validate_batch_shape(tool_name, latitudes, longitudes, names)
+  for lat, lon in zip(latitudes, longitudes):
+    _validate_coordinates(tool_name, lat, lon)
+
+def _batch_from_cache(latitudes: List[float], longitudes: List[float], names: Optional[List[str]], refresh: Callable[[float, float], None]) -> Tuple[Dict[int, Dict[str, Any]], List[Tuple[int, float, float]]]:
+  """Serves what the snapshot cache already has, returns the cached snapshots and the missing coordinates"""
+  cached: Dict[int, Dict[str, Any]] = {}
+  missing: List[Tuple[int, float, float]] = []
+  for i, (lat, lon) in enumerate(zip(latitudes, longitudes)):
+    snapshot = _cached_snapshot(lat, lon, refresh)
+    if snapshot is None:
+      missing.append((i, lat, lon))
+      continue
+    if names is not None:
+      snapshot["location"]["name"] = names[i]
+    cached[i] = snapshot
+  return cached, missing
+
+def _batch_chunks(indexed: List[Tuple[int, float, float]]) -> List[List[Tuple[int, float, float]]]:
+  """Splits the coordinates into chunks of forecast_batch_chunk_size, keeping the input index"""
+  size = max(1, TheophrastusConfiguration.forecast_batch_chunk_size)
+  return [indexed[i:i + size] for i in range(0, len(indexed), size)]
+
+def _forecast_batch_params(chunk: List[Tuple[int, float, float]]) -> Dict[str, Any]:
+  params = _forecast_params(0.0, 0.0)
+  params["latitude"] = ",".join(str(lat) for _, lat, _ in chunk)
+  params["longitude"] = ",".join(str(lon) for _, _, lon in chunk)
+  return params
+
+def _build_batch_snapshots(chunk: List[Tuple[int, float, float]], data: Any, names: Optional[List[str]]) -> List[Tuple[int, Dict[str, Any]]]:
+  """Open-Meteo answers a multi-coordinate request with a list (one object per location)"""
+  entries = data if isinstance(data, list) else [data]
+  if len(entries) != len(chunk):
+    raise ValueError(f"Open-Meteo returned {len(entries)} locations for {len(chunk)} coordinates")
+  
+  air_quality = summarize_air_quality_batch(*zip(*(_air_quality_inputs(entry) for entry in entries)))
+  
+  snapshots = []
+  for (index, lat, lon), entry, summary in zip(chunk, entries, air_quality):
+    snapshot = _build_snapshot(lat, lon, entry, summary)
+    Theophrastus_SnapshotCache.set(lat, lon, snapshot)
+    if names is not None:
+      snapshot["location"]["name"] = names[index]
+    snapshots.append((index, snapshot))
+  return snapshots
+
+def fetch_env_snapshots_batch(latitudes: List[float], longitudes: List[float], names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+  """Fetches environmental snapshots for several locations with one Open-Meteo request per chunk"""
+  start_time = time.time()
+  
+  Theophrastus_Observability.log_tool_call("fetch_env_snapshots_batch", {"locations": len(latitudes), "names": names})
+  _validate_batch("fetch_env_snapshots_batch", latitudes, longitudes, names)
+  
+  snapshots, missing = _batch_from_cache(latitudes, longitudes, names, _refresh_in_background)
+  try:
+    for chunk in _batch_chunks(missing):
+      resp = Theophrastus_HttpClient.get(FORECAST_URL, params=_forecast_batch_params(chunk), timeout=TheophrastusConfiguration.forecast_timeout_seconds)
+      resp.raise_for_status()
+      snapshots.update(_build_batch_snapshots(chunk, resp.json(), names))
+  except Exception as e:
+    _log_fetch_failure("fetch_env_snapshots_batch", e, start_time)
     raise
+
+  duration_ms = (time.time() - start_time) * 1000
+  Theophrastus_Observability.log_tool_complete("fetch_env_snapshots_batch",success=True,duration_ms=duration_ms)
+  
+  logger.info(f"Successfully fetched {len(snapshots)} snapshots in batch. \n")
+  
+  return [snapshots[i] for i in range(len(latitudes))]
+
+async def fetch_env_snapshots_batch_async(latitudes: List[float], longitudes: List[float], names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+  """Fetches environmental snapshots for several locations without blocking, chunks are requested concurrently"""
+  start_time = time.time()
   
+  Theophrastus_Observability.log_tool_call("fetch_env_snapshots_batch_async", {"locations": len(latitudes), "names": names})
+  _validate_batch("fetch_env_snapshots_batch_async", latitudes, longitudes, names)
+
+  async def _fetch_chunk(chunk: List[Tuple[int, float, float]]) -> List[Tuple[int, Dict[str, Any]]]:
+    resp = await Theophrastus_HttpClient.aget(FORECAST_URL, params=_forecast_batch_params(chunk), timeout=TheophrastusConfiguration.forecast_timeout_seconds)
+    resp.raise_for_status()
+    return _build_batch_snapshots(chunk, resp.json(), names)
+  
+  snapshots, missing = _batch_from_cache(latitudes, longitudes, names, _refresh_in_background_async)
+  try:
+    for chunk_snapshots in await asyncio.gather(*(_fetch_chunk(c) for c in _batch_chunks(missing))):
+      snapshots.update(chunk_snapshots)
   except Exception as e:
-    duration_ms = (time.time() - start_time) * 1000
-    Theophrastus_Observability.log_error("fetch_env_snapshot_from_open_meteo",e,details="Unexpected error during API call")
-    Theophrastus_Observability.log_tool_complete("fetch_env_snapshot_from_open_meteo",success=False,duration_ms=duration_ms)
+    _log_fetch_failure("fetch_env_snapshots_batch_async", e, start_time)
     raise
 
-def fetch_and_store_snapshot(latitude: float, longitude: float) -> Dict[str, Any]:
+  duration_ms = (time.time() - start_time) * 1000
+  Theophrastus_Observability.log_tool_complete("fetch_env_snapshots_batch_async",success=True,duration_ms=duration_ms)
+  
+  logger.info(f"Successfully fetched {len(snapshots)} snapshots in batch. \n")
+  
+  return [snapshots[i] for i in range(len(latitudes))]
+
+def fetch_and_store_snapshot(tool_context, latitude: float, longitude: float) -> Dict[str, Any]:
   """Wrapper for fetch_env_snapshot_from_open_meteo"""
-  global _last_snapshot
-  _last_snapshot = fetch_env_snapshot_from_open_meteo(latitude, longitude)
-  logger.debug(f"Stored snapshot in global cache for ({latitude}, {longitude})")
-  return _last_snapshot
-
-
-def get_last_snapshot() -> Dict[str, Any]:
-  """Retrieve last snapshot"""
-  global _last_snapshot
-  snapshot = _last_snapshot
-  _last_snapshot = None
-  return snapshot
\ No newline at end of file
+  snapshot = fetch_env_snapshot_from_open_meteo(latitude, longitude)
+  snapshot = compact_snapshot(snapshot, tool_context.invocation_id)
+  Theophrastus_SnapshotRegistry.add(tool_context.invocation_id, snapshot)
+  logger.debug(f"Stored snapshot for ({latitude}, {longitude}) in invocation {tool_context.invocation_id}")
+  return snapshot
+
+async def fetch_and_store_snapshot_async(tool_context, latitude: float, longitude: float) -> Dict[str, Any]:
+  """Wrapper for fetch_env_snapshot_from_open_meteo_async"""
+  snapshot = await fetch_env_snapshot_from_open_meteo_async(latitude, longitude)
+  snapshot = compact_snapshot(snapshot, tool_context.invocation_id)
+  Theophrastus_SnapshotRegistry.add(tool_context.invocation_id, snapshot)
+  logger.debug(f"Stored snapshot for ({latitude}, {longitude}) in invocation {tool_context.invocation_id}")
+  return snapshot
+
+async def fetch_and_store_snapshots_batch_async(tool_context, latitudes: List[float], longitudes: List[float], names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+  """Wrapper for fetch_env_snapshots_batch_async"""
+  snapshots = [compact_snapshot(s, tool_context.invocation_id) for s in await fetch_env_snapshots_batch_async(latitudes, longitudes, names)]
+  for snapshot in snapshots:
+    Theophrastus_SnapshotRegistry.add(tool_context.invocation_id, snapshot)
+  logger.debug(f"Stored {len(snapshots)} snapshots in invocation {tool_context.invocation_id}")
+  return snapshots
+
+AMBIGUITY_SCORE_MARGIN = 0.03
+AMBIGUITY_POPULATION_RATIO = 2.0
+
+def _pick_geocode_result(results: List[Dict[str, Any]], region_hint: Optional[str]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+  """Best hit and the alternatives that make the place ambiguous (empty when it is clear).
+  Gazetteer hits compare their score, API hits their population; a region hint settles it"""
+  best = results[0]
+  if region_hint or len(results) < 2:
+    return best, []
+
+  alternatives = []
+  for other in results[1:]:
+    if (other.get("country"), other.get("admin1")) == (best.get("country"), best.get("admin1")):
+      continue
+    if "score" in best and "score" in other:
+      close = best["score"] - other["score"] < AMBIGUITY_SCORE_MARGIN
+    else:
+      close = (best.get("population") or 0) < AMBIGUITY_POPULATION_RATIO * (other.get("population") or 0) or not best.get("population")
+    if close:
+      alternatives.append(other)
+  return best, alternatives
+
+def _describe_place(result: Dict[str, Any]) -> Dict[str, Any]:
+  return {key: result.get(key) for key in ("name", "admin1", "country", "latitude", "longitude")}
+
+def _place_output(place_name: str, region_hint: Optional[str], geocoded: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+  """Tool output skeleton and the chosen geocoding hit (None when the place was not found)"""
+  out: Dict[str, Any] = {"place_name": place_name, "region_hint": region_hint}
+  results = geocoded.get("results") or []
+  if not results:
+    out["status"] = "not_found"
+    out["attempted_variations"] = geocoded.get("attempted_variations", [])
+    if geocoded.get("error"):
+      out["error"] = geocoded["error"]
+      out["error_message"] = geocoded.get("error_message")
+    return out, None
+
+  best, alternatives = _pick_geocode_result(results, region_hint)
+  out["status"] = "ok"
+  out["location"] = _describe_place(best)
+  out["geocode_source"] = geocoded.get("source")
+  out["ambiguous"] = bool(alternatives)
+  if alternatives:
+    out["alternatives"] = [_describe_place(a) for a in alternatives]
+    out["hint"] = "Several places match. Data is for 'location'; call again with region_hint if the user meant another one."
+  return out, best
+
+def _store_place_snapshot(tool_context, snapshot: Dict[str, Any], best: Dict[str, Any]) -> Dict[str, Any]:
+  snapshot = dict(snapshot, location=dict(snapshot.get("location") or {}, name=best.get("name")))
+  snapshot = compact_snapshot(snapshot, tool_context.invocation_id)
+  Theophrastus_SnapshotRegistry.add(tool_context.invocation_id, snapshot)
+  return snapshot
+
+def fetch_weather_for_place(tool_context, place_name: str, region_hint: Optional[str] = None) -> Dict[str, Any]:
+  """Geocodes a place name and fetches its environmental snapshot in one call, with the best hit's
+  location, and the alternatives when the place name is ambiguous"""
+  out, best = _place_output(place_name, region_hint, geocode_place_name(place_name, region_hint=region_hint))
+  if best is None:
+    return out
+  try:
+    snapshot = fetch_env_snapshot_from_open_meteo(best["latitude"], best["longitude"])
+  except Exception as e:
+    out["status"] = "error"
+    out["error_message"] = str(e)
+    return out
+  out["snapshot"] = _store_place_snapshot(tool_context, snapshot, best)
+  return out
+
+async def fetch_weather_for_place_async(tool_context, place_name: str, region_hint: Optional[str] = None) -> Dict[str, Any]:
+  """Geocodes a place name and fetches its environmental snapshot in one call without blocking, with
+  the best hit's location, and the alternatives when the place name is ambiguous"""
+  out, best = _place_output(place_name, region_hint, await geocode_place_name_async(place_name, region_hint=region_hint))
+  if best is None:
+    return out
+  try:
+    snapshot = await fetch_env_snapshot_from_open_meteo_async(best["latitude"], best["longitude"])
+  except Exception as e:
+    out["status"] = "error"
+    out["error_message"] = str(e)
+    return out
+  out["snapshot"] = _store_place_snapshot(tool_context, snapshot, best)
+  return out
+
+async def fetch_and_store_snapshots_parallel_async(tool_context, latitudes: List[float], longitudes: List[float], names: Optional[List[str]] = None) -> Dict[str, Any]:
+  """Fetches every location as its own task (at most parallel_fetch_max_concurrency at once), so the
+  turn waits for the slowest location rather than the sum, and one failure keeps the others"""
+  start_time = time.time()
+  
+  Theophrastus_Observability.log_tool_call("fetch_and_store_snapshots_parallel_async", {"locations": len(latitudes), "names": names})
+  # Coordinates are checked per location, a bad pair is one more entry in errors
+  _validate_batch_shape("fetch_and_store_snapshots_parallel_async", latitudes, longitudes, names)
+  semaphore = asyncio.Semaphore(max(1, TheophrastusConfiguration.parallel_fetch_max_concurrency))
+
+  async def _fetch(latitude: float, longitude: float) -> Dict[str, Any]:
+    _validate_coordinates("fetch_and_store_snapshots_parallel_async", latitude, longitude)
+    async with semaphore:
+      return await fetch_env_snapshot_from_open_meteo_async(latitude, longitude)
+
+  results = await asyncio.gather(*(_fetch(lat, lon) for lat, lon in zip(latitudes, longitudes)), return_exceptions=True)
+
+  snapshots: Dict[str, Dict[str, Any]] = {}
+  errors: Dict[str, Dict[str, Any]] = {}
+  for i, (lat, lon, result) in enumerate(zip(latitudes, longitudes, results)):
+    try:
+      key = location_id(lat, lon)
+    except (TypeError, ValueError):
+      key = f"{lat},{lon}"
+    name = names[i] if names is not None else None
+    if isinstance(result, BaseException):
+      errors[key] = {"name": name, "latitude": lat, "longitude": lon, "error": type(result).__name__, "message": str(result)[:200]}
+      continue
+    snapshot = dict(result, location=dict(result.get("location") or {}, id=key, **({"name": name} if name else {})))
+    try:
+      snapshot = compact_snapshot(snapshot, tool_context.invocation_id)
+    except ValueError as e:
+      errors[key] = {"name": name, "latitude": lat, "longitude": lon, "error": type(e).__name__, "message": str(e)[:200]}
+      continue
+    Theophrastus_SnapshotRegistry.add(tool_context.invocation_id, snapshot)
+    snapshots[key] = snapshot
+
+  duration_ms = (time.time() - start_time) * 1000
+  Theophrastus_Observability.log_tool_complete("fetch_and_store_snapshots_parallel_async", success=bool(snapshots), duration_ms=duration_ms)
+  if errors:
+    logger.warning(f"Fetched {len(snapshots)}/{len(latitudes)} locations, failed: {list(errors)}")
+  
+  return {"snapshots": snapshots, "errors": errors}
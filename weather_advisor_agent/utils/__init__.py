@@ -4,7 +4,32 @@ from .local_evaluator import TheophrastusEvaluator
 
 from . import session_cache
 
+from .geocode_cache import Theophrastus_GeocodeCache
+
+from .http_client import Theophrastus_HttpClient
+
+from .snapshot_cache import Theophrastus_SnapshotCache
+
+from .snapshot_registry import Theophrastus_SnapshotRegistry
+
+from .env_snapshot import EnvSnapshot, Theophrastus_RawPayloadStore
+
+from .gazetteer import Theophrastus_Gazetteer
+
+from .snapshot_prefetcher import Theophrastus_SnapshotPrefetcher
+
+from .cache_warmer import Theophrastus_CacheWarmer
+
 __all__ = ["Theophrastus_Observability",
   "TheophrastusEvaluator",
   "session_cache",
+  "Theophrastus_GeocodeCache",
+  "Theophrastus_HttpClient",
+  "Theophrastus_SnapshotCache",
+  "Theophrastus_SnapshotRegistry",
+  "EnvSnapshot",
+  "Theophrastus_RawPayloadStore",
+  "Theophrastus_Gazetteer",
+  "Theophrastus_SnapshotPrefetcher",
+  "Theophrastus_CacheWarmer",
 ]
\ No newline at end of file
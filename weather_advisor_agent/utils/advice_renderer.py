@@ -0,0 +1,133 @@
+"""
+Template renderer for simple current-conditions answers (Aurora's TYPE 1 format), no model call.
+"""
+import re
+import logging
+
+from typing import Dict, Any, List, Optional, Union
+
+from weather_advisor_agent.utils.env_snapshot import snapshot_location_id
+
+logger = logging.getLogger(__name__)
+
+SIMPLE_WEATHER = re.compile(
+  r"\b(weather|conditions|temperature|temp|how (hot|cold|warm|windy|humid)|is it (hot|cold|warm|windy|raining|sunny)|forecast)\b",
+  re.IGNORECASE
+)
+# Anything that asks for judgement, comparison, a plan or a follow-up goes to Aurora
+NEEDS_WRITER = re.compile(
+  r"\b(safe|safety|risk|risks|danger|dangerous|concern|should i|compare|comparison|better|best|difference|"
+  r"recommend|recommendations|suggest|plan|report|generate|detailed|analysis|bring|wear|tomorrow|weekend|"
+  r"tonight|later|next|tell me more|what about|why)\b",
+  re.IGNORECASE
+)
+
+# Beaufort upper bounds in m/s, the unit of wind_speed_10m_ms (Open-Meteo is asked for m/s)
+WIND_SCALE = [(1.5, "calm"), (5.5, "light breeze"), (8.0, "moderate breeze"), (10.8, "fresh breeze"), (13.9, "strong breeze"), (17.2, "near gale")]
+
+def classify_query_type(message: Optional[str]) -> int:
+  """1 for a simple weather query the template can answer, 0 when Aurora should write it.
+  English keywords only, other languages are left to Aurora"""
+  if not message or not SIMPLE_WEATHER.search(message):
+    return 0
+  return 0 if NEEDS_WRITER.search(message) else 1
+
+def _num(value: Any) -> Optional[float]:
+  return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+def _fmt(value: Optional[float], unit: str, digits: int = 0) -> str:
+  return "not available" if value is None else f"{value:.{digits}f}{unit}"
+
+def _wind_label(speed: Optional[float]) -> str:
+  if speed is None:
+    return ""
+  for bound, label in WIND_SCALE:
+    if speed < bound:
+      return label
+  return "gale"
+
+def _describe(temperature: Optional[float], wind: Optional[float], humidity: Optional[float]) -> str:
+  """Short description from the numbers we have (the snapshot carries no sky/cloud code)"""
+  words = []
+  if temperature is not None:
+    words.append("hot" if temperature >= 30 else "warm" if temperature >= 22 else "mild" if temperature >= 15 else "cool" if temperature >= 5 else "cold")
+  if humidity is not None and humidity >= 80:
+    words.append("humid")
+  elif humidity is not None and humidity <= 30:
+    words.append("dry")
+  if wind is not None and wind >= 8.0:
+    words.append("windy")
+  elif wind is not None and wind >= 5.5:
+    words.append("breezy")
+  elif wind is not None and wind < 1.5:
+    words.append("calm")
+  return ", ".join(words).capitalize() if words else "Not available"
+
+def _air_quality_line(air_quality: Dict[str, Any]) -> Optional[str]:
+  pm2_5 = _num(((air_quality or {}).get("pm2_5") or {}).get("current"))
+  pm10 = _num(((air_quality or {}).get("pm10") or {}).get("current"))
+  if pm2_5 is None and pm10 is None:
+    return None
+  return f"PM2.5 {_fmt(pm2_5, ' µg/m³', 1)}, PM10 {_fmt(pm10, ' µg/m³', 1)}"
+
+def _risk_for(risk_report: Dict[str, Any], snapshot: Dict[str, Any]) -> Dict[str, Any]:
+  """Risk of one location, matched by location id (the report and the snapshots are not
+  guaranteed to list the locations in the same order). A flat report covers a single location"""
+  if not isinstance(risk_report.get("locations"), list):
+    return risk_report
+  key = snapshot_location_id(snapshot)
+  for report in risk_report["locations"]:
+    if isinstance(report, dict) and key is not None and report.get("location_id") == key:
+      return report
+  return {}
+
+def _location_section(snapshot: Dict[str, Any], risk: Dict[str, Any], index: int) -> List[str]:
+  location = snapshot.get("location") or {}
+  current = snapshot.get("current") or {}
+  temperature = _num(current.get("temperature_c"))
+  feels_like = _num(current.get("apparent_temperature_c"))
+  wind = _num(current.get("wind_speed_10m_ms"))
+  humidity = _num(current.get("relative_humidity_percent"))
+
+  temperature_text = _fmt(temperature, "°C")
+  if temperature is not None and feels_like is not None:
+    temperature_text += f" (feels like {feels_like:.0f}°C)"
+  wind_text = _fmt(wind, " m/s", 1)
+  if wind is not None:
+    wind_text += f" ({_wind_label(wind)})"
+
+  lines = [
+    f"### {location.get('name') or f'Location {index + 1}'}",
+    f"- **Temperature:** {temperature_text}",
+    f"- **Wind:** {wind_text}",
+    f"- **Humidity:** {_fmt(humidity, '%')}",
+    f"- **Conditions:** {_describe(feels_like if feels_like is not None else temperature, wind, humidity)}"
+  ]
+  air_quality = _air_quality_line(snapshot.get("air_quality") or {})
+  if air_quality:
+    lines.append(f"- **Air quality:** {air_quality}")
+  if risk.get("overall_risk"):
+    lines.append(f"- **Overall risk:** {risk['overall_risk']}")
+  if snapshot.get("stale"):
+    lines.append(f"- _Data is about {int(snapshot.get('age_seconds', 0)) // 60} minutes old and is being refreshed._")
+  return lines
+
+def render_current_conditions(snapshot: Union[Dict[str, Any], List[Dict[str, Any]], None], risk_report: Optional[Dict[str, Any]] = None, errors: Optional[List[Dict[str, Any]]] = None) -> Optional[str]:
+  """TYPE 1 "Current Weather Conditions" markdown for one or several snapshots, None without data.
+  `errors` are the locations that could not be fetched (env_snapshot_errors)"""
+  snapshots = snapshot if isinstance(snapshot, list) else [snapshot] if isinstance(snapshot, dict) else []
+  snapshots = [s for s in snapshots if isinstance(s, dict) and s.get("current")]
+  if not snapshots:
+    return None
+  risk_report = risk_report if isinstance(risk_report, dict) else {}
+
+  lines = ["## Current Weather Conditions", ""]
+  for i, s in enumerate(snapshots):
+    lines.extend(_location_section(s, _risk_for(risk_report, s), i))
+    lines.append("")
+  missing = [e.get("name") or f"{e.get('latitude')}, {e.get('longitude')}" for e in errors or [] if isinstance(e, dict)]
+  if missing:
+    lines.extend([f"_No data could be fetched for {', '.join(missing)}._", ""])
+  if len(snapshots) > 1 and risk_report.get("rationale"):
+    lines.extend([risk_report["rationale"], ""])
+  return "\n".join(lines).rstrip()
@@ -0,0 +1,132 @@
+"""
+NumPy reductions of the hourly PM10 / PM2.5 series into the short summary the agents read.
+"""
+import logging
+from bisect import bisect_right
+
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from weather_advisor_agent.config import TheophrastusConfiguration
+
+logger = logging.getLogger(__name__)
+
+# WHO 2021 air quality guidelines, 24-hour mean in µg/m³
+WHO_THRESHOLDS = {
+  "pm2_5": 15.0,
+  "pm10": 45.0
+}
+
+Series = Optional[Sequence[Optional[float]]]
+
+def to_matrix(rows: Sequence[Series]) -> np.ndarray:
+  """Stacks hourly series into an N x H float matrix, None values and ragged tails become NaN"""
+  lengths = {len(row) if row else 0 for row in rows}
+  if len(lengths) == 1 and 0 not in lengths:
+    return np.array(rows, dtype=float)
+  width = max(lengths | {1})
+  matrix = np.full((len(rows), width), np.nan)
+  for i, row in enumerate(rows):
+    if row:
+      matrix[i, :len(row)] = np.asarray(row, dtype=float)
+  return matrix
+
+def current_hour_index(hourly_times: Optional[Sequence[str]], current_time: Optional[str]) -> int:
+  """Position of the current hour in the hourly series (ISO timestamps compare as strings)"""
+  if not hourly_times or not current_time:
+    return 0
+  return max(0, bisect_right(hourly_times, current_time) - 1)
+
+def _window(matrix: np.ndarray, starts: np.ndarray, hours: int) -> np.ndarray:
+  """N x hours slice starting at each row's own index, NaN past the end of the forecast"""
+  width = matrix.shape[1]
+  idx = starts[:, None] + np.arange(hours)[None, :]
+  values = np.take_along_axis(matrix, np.minimum(idx, width - 1), axis=1)
+  values[idx >= width] = np.nan
+  return values
+
+def _nanmean(values: np.ndarray) -> np.ndarray:
+  counts = np.sum(~np.isnan(values), axis=-1)
+  sums = np.nansum(values, axis=-1)
+  return np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+
+def _rolling_mean(values: np.ndarray, hours: int) -> np.ndarray:
+  """Mean of every `hours`-long window along the rows, NaN for windows without data"""
+  present = ~np.isnan(values)
+  sums = np.cumsum(np.where(present, values, 0.0), axis=1)
+  counts = np.cumsum(present, axis=1)
+  sums = np.concatenate([np.zeros((values.shape[0], 1)), sums], axis=1)
+  counts = np.concatenate([np.zeros((values.shape[0], 1)), counts], axis=1)
+  window_sums = sums[:, hours:] - sums[:, :-hours]
+  window_counts = counts[:, hours:] - counts[:, :-hours]
+  return np.divide(window_sums, window_counts, out=np.full(window_sums.shape, np.nan), where=window_counts > 0)
+
+def _values(x: np.ndarray) -> List[Optional[float]]:
+  """Rounded Python floats, None where there is no data"""
+  return np.where(np.isnan(x), None, np.round(x, 1)).tolist()
+
+def summarize_air_quality_batch(pm10_rows: Sequence[Series],
+  pm2_5_rows: Sequence[Series],
+  start_indices: Optional[Sequence[int]] = None,
+  times_rows: Optional[Sequence[Optional[Sequence[str]]]] = None) -> List[Dict[str, Any]]:
+  """Summaries for N locations computed over N x H matrices in one pass"""
+  series = {"pm10": to_matrix(pm10_rows), "pm2_5": to_matrix(pm2_5_rows)}
+  n = len(pm10_rows)
+  starts = np.asarray(start_indices if start_indices is not None else [0] * n, dtype=int)
+  worst_hours = TheophrastusConfiguration.air_quality_worst_window_hours
+
+  rolling: Dict[str, np.ndarray] = {}
+  stats: Dict[str, Dict[str, List[Any]]] = {}
+  for pollutant, matrix in series.items():
+    next_24h = _window(matrix, starts, 24)
+    next_6h = next_24h[:, :6]
+    rolling[pollutant] = _rolling_mean(next_24h, worst_hours)
+    stats[pollutant] = {
+      "current": _values(next_24h[:, 0]),
+      "max_6h": _values(np.fmax.reduce(next_6h, axis=1)),
+      "mean_6h": _values(_nanmean(next_6h)),
+      "max_24h": _values(np.fmax.reduce(next_24h, axis=1)),
+      "mean_24h": _values(_nanmean(next_24h)),
+      "hours_above_who": np.sum(next_24h > WHO_THRESHOLDS[pollutant], axis=1).tolist()
+    }
+
+  # Worst window: highest rolling mean relative to the WHO guideline, whichever pollutant drives it
+  score = np.fmax(rolling["pm2_5"] / WHO_THRESHOLDS["pm2_5"], rolling["pm10"] / WHO_THRESHOLDS["pm10"])
+  has_window = (~np.all(np.isnan(score), axis=1)).tolist()
+  worst = np.argmax(np.where(np.isnan(score), -np.inf, score), axis=1)
+  rows = np.arange(n)
+  worst_pm2_5 = _values(rolling["pm2_5"][rows, worst])
+  worst_pm10 = _values(rolling["pm10"][rows, worst])
+  worst = worst.tolist()
+  starts = starts.tolist()
+
+  summaries = []
+  for i in range(n):
+    summary: Dict[str, Any] = {}
+    for pollutant, s in stats.items():
+      summary[pollutant] = {
+        "current": s["current"][i],
+        "next_6h": {"max": s["max_6h"][i], "mean": s["mean_6h"][i]},
+        "next_24h": {"max": s["max_24h"][i], "mean": s["mean_24h"][i]},
+        "hours_above_who_24h": s["hours_above_who"][i]
+      }
+
+    if has_window[i]:
+      times = times_rows[i] if times_rows is not None else None
+      position = starts[i] + worst[i]
+      summary["worst_window"] = {
+        "start": times[position] if times and position < len(times) else None,
+        "starts_in_hours": worst[i],
+        "hours": worst_hours,
+        "pm2_5_mean": worst_pm2_5[i],
+        "pm10_mean": worst_pm10[i]
+      }
+    else:
+      summary["worst_window"] = None
+    summaries.append(summary)
+  return summaries
+
+def summarize_air_quality(pm10: Series, pm2_5: Series, start_index: int = 0, times: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+  """Summary for a single location"""
+  return summarize_air_quality_batch([pm10], [pm2_5], [start_index], [times])[0]
@@ -0,0 +1,187 @@
+"""
+Background warmer for the most requested locations: interest comes from favorites, the query
+history and router turns, and the top places stay geocoded with their snapshots cached.
+"""
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+from google.adk.agents.callback_context import CallbackContext
+
+from weather_advisor_agent.config import TheophrastusConfiguration
+from weather_advisor_agent.utils.local_observability import Theophrastus_Observability
+from weather_advisor_agent.utils.snapshot_cache import Theophrastus_SnapshotCache
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_LOCATIONS = 1000
+# Users whose persisted favorites and history were already counted
+MAX_SEEDED_USERS = 10000
+
+# Interest weights: a favorite is a standing interest, a query a one-off
+FAVORITE_INTEREST = 3.0
+QUERY_INTEREST = 1.0
+
+
+class TheophrastusCacheWarmer:
+  """Interest-ranked background warmer for geocodes and snapshots."""
+  def __init__(self, max_locations: int, request_budget: int, delay_seconds: int, coordinates_ttl_seconds: int, negative_ttl_seconds: int):
+    self.max_locations = max_locations
+    self.request_budget = request_budget
+    self.delay_seconds = delay_seconds
+    self.coordinates_ttl_seconds = coordinates_ttl_seconds
+    self.negative_ttl_seconds = negative_ttl_seconds
+    self._lock = threading.Lock()
+    self._interest: Dict[str, Dict[str, Any]] = {}
+    # name -> ((lat, lon) or None once the geocoder found nothing, expires_at)
+    self._coordinates: Dict[str, Tuple[Optional[Tuple[float, float]], float]] = {}
+    self._seeded: "OrderedDict[str, bool]" = OrderedDict()
+    self._stop = threading.Event()
+    self._thread: Optional[threading.Thread] = None
+    self._resolver: Optional[Callable[[str], Optional[Tuple[float, float]]]] = None
+    self._fetch: Optional[Callable[[float, float], bool]] = None
+
+  def record_interest(self, location_name: str, weight: float = 1.0) -> None:
+    """Called by the memory tools: favorites and queried locations raise a place's rank"""
+    name = " ".join((location_name or "").split())
+    if not name:
+      return
+    key = name.lower()
+    with self._lock:
+      entry = self._interest.setdefault(key, {"name": name, "score": 0.0})
+      entry["score"] = max(0.0, entry["score"] + weight)
+      if entry["score"] == 0:
+        del self._interest[key]
+      while len(self._interest) > MAX_TRACKED_LOCATIONS:
+        del self._interest[min(self._interest, key=lambda k: self._interest[k]["score"])]
+
+  def seed_from_state(self, user_key: str, state: Any) -> bool:
+    """Counts a user's persisted favorites and query history once per process, returns False when
+    the user was already seeded. Later changes arrive through record_interest"""
+    with self._lock:
+      if user_key in self._seeded:
+        self._seeded.move_to_end(user_key)
+        return False
+      self._seeded[user_key] = True
+      while len(self._seeded) > MAX_SEEDED_USERS:
+        self._seeded.popitem(last=False)
+    favorites = state.get("user:favorite_locations") or {}
+    for name in favorites:
+      self.record_interest(name, FAVORITE_INTEREST)
+    for query in state.get("user:query_history") or []:
+      if isinstance(query, dict):
+        self.record_interest(query.get("location"), QUERY_INTEREST)
+    return True
+
+  def top_locations(self) -> List[Tuple[str, float]]:
+    with self._lock:
+      ranked = sorted(self._interest.values(), key=lambda e: e["score"], reverse=True)
+    return [(e["name"], e["score"]) for e in ranked[:self.max_locations]]
+
+  def _cached_coordinates(self, name: str) -> Tuple[bool, Optional[Tuple[float, float]]]:
+    """(found, coordinates) from the resolved names, expired entries count as not found"""
+    with self._lock:
+      entry = self._coordinates.get(name.lower())
+    if entry is None or entry[1] <= time.time():
+      return False, None
+    return True, entry[0]
+
+  def _resolve(self, name: str) -> Optional[Tuple[float, float]]:
+    coordinates = self._resolver(name)
+    ttl = self.coordinates_ttl_seconds if coordinates is not None else self.negative_ttl_seconds
+    with self._lock:
+      self._coordinates[name.lower()] = (coordinates, time.time() + ttl)
+      while len(self._coordinates) > MAX_TRACKED_LOCATIONS:
+        del self._coordinates[min(self._coordinates, key=lambda k: self._coordinates[k][1])]
+    return coordinates
+
+  def warm_once(self) -> Dict[str, int]:
+    """One warming pass over the top locations within the request budget"""
+    top = self.top_locations()
+    requests = 0
+    warm = 0
+    for name, _ in top:
+      found, coordinates = self._cached_coordinates(name)
+      if not found:
+        if requests >= self.request_budget:
+          break
+        requests += 1
+        try:
+          coordinates = self._resolve(name)
+        except Exception as e:
+          logger.warning(f"Cache warmer could not geocode {name}: {e}")
+          continue
+      if coordinates is None:
+        continue
+
+      if not Theophrastus_SnapshotCache.contains(*coordinates):
+        if requests >= self.request_budget:
+          break
+        requests += 1
+        try:
+          if self._fetch(*coordinates):
+            Theophrastus_SnapshotCache.mark_warm(*coordinates)
+        except Exception as e:
+          logger.warning(f"Cache warmer could not fetch {name}: {e}")
+          continue
+      warm += 1
+
+    Theophrastus_Observability.log_cache_warm(warm_set_size=warm, requests=requests, candidates=len(top))
+    return {"warm": warm, "requests": requests, "candidates": len(top)}
+
+  def _run(self) -> None:
+    while not self._stop.is_set():
+      try:
+        self.warm_once()
+      except Exception as e:
+        Theophrastus_Observability.log_error("cache_warmer", e)
+      # Wake up just after the next upstream model update, when the cached snapshots expire
+      wait = Theophrastus_SnapshotCache.next_model_refresh() + self.delay_seconds - time.time()
+      self._stop.wait(max(wait, 1.0))
+
+  def start(self, resolver: Callable[[str], Optional[Tuple[float, float]]], fetch: Callable[[float, float], bool]) -> None:
+    """Starts the warmer thread. `resolver` is resolve_place_coordinates (no tool-call metrics),
+    `fetch` warms one location and returns False when the cell was already cached"""
+    if self._thread is not None and self._thread.is_alive():
+      return
+    self._resolver = resolver
+    self._fetch = fetch
+    self._stop.clear()
+    self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+    self._thread.start()
+    logger.info(f"Cache warmer started (top {self.max_locations} locations, {self.request_budget} requests per cycle).")
+
+  def stop(self) -> None:
+    self._stop.set()
+
+  def get_stats(self) -> Dict[str, Any]:
+    now = time.time()
+    with self._lock:
+      tracked = len(self._interest)
+      geocoded = sum(1 for c, expires_at in self._coordinates.values() if c is not None and expires_at > now)
+    return {
+      "running": self._thread is not None and self._thread.is_alive(),
+      "tracked_locations": tracked,
+      "geocoded_locations": geocoded,
+      "max_locations": self.max_locations,
+      "request_budget": self.request_budget
+    }
+
+
+Theophrastus_CacheWarmer = TheophrastusCacheWarmer(
+  max_locations=TheophrastusConfiguration.cache_warmer_max_locations,
+  request_budget=TheophrastusConfiguration.cache_warmer_request_budget,
+  delay_seconds=TheophrastusConfiguration.cache_warmer_delay_seconds,
+  coordinates_ttl_seconds=TheophrastusConfiguration.geocode_cache_ttl_seconds,
+  negative_ttl_seconds=TheophrastusConfiguration.geocode_cache_negative_ttl_seconds
+)
+
+def cache_warmer_seed_callback(callback_context: CallbackContext):
+  """before_agent_callback of the root agent: seeds the warmer from the user's persisted state"""
+  if TheophrastusConfiguration.cache_warmer_enabled:
+    session = callback_context.session
+    Theophrastus_CacheWarmer.seed_from_state(getattr(session, "user_id", None) or session.id, callback_context.state)
+  return None
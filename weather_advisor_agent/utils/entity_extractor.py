@@ -0,0 +1,225 @@
+"""
+Local place and activity extraction from the user message, places resolved against the gazetteer.
+"""
+import re
+import json
+import logging
+from dataclasses import dataclass, field
+
+from typing import Dict, Any, List, Optional, Tuple
+
+from weather_advisor_agent.config import TheophrastusConfiguration
+from weather_advisor_agent.utils.gazetteer import Theophrastus_Gazetteer
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_LEXICON: Dict[str, List[str]] = {
+  "hiking": ["hike", "hikes", "hiking", "hiker", "trek", "treks", "trekking"],
+  "running": ["run", "runs", "running", "jog", "jogging", "marathon"],
+  "cycling": ["cycle", "cycling", "bike", "biking", "bicycle", "mountain biking"],
+  "camping": ["camp", "camping", "campsite", "tent"],
+  "climbing": ["climb", "climbing", "bouldering", "mountaineering"],
+  "swimming": ["swim", "swimming"],
+  "kayaking": ["kayak", "kayaking", "canoe", "canoeing", "paddling", "rafting"],
+  "fishing": ["fish", "fishing"],
+  "skiing": ["ski", "skiing", "snowboard", "snowboarding"],
+  "surfing": ["surf", "surfing"],
+  "stargazing": ["stargazing", "stars", "astronomy", "northern lights", "aurora", "auroras", "aurora borealis", "auroras borealis"],
+  "birdwatching": ["birdwatching", "birding"],
+  "picnic": ["picnic", "picnicking"]
+}
+
+ACTIVITY_PATTERN = re.compile(
+  r"\b(" + "|".join(sorted({re.escape(w) for words in ACTIVITY_LEXICON.values() for w in words}, key=len, reverse=True)) + r")\b",
+  re.IGNORECASE
+)
+ACTIVITY_BY_WORD = {w: activity for activity, words in ACTIVITY_LEXICON.items() for w in words}
+
+# "in my city Guadalajara, Jalisco", "near Stockholm", "around lake tahoe"
+LOCATIVE = re.compile(
+  r"\b(?:in|near|around|at|close to|outside of|outside|visit|visiting)\s+(?:my (?:city|town|hometown)\s+|the city of\s+)?([^.?!;:()]+)",
+  re.IGNORECASE
+)
+SPAN_END = re.compile(
+  r"\s+(?:this|today|tomorrow|tonight|right|now|next|on|during|for|and|but|with|what|how|is|are|will|if|so|because|please|\d)\b.*$",
+  re.IGNORECASE
+)
+CAPITALIZED_RUN = re.compile(r"(?:[A-ZÀ-Þ][\w'-]*)(?:(?:\s+|,\s*)(?:(?:de|del|la|las|los|el|of|the|upon|am|sur)\s+)*[A-ZÀ-Þ][\w'-]*)*")
+KNOWN_LOCATIONS = re.compile(
+  r"\b(those|these|them|both|each of|all of the|all the|the same|the other) (locations?|places?|spots?|options?|ones?|parks?|trails?)\b|\b(both|all) of them\b",
+  re.IGNORECASE
+)
+
+NOT_PLACES = {
+  "i", "i'm", "i'd", "i'll", "what", "what's", "how", "how's", "is", "are", "can", "could", "should", "would", "will", "do",
+  "does", "the", "a", "an", "find", "generate", "tell", "show", "please", "hi", "hello", "hey", "compare", "which", "where",
+  "when", "why", "who", "my", "me", "it", "this", "that", "those", "these", "there", "here", "today", "tomorrow", "tonight",
+  "weekend", "weather", "save", "remember", "thanks", "any", "some", "let", "let's", "give", "monday", "tuesday", "wednesday",
+  "thursday", "friday", "saturday", "sunday", "now", "home"
+}
+
+MATCH_CONFIDENCE = {
+  "exact": 0.9,
+  "alias": 0.85,
+  "prefix": 0.7,
+  "fuzzy": 0.6
+}
+AMBIGUITY_MARGIN = 0.02
+
+
+@dataclass
+class ExtractedEntities:
+  place_text: Optional[str] = None
+  place: Optional[Dict[str, Any]] = None
+  activity: Optional[str] = None
+  activities: List[str] = field(default_factory=list)
+  refers_to_known_locations: bool = False
+  mentions_place: bool = False
+  confidence: float = 0.0
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {
+      "place_text": self.place_text,
+      "place": self.place,
+      "activity": self.activity,
+      "refers_to_known_locations": self.refers_to_known_locations,
+      "mentions_place": self.mentions_place,
+      "confidence": self.confidence
+    }
+
+
+def extract_activities(message: str) -> List[str]:
+  """Canonical activities in the order they are mentioned"""
+  activities: List[str] = []
+  for match in ACTIVITY_PATTERN.finditer(message):
+    activity = ACTIVITY_BY_WORD[match.group(1).lower()]
+    if activity not in activities:
+      activities.append(activity)
+  return activities
+
+def _trim(span: str) -> str:
+  return SPAN_END.sub("", span).strip(" ,'\"")
+
+def place_candidates(message: str) -> List[Tuple[str, bool]]:
+  """(text, capitalized) place candidates, locative spans first, then capitalized runs"""
+  candidates: List[Tuple[str, bool]] = []
+  for match in LOCATIVE.finditer(message):
+    span = _trim(match.group(1))
+    if span and span.split()[0].lower() not in NOT_PLACES and len(span.split()) <= 6:
+      candidates.append((span, span[0].isupper()))
+  for match in CAPITALIZED_RUN.finditer(message):
+    words = match.group(0).split()
+    while words and words[0].strip(",").lower() in NOT_PLACES:
+      words = words[1:]
+    span = " ".join(words).strip(" ,")
+    if span and span.lower() not in NOT_PLACES:
+      candidates.append((span, True))
+
+  seen = set()
+  unique = []
+  for text, capitalized in candidates:
+    if text.lower() not in seen:
+      seen.add(text.lower())
+      unique.append((text, capitalized))
+  return unique
+
+def _resolve(text: str, capitalized: bool) -> Tuple[Optional[Dict[str, Any]], float]:
+  """Best gazetteer match and its confidence. Lower-case spans only count on exact/alias hits,
+  capitalized ones may also match by prefix or fuzzy and are shortened from the right"""
+  attempts = [text]
+  if capitalized and "," not in text:
+    words = text.split()
+    attempts += [" ".join(words[:n]) for n in range(len(words) - 1, 0, -1)]
+
+  for attempt in attempts:
+    results = Theophrastus_Gazetteer.search(attempt, max_results=2, fuzzy=capitalized)
+    if not capitalized:
+      results = [r for r in results if r["match"] in ("exact", "alias")]
+    if not results:
+      continue
+    best = results[0]
+    confidence = MATCH_CONFIDENCE[best["match"]]
+    if len(results) > 1 and best["score"] - results[1]["score"] < AMBIGUITY_MARGIN:
+      confidence *= 0.8
+    if attempt != text:
+      confidence *= 0.9
+    return best, round(confidence, 3)
+  return None, 0.0
+
+def extract_entities(message: Optional[str]) -> ExtractedEntities:
+  """Place and activity from one user message"""
+  message = message or ""
+  activities = extract_activities(message)
+  candidates = place_candidates(message)
+  entities = ExtractedEntities(
+    activity=activities[0] if activities else None,
+    activities=activities,
+    refers_to_known_locations=bool(KNOWN_LOCATIONS.search(message)),
+    mentions_place=bool(candidates)
+  )
+  if not Theophrastus_Gazetteer.available():
+    return entities
+
+  for text, capitalized in candidates:
+    place, confidence = _resolve(text, capitalized)
+    if place:
+      entities.place_text = text
+      entities.place = place
+      entities.confidence = confidence
+      break
+  return entities
+
+def _state_value(state: Dict[str, Any], key: str) -> Any:
+  value = state.get(key)
+  if isinstance(value, str):
+    try:
+      return json.loads(value)
+    except json.JSONDecodeError:
+      return None
+  return value
+
+def _with_coordinates(locations: List[Any]) -> List[Dict[str, Any]]:
+  return [l for l in locations if isinstance(l, dict) and isinstance(l.get("latitude"), (int, float)) and isinstance(l.get("longitude"), (int, float))]
+
+def known_location_targets(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+  """Location options from state that already carry coordinates"""
+  options = _state_value(state, "env_location_options")
+  return _with_coordinates(options) if isinstance(options, list) else []
+
+def snapshot_location_targets(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+  """Locations of the last stored snapshot(s), i.e. the places the previous weather turn was about"""
+  snapshot = _state_value(state, "env_snapshot")
+  snapshots = snapshot if isinstance(snapshot, list) else [snapshot] if isinstance(snapshot, dict) else []
+  return _with_coordinates([s.get("location") for s in snapshots if isinstance(s, dict)])
+
+def entities_state_delta(state: Dict[str, Any], entities: ExtractedEntities) -> Dict[str, Any]:
+  """State changes for the agents' instructions ({env_extracted_place?}, {env_extracted_activity?}),
+  clearing last turn's values"""
+  delta: Dict[str, Any] = {}
+  for key, value in (("env_extracted_place", entities.place_text), ("env_extracted_activity", entities.activity)):
+    if value:
+      delta[key] = value
+    elif key in state:
+      delta[key] = ""
+
+  if entities.activity:
+    profile = state.get("env_activity_profile")
+    profile = dict(profile) if isinstance(profile, dict) else {}
+    profile["activity"] = entities.activity
+    delta["env_activity_profile"] = profile
+  return delta
+
+def apply_entities(state: Dict[str, Any], entities: ExtractedEntities) -> None:
+  """Writes the extracted values into a delta-tracked state (callback_context.state)"""
+  for key, value in entities_state_delta(state, entities).items():
+    state[key] = value
+
+def latest_location_targets(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+  """Locations of whichever was written last, the location options or the snapshot, falling back
+  to the other one: after a location search, a follow-up without a place is about its options"""
+  if state.get("env_latest_locations") == "options":
+    return known_location_targets(state) or snapshot_location_targets(state)
+  return snapshot_location_targets(state) or known_location_targets(state)
+
+def is_confident(entities: ExtractedEntities) -> bool:
+  return entities.place is not None and entities.confidence >= TheophrastusConfiguration.entity_extractor_min_confidence
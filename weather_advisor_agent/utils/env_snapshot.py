@@ -0,0 +1,159 @@
+"""
+Compact snapshot schema kept in session state. The raw Open-Meteo payload stays in a bounded
+in-memory store and the snapshot only keeps its `raw_ref`.
+"""
+import json
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from typing import Dict, Any, Optional
+
+from weather_advisor_agent.config import TheophrastusConfiguration
+from weather_advisor_agent.utils.local_observability import Theophrastus_Observability
+
+logger = logging.getLogger(__name__)
+
+def location_id(latitude: float, longitude: float) -> str:
+  """Stable key of a location, same rounding as the snapshot registry"""
+  return f"{round(float(latitude), 4)},{round(float(longitude), 4)}"
+
+def snapshot_location_id(snapshot: Dict[str, Any]) -> Optional[str]:
+  """The snapshot's location id, derived from its coordinates when it carries none"""
+  location = snapshot.get("location") or {}
+  if location.get("id"):
+    return location["id"]
+  latitude, longitude = location.get("latitude"), location.get("longitude")
+  if isinstance(latitude, (int, float)) and isinstance(longitude, (int, float)):
+    return location_id(latitude, longitude)
+  return None
+
+NUMERIC_FIELDS = ("temperature_c", "apparent_temperature_c", "relative_humidity_percent", "wind_speed_10m_ms")
+
+def _is_number(value: Any) -> bool:
+  return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+@dataclass(slots=True)
+class EnvSnapshot:
+  """Schema of the snapshots kept in state, checked on construction (ValueError on a bad field)"""
+  latitude: float
+  longitude: float
+  name: Optional[str] = None
+  location_id: Optional[str] = None
+  temperature_c: Optional[float] = None
+  apparent_temperature_c: Optional[float] = None
+  relative_humidity_percent: Optional[float] = None
+  wind_speed_10m_ms: Optional[float] = None
+  air_quality: Dict[str, Any] = field(default_factory=dict)
+  age_seconds: int = 0
+  stale: bool = False
+  raw_ref: Optional[str] = None
+
+  def __post_init__(self):
+    if not _is_number(self.latitude) or not -90 <= self.latitude <= 90:
+      raise ValueError(f"EnvSnapshot latitude must be a number in [-90, 90], got {self.latitude!r}")
+    if not _is_number(self.longitude) or not -180 <= self.longitude <= 180:
+      raise ValueError(f"EnvSnapshot longitude must be a number in [-180, 180], got {self.longitude!r}")
+    for name in NUMERIC_FIELDS:
+      value = getattr(self, name)
+      if value is not None and not _is_number(value):
+        raise ValueError(f"EnvSnapshot {name} must be a number or None, got {value!r}")
+    if not isinstance(self.air_quality, dict):
+      raise ValueError(f"EnvSnapshot air_quality must be a dict, got {type(self.air_quality).__name__}")
+    if not isinstance(self.age_seconds, int) or self.age_seconds < 0:
+      raise ValueError(f"EnvSnapshot age_seconds must be a non-negative int, got {self.age_seconds!r}")
+    for name in ("name", "location_id", "raw_ref"):
+      value = getattr(self, name)
+      if value is not None and not isinstance(value, str):
+        raise ValueError(f"EnvSnapshot {name} must be a string or None, got {value!r}")
+    self.stale = bool(self.stale)
+
+  @classmethod
+  def from_snapshot(cls, snapshot: Dict[str, Any], raw_ref: Optional[str] = None) -> "EnvSnapshot":
+    location = snapshot.get("location") or {}
+    current = snapshot.get("current") or {}
+    return cls(
+      latitude=location.get("latitude"),
+      longitude=location.get("longitude"),
+      name=location.get("name"),
+      location_id=location.get("id"),
+      temperature_c=current.get("temperature_c"),
+      apparent_temperature_c=current.get("apparent_temperature_c"),
+      relative_humidity_percent=current.get("relative_humidity_percent"),
+      wind_speed_10m_ms=current.get("wind_speed_10m_ms"),
+      air_quality=snapshot.get("air_quality") or {},
+      age_seconds=snapshot.get("age_seconds", 0),
+      stale=snapshot.get("stale", False),
+      raw_ref=raw_ref
+    )
+
+  def to_dict(self) -> Dict[str, Any]:
+    """Same layout the agents already read, without the raw payload"""
+    location = {"latitude": self.latitude, "longitude": self.longitude}
+    if self.name is not None:
+      location["name"] = self.name
+    if self.location_id is not None:
+      location["id"] = self.location_id
+    return {
+      "location": location,
+      "current": {
+        "temperature_c": self.temperature_c,
+        "apparent_temperature_c": self.apparent_temperature_c,
+        "relative_humidity_percent": self.relative_humidity_percent,
+        "wind_speed_10m_ms": self.wind_speed_10m_ms
+      },
+      "air_quality": self.air_quality,
+      "age_seconds": self.age_seconds,
+      "stale": self.stale,
+      "raw_ref": self.raw_ref
+    }
+
+
+class TheophrastusRawPayloadStore:
+  """Bounded in-memory side store for the raw Open-Meteo payloads."""
+  def __init__(self, max_entries: int):
+    self.max_entries = max_entries
+    self._lock = threading.Lock()
+    self._payloads: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+  def put(self, payload: Dict[str, Any]) -> str:
+    ref = f"raw-{uuid.uuid4().hex[:16]}"
+    with self._lock:
+      self._payloads[ref] = payload
+      while len(self._payloads) > self.max_entries:
+        self._payloads.popitem(last=False)
+    return ref
+
+  def get(self, ref: str) -> Optional[Dict[str, Any]]:
+    """Raw payload behind a snapshot's raw_ref. None when it was evicted (only the last
+    `max_entries` payloads are kept) while the snapshot still sits in session state"""
+    with self._lock:
+      payload = self._payloads.get(ref)
+      if payload is not None:
+        self._payloads.move_to_end(ref)
+    Theophrastus_Observability.log_cache_access("raw_payload", hit=payload is not None, key=ref or "")
+    if payload is None:
+      logger.warning(f"Raw payload {ref} is no longer stored (evicted past {self.max_entries} entries).")
+    return payload
+
+  def __len__(self) -> int:
+    with self._lock:
+      return len(self._payloads)
+
+
+Theophrastus_RawPayloadStore = TheophrastusRawPayloadStore(
+  max_entries=TheophrastusConfiguration.raw_payload_store_max_entries
+)
+
+def compact_snapshot(snapshot: Dict[str, Any], invocation_id: str = "") -> Dict[str, Any]:
+  """Compact form of a tool snapshot, the raw payload goes to the side store"""
+  raw = snapshot.get("raw")
+  raw_ref = Theophrastus_RawPayloadStore.put(raw) if raw is not None else None
+  compact = EnvSnapshot.from_snapshot(snapshot, raw_ref=raw_ref).to_dict()
+
+  full_bytes = len(json.dumps(snapshot, default=str))
+  compact_bytes = len(json.dumps(compact, default=str))
+  Theophrastus_Observability.log_snapshot_compaction(invocation_id, full_bytes, compact_bytes)
+  return compact
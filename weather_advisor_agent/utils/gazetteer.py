@@ -0,0 +1,329 @@
+"""
+Offline gazetteer: a memory-mapped SQLite index built from a GeoNames dump, first tier of geocode_place_name.
+
+Build the index with:
+  python -m weather_advisor_agent.utils.gazetteer build cities15000.txt \
+    --admin1 admin1CodesASCII.txt --countries countryInfo.txt
+"""
+import re
+import math
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+import unicodedata
+from difflib import SequenceMatcher
+from pathlib import Path
+
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from weather_advisor_agent.config import TheophrastusConfiguration
+
+logger = logging.getLogger(__name__)
+
+MATCH_QUALITY = {
+  "exact": 1.0,
+  "alias": 0.9,
+  "prefix": 0.7,
+  "fuzzy": 0.6
+}
+POPULATION_WEIGHT = 0.25
+REGION_BOOST = 0.5
+FUZZY_CANDIDATES = 64
+MIN_PREFIX_LENGTH = 4
+MAX_ALIAS_LENGTH = 64
+
+def normalize(text: str) -> str:
+  """Lowercase, accent-free, punctuation-free form used as lookup key"""
+  text = text or ""
+  if not text.isascii():
+    text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+  text = text.lower()
+  return " ".join(re.sub(r"[^\w]+", " ", text).split())
+
+def trigrams(norm: str) -> List[str]:
+  padded = f"  {norm} "
+  return list({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+class TheophrastusGazetteer:
+  """Offline place-name index (read side)."""
+  def __init__(self, index_path: str, mmap_bytes: int, fuzzy_threshold: float, geocode_min_similarity: float):
+    self.index_path = Path(index_path)
+    self.mmap_bytes = mmap_bytes
+    self.fuzzy_threshold = fuzzy_threshold
+    self.geocode_min_similarity = geocode_min_similarity
+    self._local = threading.local()
+    self._missing_logged = False
+
+  def available(self) -> bool:
+    if self.index_path.exists():
+      return True
+    if not self._missing_logged:
+      logger.info(
+        f"No gazetteer index at {self.index_path}, geocoding goes to the API. "
+        "Build it with `python -m weather_advisor_agent.utils.gazetteer build <GeoNames dump>`."
+      )
+      self._missing_logged = True
+    return False
+
+  def _connection(self) -> sqlite3.Connection:
+    """One read-only, memory-mapped connection per thread"""
+    conn = getattr(self._local, "conn", None)
+    if conn is None:
+      conn = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True, check_same_thread=False)
+      conn.execute(f"PRAGMA mmap_size={int(self.mmap_bytes)}")
+      conn.execute("PRAGMA query_only=1")
+      self._local.conn = conn
+    return conn
+
+  @staticmethod
+  def _filters(country: Optional[str], admin1: Optional[str]) -> Tuple[str, List[Any]]:
+    sql, params = "", []
+    if country:
+      sql += " AND (p.country_norm = ? OR p.country_code = ?)"
+      params += [normalize(country), country.strip().upper()]
+    if admin1:
+      sql += " AND p.admin1_norm = ?"
+      params.append(normalize(admin1))
+    return sql, params
+
+  def _lookup(self, where: str, params: List[Any], country: Optional[str], admin1: Optional[str], limit: int) -> List[Tuple]:
+    filter_sql, filter_params = self._filters(country, admin1)
+    return self._connection().execute(
+      "SELECT p.id, p.name, p.latitude, p.longitude, p.country, p.admin1, p.population, p.country_norm, p.admin1_norm, k.norm, n.is_alias "
+      "FROM norms k JOIN names n ON n.norm_id = k.id JOIN places p ON p.id = n.place_id "
+      f"WHERE {where}{filter_sql} "
+      "ORDER BY p.population DESC LIMIT ?",
+      params + filter_params + [limit]
+    ).fetchall()
+
+  def _fuzzy_norms(self, norm: str) -> List[Tuple[str, float]]:
+    """Indexed names sharing enough trigrams with the query, with their similarity"""
+    grams = trigrams(norm)
+    min_shared = max(1, math.ceil(len(grams) * 0.4))
+    rows = self._connection().execute(
+      "SELECT k.norm FROM ("
+      f"SELECT norm_id, COUNT(*) AS shared FROM grams WHERE gram IN ({','.join('?' * len(grams))}) "
+      "GROUP BY norm_id HAVING shared >= ? ORDER BY shared DESC LIMIT ?"
+      ") JOIN norms k ON k.id = norm_id",
+      grams + [min_shared, FUZZY_CANDIDATES]
+    ).fetchall()
+    scored = [(candidate, SequenceMatcher(None, norm, candidate).ratio()) for (candidate,) in rows]
+    return [(candidate, ratio) for candidate, ratio in scored if ratio >= self.fuzzy_threshold]
+
+  def search(self, query: str, max_results: int = 3, country: Optional[str] = None, admin1: Optional[str] = None, region: Optional[str] = None, fuzzy: bool = True) -> List[Dict[str, Any]]:
+    """Ranked matches for a place name. `country`/`admin1` filter, `region` ("Puebla, Mexico") only
+    boosts matches whose country or admin1 is one of its parts. "Name, Region" queries are split."""
+    if "," in query and region is None:
+      query, region = [part.strip() for part in query.split(",", 1)]
+    norm = normalize(query)
+    if not norm:
+      return []
+
+    limit = max(max_results * 4, 10)
+    rows = [(row, "alias" if row[10] else "exact", 1.0) for row in self._lookup("k.norm = ?", [norm], country, admin1, limit)]
+    if not rows and len(norm) >= MIN_PREFIX_LENGTH:
+      rows = [(row, "prefix", 1.0) for row in self._lookup("k.norm > ? AND k.norm < ?", [norm, norm + "\uffff"], country, admin1, limit)]
+    if not rows and fuzzy:
+      for candidate, ratio in self._fuzzy_norms(norm):
+        rows += [(row, "fuzzy", ratio) for row in self._lookup("k.norm = ?", [candidate], country, admin1, limit)]
+
+    region_norms = {normalize(part) for part in (region or "").split(",")} - {""}
+    best: Dict[int, Tuple[float, str, float, Tuple]] = {}
+    for row, match, similarity in rows:
+      score = MATCH_QUALITY[match] * similarity + POPULATION_WEIGHT * min(1.0, math.log10(1 + (row[6] or 0)) / 7)
+      if region_norms & {row[7], row[8]}:
+        score += REGION_BOOST
+      if row[0] not in best or score > best[row[0]][0]:
+        best[row[0]] = (score, match, similarity, row)
+
+    ranked = sorted(best.values(), key=lambda item: item[0], reverse=True)[:max_results]
+    return [{
+      "name": row[1],
+      "latitude": row[2],
+      "longitude": row[3],
+      "country": row[4],
+      "admin1": row[5],
+      "admin2": None,
+      "population": row[6],
+      "match": match,
+      "similarity": round(similarity, 3),
+      "score": round(score, 3)
+    } for score, match, similarity, row in ranked]
+
+  def geocode(self, candidates: List[str], max_results: int, region_hint: Optional[str]) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+    """First candidate variation with a confident match, in priority order, or None. The caller
+    passes full-name variations only, a truncation ("Sierra Nevada" for "Sierra Nevada de Santa
+    Marta") can name an unrelated place. Prefix matches and fuzzy ones below
+    `geocode_min_similarity` are not final answers either, those go to the API instead"""
+    if not self.available():
+      return None
+    try:
+      for candidate in candidates:
+        results = [
+          r for r in self.search(candidate, max_results, region=region_hint)
+          if r["match"] in ("exact", "alias") or (r["match"] == "fuzzy" and r["similarity"] >= self.geocode_min_similarity)
+        ]
+        if results:
+          return candidate, results
+    except sqlite3.Error as e:
+      logger.warning(f"Gazetteer lookup failed: {e}")
+    return None
+
+  def get_stats(self) -> Dict[str, Any]:
+    if not self.available():
+      return {"available": False}
+    meta = dict(self._connection().execute("SELECT key, value FROM meta").fetchall())
+    meta["available"] = True
+    meta["index_bytes"] = self.index_path.stat().st_size
+    return meta
+
+
+def _read_admin1(path: Optional[str]) -> Dict[str, str]:
+  """admin1CodesASCII.txt: 'MX.21<TAB>Puebla<TAB>Puebla<TAB>3521082'"""
+  names: Dict[str, str] = {}
+  if path:
+    with open(path, encoding="utf-8") as f:
+      for line in f:
+        parts = line.rstrip("\n").split("\t")
+        if len(parts) >= 2:
+          names[parts[0]] = parts[1]
+  return names
+
+def _read_countries(path: Optional[str]) -> Dict[str, str]:
+  """countryInfo.txt: ISO code in column 0, country name in column 4, '#' comment lines"""
+  names: Dict[str, str] = {}
+  if path:
+    with open(path, encoding="utf-8") as f:
+      for line in f:
+        if line.startswith("#"):
+          continue
+        parts = line.rstrip("\n").split("\t")
+        if len(parts) >= 5:
+          names[parts[0]] = parts[4]
+  return names
+
+def _read_dump(dump_path: str, min_population: int, feature_classes: Optional[str]) -> Iterator[List[str]]:
+  """Rows of a GeoNames main dump (19 tab-separated columns)"""
+  with open(dump_path, encoding="utf-8") as f:
+    for line in f:
+      parts = line.rstrip("\n").split("\t")
+      if len(parts) < 15:
+        continue
+      if feature_classes and parts[6] not in feature_classes:
+        continue
+      if int(parts[14] or 0) < min_population:
+        continue
+      yield parts
+
+def build_index(dump_path: str, index_path: str, admin1_path: Optional[str] = None, countries_path: Optional[str] = None, min_population: int = 0, feature_classes: Optional[str] = None, include_aliases: bool = True) -> int:
+  """Builds the gazetteer index from a GeoNames dump, returns the number of places"""
+  start_time = time.time()
+  admin1_names = _read_admin1(admin1_path)
+  country_names = _read_countries(countries_path)
+
+  out = Path(index_path)
+  out.parent.mkdir(parents=True, exist_ok=True)
+  tmp = out.with_suffix(".building")
+  tmp.unlink(missing_ok=True)
+
+  conn = sqlite3.connect(str(tmp))
+  conn.execute("PRAGMA journal_mode=OFF")
+  conn.execute("PRAGMA synchronous=OFF")
+  conn.executescript(
+    "CREATE TABLE places (id INTEGER PRIMARY KEY, name TEXT, latitude REAL, longitude REAL, feature_code TEXT, "
+    "country_code TEXT, country TEXT, country_norm TEXT, admin1 TEXT, admin1_norm TEXT, population INTEGER);"
+    "CREATE TABLE norms (id INTEGER PRIMARY KEY, norm TEXT NOT NULL);"
+    "CREATE TABLE names (norm_id INTEGER, place_id INTEGER, is_alias INTEGER, PRIMARY KEY (norm_id, place_id)) WITHOUT ROWID;"
+    "CREATE TABLE grams (gram TEXT, norm_id INTEGER, PRIMARY KEY (gram, norm_id)) WITHOUT ROWID;"
+    "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);"
+  )
+
+  norm_ids: Dict[str, int] = {}
+  canonical_ids = set()
+  places: List[Tuple] = []
+  names: Dict[Tuple[int, int], int] = {}
+  region_norms: Dict[str, str] = {}
+
+  def _norm_id(norm: str) -> int:
+    return norm_ids.setdefault(norm, len(norm_ids) + 1)
+
+  for parts in _read_dump(dump_path, min_population, feature_classes):
+    place_id, name, ascii_name, aliases = int(parts[0]), parts[1], parts[2], parts[3]
+    country_code = parts[8]
+    country = country_names.get(country_code, country_code)
+    admin1 = admin1_names.get(f"{country_code}.{parts[10]}")
+    places.append((place_id, name, float(parts[4]), float(parts[5]), parts[7], country_code, country,
+      region_norms.setdefault(country, normalize(country)), admin1,
+      region_norms.setdefault(admin1, normalize(admin1)) if admin1 else None, int(parts[14] or 0)))
+
+    canonical = {normalize(name), normalize(ascii_name)} - {""}
+    for norm in canonical:
+      norm_id = _norm_id(norm)
+      canonical_ids.add(norm_id)
+      names[(norm_id, place_id)] = 0
+    if include_aliases and aliases:
+      for alias in {normalize(a) for a in aliases.split(",") if 0 < len(a) <= MAX_ALIAS_LENGTH} - canonical - {""}:
+        names.setdefault((_norm_id(alias), place_id), 1)
+
+  with conn:
+    conn.executemany("INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", places)
+    conn.executemany("INSERT INTO norms VALUES (?, ?)", ((i, norm) for norm, i in norm_ids.items()))
+    conn.executemany("INSERT INTO names VALUES (?, ?, ?)", ((n, p, a) for (n, p), a in sorted(names.items())))
+    grams = sorted({(g, i) for norm, i in norm_ids.items() if i in canonical_ids for g in trigrams(norm)})
+    conn.executemany("INSERT INTO grams VALUES (?, ?)", grams)
+    conn.execute("CREATE UNIQUE INDEX idx_norms_norm ON norms (norm)")
+    conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+      ("source", Path(dump_path).name),
+      ("places", str(len(places))),
+      ("names", str(len(norm_ids))),
+      ("min_population", str(min_population)),
+      ("built_at", time.strftime("%Y-%m-%dT%H:%M:%S"))
+    ])
+  count = len(places)
+  conn.execute("ANALYZE")
+  conn.execute("VACUUM")
+  conn.close()
+  tmp.replace(out)
+
+  logger.info(f"Built gazetteer index with {count} places in {time.time() - start_time:.1f}s at {out}.")
+  return count
+
+
+Theophrastus_Gazetteer = TheophrastusGazetteer(
+  index_path=TheophrastusConfiguration.gazetteer_index_path,
+  mmap_bytes=TheophrastusConfiguration.gazetteer_mmap_bytes,
+  fuzzy_threshold=TheophrastusConfiguration.gazetteer_fuzzy_threshold,
+  geocode_min_similarity=TheophrastusConfiguration.gazetteer_geocode_min_similarity
+)
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Theophrastus offline gazetteer")
+  commands = parser.add_subparsers(dest="command", required=True)
+
+  build = commands.add_parser("build", help="Build the index from a GeoNames dump")
+  build.add_argument("dump", help="GeoNames dump, e.g. allCountries.txt or cities15000.txt")
+  build.add_argument("--out", default=TheophrastusConfiguration.gazetteer_index_path)
+  build.add_argument("--admin1", help="admin1CodesASCII.txt")
+  build.add_argument("--countries", help="countryInfo.txt")
+  build.add_argument("--min-population", type=int, default=0)
+  build.add_argument("--feature-classes", help="GeoNames feature classes to keep, e.g. PTLH")
+  build.add_argument("--no-aliases", action="store_true")
+
+  query = commands.add_parser("search", help="Query the index")
+  query.add_argument("name")
+  query.add_argument("--country")
+  query.add_argument("--admin1")
+  query.add_argument("--max-results", type=int, default=3)
+
+  args = parser.parse_args()
+  if args.command == "build":
+    build_index(args.dump, args.out, args.admin1, args.countries, args.min_population, args.feature_classes, not args.no_aliases)
+  else:
+    start = time.perf_counter()
+    for result in Theophrastus_Gazetteer.search(args.name, args.max_results, country=args.country, admin1=args.admin1):
+      print(result)
+    print(f"{(time.perf_counter() - start) * 1000:.3f} ms")
@@ -0,0 +1,122 @@
+"""
+Persistent SQLite cache for geocoding answers, survives restarts.
+Entries expire after a TTL (shorter for names with no results), least recently used rows are evicted.
+"""
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+
+from typing import Dict, Any, Optional
+
+from weather_advisor_agent.config import TheophrastusConfiguration
+from weather_advisor_agent.utils.local_observability import Theophrastus_Observability
+
+logger = logging.getLogger(__name__)
+
+class TheophrastusGeocodeCache:
+  """Disk-backed LRU cache for geocode_place_name results."""
+  def __init__(self, db_path: str, ttl_seconds: int, negative_ttl_seconds: int, max_entries: int):
+    self.db_path = Path(db_path)
+    self.ttl_seconds = ttl_seconds
+    self.negative_ttl_seconds = negative_ttl_seconds
+    self.max_entries = max_entries
+    self._lock = threading.Lock()
+    self._conn: Optional[sqlite3.Connection] = None
+
+  def _connection(self) -> sqlite3.Connection:
+    if self._conn is None:
+      self.db_path.parent.mkdir(parents=True, exist_ok=True)
+      conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+      conn.execute("PRAGMA journal_mode=WAL")
+      conn.execute("PRAGMA synchronous=NORMAL")
+      conn.execute(
+        "CREATE TABLE IF NOT EXISTS geocode_cache ("
+        "cache_key TEXT PRIMARY KEY, "
+        "payload TEXT NOT NULL, "
+        "is_negative INTEGER NOT NULL, "
+        "expires_at REAL NOT NULL, "
+        "last_access REAL NOT NULL)"
+      )
+      conn.execute("CREATE INDEX IF NOT EXISTS idx_geocode_cache_last_access ON geocode_cache (last_access)")
+      self._conn = conn
+    return self._conn
+
+  @staticmethod
+  def make_key(place_name: str, region_hint: Optional[str], max_results: int) -> str:
+    """Normalized cache key: case and whitespace insensitive"""
+    name = " ".join((place_name or "").lower().split())
+    region = " ".join((region_hint or "").lower().split())
+    return f"{name}|{region}|{max_results}"
+
+  def get(self, place_name: str, region_hint: Optional[str], max_results: int) -> Optional[Dict[str, Any]]:
+    """Return the cached geocoding result, or None on a miss"""
+    key = self.make_key(place_name, region_hint, max_results)
+    now = time.time()
+    row = None
+
+    try:
+      with self._lock:
+        conn = self._connection()
+        row = conn.execute("SELECT payload, expires_at FROM geocode_cache WHERE cache_key = ?", (key,)).fetchone()
+        if row is not None and row[1] <= now:
+          conn.execute("DELETE FROM geocode_cache WHERE cache_key = ?", (key,))
+          row = None
+        elif row is not None:
+          conn.execute("UPDATE geocode_cache SET last_access = ? WHERE cache_key = ?", (now, key))
+    except sqlite3.Error as e:
+      logger.warning(f"Geocode cache read failed: {e}")
+      row = None
+
+    Theophrastus_Observability.log_cache_access("geocode", hit=row is not None, key=key)
+    if row is None:
+      return None
+    return json.loads(row[0])
+
+  def set(self, place_name: str, region_hint: Optional[str], max_results: int, result: Dict[str, Any], negative: bool = False) -> None:
+    """Store a geocoding result, evicting the least recently used rows if needed"""
+    key = self.make_key(place_name, region_hint, max_results)
+    now = time.time()
+    ttl = self.negative_ttl_seconds if negative else self.ttl_seconds
+
+    try:
+      with self._lock:
+        conn = self._connection()
+        conn.execute(
+          "INSERT OR REPLACE INTO geocode_cache (cache_key, payload, is_negative, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+          (key, json.dumps(result), int(negative), now + ttl, now)
+        )
+        conn.execute(
+          "DELETE FROM geocode_cache WHERE cache_key IN ("
+          "SELECT cache_key FROM geocode_cache ORDER BY last_access ASC "
+          "LIMIT MAX(0, (SELECT COUNT(*) FROM geocode_cache) - ?))",
+          (self.max_entries,)
+        )
+    except sqlite3.Error as e:
+      logger.warning(f"Geocode cache write failed: {e}")
+      return
+
+    logger.debug(f"Cached geocode result for '{key}' (negative={negative}).")
+
+  def clear(self) -> None:
+    """Remove every cached entry"""
+    with self._lock:
+      self._connection().execute("DELETE FROM geocode_cache")
+
+  def get_stats(self) -> Dict[str, Any]:
+    """Entry counts for diagnostics"""
+    with self._lock:
+      total, negative = self._connection().execute(
+        "SELECT COUNT(*), COALESCE(SUM(is_negative), 0) FROM geocode_cache"
+      ).fetchone()
+    return {"entries": total, "negative_entries": negative, "max_entries": self.max_entries}
+
+
+Theophrastus_GeocodeCache = TheophrastusGeocodeCache(
+  db_path=TheophrastusConfiguration.geocode_cache_path,
+  ttl_seconds=TheophrastusConfiguration.geocode_cache_ttl_seconds,
+  negative_ttl_seconds=TheophrastusConfiguration.geocode_cache_negative_ttl_seconds,
+  max_entries=TheophrastusConfiguration.geocode_cache_max_entries
+)
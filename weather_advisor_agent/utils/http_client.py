@@ -0,0 +1,177 @@
+"""
+Shared pooled keep-alive HTTP client for the Open-Meteo tools, plus one AsyncClient per event loop.
+Records whether each request reused a pooled connection.
+"""
+import asyncio
+import logging
+import weakref
+import threading
+
+from typing import AsyncGenerator, Dict, Any, Optional
+
+import httpx
+
+from weather_advisor_agent.config import TheophrastusConfiguration
+from weather_advisor_agent.utils.local_observability import Theophrastus_Observability
+
+logger = logging.getLogger(__name__)
+
+OPEN_METEO_HOSTS = [
+  "https://api.open-meteo.com",
+  "https://geocoding-api.open-meteo.com"
+]
+
+class TheophrastusHttpClient:
+  """Process-wide pooled HTTP client for the Open-Meteo tools."""
+  def __init__(self, max_connections: int, max_keepalive_connections: int, keepalive_expiry: float, connect_timeout: float, http2: bool):
+    self.max_connections = max_connections
+    self.max_keepalive_connections = max_keepalive_connections
+    self.keepalive_expiry = keepalive_expiry
+    self.connect_timeout = connect_timeout
+    self.http2 = http2 and self._http2_available()
+    self._lock = threading.Lock()
+    self._client: Optional[httpx.Client] = None
+    self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+    # loop -> suspended async generator whose cleanup closes that loop's client
+    self._shutdown_hooks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncGenerator[None, None]]" = weakref.WeakKeyDictionary()
+
+  @staticmethod
+  def _http2_available() -> bool:
+    try:
+      import h2  # noqa: F401
+      return True
+    except ImportError:
+      logger.warning("HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1.")
+      return False
+
+  def _limits(self) -> httpx.Limits:
+    return httpx.Limits(
+      max_connections=self.max_connections,
+      max_keepalive_connections=self.max_keepalive_connections,
+      keepalive_expiry=self.keepalive_expiry
+    )
+
+  def _headers(self) -> Dict[str, str]:
+    return {"Accept-Encoding": "gzip, deflate", "User-Agent": "Theophrastus-WeatherAdvisor"}
+
+  @property
+  def client(self) -> httpx.Client:
+    if self._client is None:
+      with self._lock:
+        if self._client is None:
+          self._client = httpx.Client(
+            http2=self.http2,
+            limits=self._limits(),
+            headers=self._headers(),
+            timeout=httpx.Timeout(self.connect_timeout)
+          )
+    return self._client
+
+  @property
+  def async_client(self) -> httpx.AsyncClient:
+    """Pooled async client bound to the running event loop (connections cannot cross loops)"""
+    loop = asyncio.get_running_loop()
+    client = self._async_clients.get(loop)
+    if client is None:
+      client = httpx.AsyncClient(
+        http2=self.http2,
+        limits=self._limits(),
+        headers=self._headers(),
+        timeout=httpx.Timeout(self.connect_timeout)
+      )
+      self._async_clients[loop] = client
+      self._close_at_shutdown(loop, client)
+    return client
+
+  def _close_at_shutdown(self, loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> None:
+    """Closes the client when its loop shuts down. asyncio.run (and uvicorn) close every pending
+    async generator of the loop in loop.shutdown_asyncgens, before the loop itself is closed"""
+    loop_ref = weakref.ref(loop)
+
+    async def _hook() -> AsyncGenerator[None, None]:
+      try:
+        yield
+      finally:
+        owner = loop_ref()
+        if owner is not None:
+          self._shutdown_hooks.pop(owner, None)
+          if self._async_clients.get(owner) is client:
+            del self._async_clients[owner]
+        await client.aclose()
+
+    hook = _hook()
+    self._shutdown_hooks[loop] = hook
+    asyncio.ensure_future(hook.__anext__())
+
+  def _timeout(self, read_timeout: float) -> httpx.Timeout:
+    return httpx.Timeout(read_timeout, connect=self.connect_timeout)
+
+  def get(self, url: str, params: Optional[Dict[str, Any]] = None, timeout: float = 10.0) -> httpx.Response:
+    """GET through the shared pool, recording whether the connection was reused"""
+    opened = []
+
+    def trace(event_name: str, info: Dict[str, Any]) -> None:
+      if event_name == "connection.connect_tcp.complete":
+        opened.append(True)
+
+    response = self.client.get(url, params=params, timeout=self._timeout(timeout), extensions={"trace": trace})
+    Theophrastus_Observability.log_http_connection(response.url.host, reused=not opened)
+    return response
+
+  async def aget(self, url: str, params: Optional[Dict[str, Any]] = None, timeout: float = 10.0) -> httpx.Response:
+    """Non-blocking GET through the event loop's pool"""
+    opened = []
+
+    async def trace(event_name: str, info: Dict[str, Any]) -> None:
+      if event_name == "connection.connect_tcp.complete":
+        opened.append(True)
+
+    response = await self.async_client.get(url, params=params, timeout=self._timeout(timeout), extensions={"trace": trace})
+    Theophrastus_Observability.log_http_connection(response.url.host, reused=not opened)
+    return response
+
+  def warm_up(self, background: bool = True) -> None:
+    """Open a pooled connection to each Open-Meteo host ahead of the first tool call"""
+    def _warm() -> None:
+      for host in OPEN_METEO_HOSTS:
+        try:
+          self.get(host, timeout=self.connect_timeout)
+          logger.info(f"Warmed up connection to {host}.")
+        except httpx.HTTPError as e:
+          logger.warning(f"Warm-up failed for {host}: {e}")
+
+    if background:
+      threading.Thread(target=_warm, name="http-warmup", daemon=True).start()
+    else:
+      _warm()
+
+  def get_pool_stats(self) -> Dict[str, Any]:
+    """Reused vs new connection counters plus the pool configuration"""
+    stats = Theophrastus_Observability.metrics.get_http_pool_summary()
+    stats.update({
+      "http2": self.http2,
+      "max_connections": self.max_connections,
+      "max_keepalive_connections": self.max_keepalive_connections
+    })
+    return stats
+
+  def close(self) -> None:
+    with self._lock:
+      if self._client is not None:
+        self._client.close()
+        self._client = None
+
+  async def aclose(self) -> None:
+    """Close the async client of the running event loop"""
+    client = self._async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+      await client.aclose()
+
+
+Theophrastus_HttpClient = TheophrastusHttpClient(
+  max_connections=TheophrastusConfiguration.http_pool_max_connections,
+  max_keepalive_connections=TheophrastusConfiguration.http_pool_max_keepalive,
+  keepalive_expiry=TheophrastusConfiguration.http_keepalive_expiry_seconds,
+  connect_timeout=TheophrastusConfiguration.http_connect_timeout_seconds,
+  http2=TheophrastusConfiguration.http_enable_http2
+)
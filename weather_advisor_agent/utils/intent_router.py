@@ -0,0 +1,171 @@
+"""
+Local intent router for the root agent: keyword rules plus a small naive Bayes classifier.
+Only confident turns are dispatched directly, the rest go to the LLM root.
+"""
+import re
+import math
+import logging
+from dataclasses import dataclass, field
+
+from typing import Dict, List, Tuple, Optional
+
+from weather_advisor_agent.config import TheophrastusConfiguration
+
+logger = logging.getLogger(__name__)
+
+LOCATION_SEARCH = "location_search"
+WEATHER_PIPELINE = "weather_pipeline"
+MEMORY = "memory"
+CHAT = "chat"
+
+# Intents the router may run without the LLM
+DISPATCHABLE = (LOCATION_SEARCH, WEATHER_PIPELINE)
+
+RULES: List[Tuple[str, "re.Pattern[str]", float]] = [
+  (WEATHER_PIPELINE, re.compile(r"\b(weather|conditions|temperature|forecast|wind|humidity|air quality|hot|cold|rain)\b", re.I), 1.0),
+  (WEATHER_PIPELINE, re.compile(r"\b(is it safe|safety|risks?|report|recommendations?|analysis)\b", re.I), 1.0),
+  (LOCATION_SEARCH, re.compile(r"\b(find|search|discover|suggest|some good|best|where (can|should|could) i|places to)\b.{0,60}\b(locations?|places?|spots?|trails?|parks?|areas?|beaches|lakes|sites)\b", re.I), 2.0),
+  (LOCATION_SEARCH, re.compile(r"\b(locations?|places?|spots?|trails?) (near|around|close to|in)\b", re.I), 1.0),
+  (MEMORY, re.compile(r"\b(remember|forget|favou?rites?|preferences?|history|what do i (like|enjoy|love)|where have i|i (love|like|enjoy|prefer))\b", re.I), 2.0),
+  (CHAT, re.compile(r"^\s*(hi|hello|hey|thanks|thank you|ok|okay|bye|good (morning|afternoon|evening))\b[\s!.?]*$", re.I), 3.0)
+]
+
+SEED_EXAMPLES: Dict[str, List[str]] = {
+  WEATHER_PIPELINE: [
+    "what's the weather in sacramento",
+    "how is the weather in my city",
+    "how is the weather",
+    "what are the conditions",
+    "what are the current conditions there",
+    "what is the weather like in those locations",
+    "generate a report",
+    "generate a recommendations report",
+    "is it safe to go hiking today",
+    "what are the risks",
+    "how hot is it in phoenix",
+    "is it windy in chicago right now",
+    "air quality in mexico city",
+    "what's the temperature there"
+  ],
+  LOCATION_SEARCH: [
+    "find hiking locations near mexico city",
+    "what are some good locations",
+    "where can i go camping near denver",
+    "suggest places to see the northern lights",
+    "find beaches near barcelona",
+    "good spots for kayaking around seattle",
+    "where should i go hiking this weekend",
+    "search for parks close to austin",
+    "best trails near vancouver",
+    "find locations for stargazing"
+  ],
+  MEMORY: [
+    "i love swimming and camping can you remember that",
+    "what outdoor activities do i enjoy",
+    "what do i like",
+    "remember that i prefer mornings",
+    "save this as a favorite",
+    "list my favorite locations",
+    "where have i asked about",
+    "show my query history",
+    "remove it from my favorites",
+    "i like hiking"
+  ],
+  CHAT: [
+    "hi",
+    "hello there",
+    "thanks",
+    "thank you very much",
+    "who are you",
+    "what can you do",
+    "good morning",
+    "ok bye"
+  ]
+}
+
+WORD = re.compile(r"[a-z0-9']+")
+
+def features(text: str) -> List[str]:
+  """Lower-case unigrams and bigrams"""
+  words = WORD.findall(text.lower())
+  return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class NaiveBayesIntentClassifier:
+  """Multinomial naive Bayes with add-one smoothing, small enough to train at import."""
+  def __init__(self, examples: Dict[str, List[str]]):
+    self.intents = list(examples)
+    self.counts: Dict[str, Dict[str, int]] = {}
+    self.totals: Dict[str, int] = {}
+    vocabulary = set()
+    for intent, phrases in examples.items():
+      counts: Dict[str, int] = {}
+      for phrase in phrases:
+        for token in features(phrase):
+          counts[token] = counts.get(token, 0) + 1
+          vocabulary.add(token)
+      self.counts[intent] = counts
+      self.totals[intent] = sum(counts.values())
+    self.vocabulary_size = len(vocabulary)
+
+  def predict_proba(self, text: str) -> Dict[str, float]:
+    tokens = [t for t in features(text) if any(t in self.counts[i] for i in self.intents)]
+    if not tokens:
+      return {intent: 1.0 / len(self.intents) for intent in self.intents}
+    scores = {}
+    for intent in self.intents:
+      denominator = self.totals[intent] + self.vocabulary_size
+      scores[intent] = sum(math.log((self.counts[intent].get(t, 0) + 1) / denominator) for t in tokens)
+    top = max(scores.values())
+    exp = {intent: math.exp(score - top) for intent, score in scores.items()}
+    norm = sum(exp.values())
+    return {intent: value / norm for intent, value in exp.items()}
+
+
+@dataclass
+class IntentDecision:
+  intent: str
+  confidence: float
+  dispatch: bool
+  rule_scores: Dict[str, float] = field(default_factory=dict)
+  model_scores: Dict[str, float] = field(default_factory=dict)
+
+
+class TheophrastusIntentRouter:
+  """Combines the rules and the classifier into one confidence per turn."""
+  def __init__(self, min_confidence: float):
+    self.min_confidence = min_confidence
+    self.classifier = NaiveBayesIntentClassifier(SEED_EXAMPLES)
+
+  def rule_scores(self, message: str) -> Dict[str, float]:
+    scores: Dict[str, float] = {}
+    for intent, pattern, weight in RULES:
+      if pattern.search(message):
+        scores[intent] = scores.get(intent, 0.0) + weight
+    return scores
+
+  def classify(self, message: Optional[str]) -> IntentDecision:
+    """Half the confidence comes from the rules' share of the vote, half from the classifier,
+    so a turn is only dispatched when both point the same way"""
+    message = (message or "").strip()
+    if not message:
+      return IntentDecision(intent=CHAT, confidence=0.0, dispatch=False)
+
+    rules = self.rule_scores(message)
+    model = self.classifier.predict_proba(message)
+    total = sum(rules.values())
+    combined = {intent: 0.5 * (rules.get(intent, 0.0) / total if total else 0.0) + 0.5 * p for intent, p in model.items()}
+    intent = max(combined, key=combined.__getitem__)
+    confidence = round(combined[intent], 3)
+    return IntentDecision(
+      intent=intent,
+      confidence=confidence,
+      dispatch=intent in DISPATCHABLE and confidence >= self.min_confidence,
+      rule_scores=rules,
+      model_scores={k: round(v, 3) for k, v in model.items()}
+    )
+
+
+Theophrastus_IntentRouter = TheophrastusIntentRouter(
+  min_confidence=TheophrastusConfiguration.intent_router_min_confidence
+)
@@ -0,0 +1,206 @@
+"""
+Opt-in SQLite cache of model answers, wired as before_model / after_model callbacks.
+Only text answers of tool-free agents are cached, entries never outlive the next forecast update.
+"""
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+from typing import Dict, Any, Optional
+
+from google.genai.types import Content, Part
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.agents.callback_context import CallbackContext
+
+from weather_advisor_agent.config import TheophrastusConfiguration
+from weather_advisor_agent.utils.local_observability import Theophrastus_Observability
+from weather_advisor_agent.utils.snapshot_cache import Theophrastus_SnapshotCache
+
+logger = logging.getLogger(__name__)
+
+# Snapshot fields that differ between two reads of the same forecast
+VOLATILE_KEYS = {"raw_ref", "age_seconds", "stale", "id"}
+# Misses still waiting for their answer. A call that raises never reaches after_model, its key is
+# dropped oldest first past this cap
+MAX_PENDING = 1024
+
+def canonical(value: Any) -> Any:
+  """JSON strings parsed, volatile snapshot fields dropped, coordinates snapped to their grid cell"""
+  if isinstance(value, str):
+    stripped = value.strip()
+    if stripped[:1] in ("{", "["):
+      try:
+        return canonical(json.loads(stripped))
+      except json.JSONDecodeError:
+        pass
+    return " ".join(stripped.split())
+  if isinstance(value, list):
+    return [canonical(v) for v in value]
+  if isinstance(value, dict):
+    out = {k: canonical(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    latitude, longitude = value.get("latitude"), value.get("longitude")
+    if isinstance(latitude, (int, float)) and isinstance(longitude, (int, float)):
+      del out["latitude"], out["longitude"]
+      out["cell"] = Theophrastus_SnapshotCache.grid_key(latitude, longitude)
+    return out
+  return value
+
+def _instruction_text(callback_context: CallbackContext, llm_request: LlmRequest) -> str:
+  """The agent's instruction template. The resolved system instruction has the state values
+  injected verbatim (snapshot age included), those enter the key canonicalized instead"""
+  agent = getattr(getattr(callback_context, "_invocation_context", None), "agent", None)
+  if isinstance(getattr(agent, "instruction", None), str):
+    return agent.instruction
+  config = getattr(llm_request, "config", None)
+  instruction = getattr(config, "system_instruction", None) if config is not None else None
+  if instruction is None or isinstance(instruction, str):
+    return instruction or ""
+  parts = getattr(instruction, "parts", None) or []
+  return "".join(getattr(part, "text", None) or "" for part in parts)
+
+def _user_text(callback_context: CallbackContext) -> str:
+  content = callback_context.user_content
+  if content is None or not content.parts:
+    return ""
+  return " ".join(" ".join(part.text.lower().split()) for part in content.parts if getattr(part, "text", None))
+
+
+class TheophrastusResponseCache:
+  """Disk-backed LRU cache of model answers, keyed by a content hash."""
+  def __init__(self, db_path: str, ttl_seconds: int, max_entries: int):
+    self.db_path = Path(db_path)
+    self.ttl_seconds = ttl_seconds
+    self.max_entries = max_entries
+    self._lock = threading.Lock()
+    self._conn: Optional[sqlite3.Connection] = None
+    # (invocation_id, agent) -> key of the miss waiting for its model answer
+    self._pending: "OrderedDict[tuple, str]" = OrderedDict()
+
+  def _connection(self) -> sqlite3.Connection:
+    if self._conn is None:
+      self.db_path.parent.mkdir(parents=True, exist_ok=True)
+      conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+      conn.execute("PRAGMA journal_mode=WAL")
+      conn.execute("PRAGMA synchronous=NORMAL")
+      conn.execute(
+        "CREATE TABLE IF NOT EXISTS llm_response_cache ("
+        "cache_key TEXT PRIMARY KEY, "
+        "agent TEXT NOT NULL, "
+        "payload TEXT NOT NULL, "
+        "expires_at REAL NOT NULL, "
+        "last_access REAL NOT NULL)"
+      )
+      conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_response_cache_last_access ON llm_response_cache (last_access)")
+      self._conn = conn
+    return self._conn
+
+  @staticmethod
+  def make_key(model: str, instruction: str, state_values: Dict[str, Any], message: str = "") -> str:
+    material = json.dumps({"model": model, "instruction": " ".join(instruction.split()), "state": canonical(state_values), "message": message}, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+  def get(self, agent: str, key: str) -> Optional[str]:
+    now = time.time()
+    row = None
+    try:
+      with self._lock:
+        conn = self._connection()
+        row = conn.execute("SELECT payload, expires_at FROM llm_response_cache WHERE cache_key = ?", (key,)).fetchone()
+        if row is not None and row[1] <= now:
+          conn.execute("DELETE FROM llm_response_cache WHERE cache_key = ?", (key,))
+          row = None
+        elif row is not None:
+          conn.execute("UPDATE llm_response_cache SET last_access = ? WHERE cache_key = ?", (now, key))
+    except sqlite3.Error as e:
+      logger.warning(f"LLM response cache read failed: {e}")
+      row = None
+
+    Theophrastus_Observability.log_cache_access(f"llm:{agent}", hit=row is not None, key=key)
+    return row[0] if row is not None else None
+
+  def set(self, agent: str, key: str, text: str) -> None:
+    """Stores an answer until the TTL or the next forecast model update, whichever comes first"""
+    now = time.time()
+    expires_at = min(now + self.ttl_seconds, Theophrastus_SnapshotCache.next_model_refresh(now))
+    try:
+      with self._lock:
+        conn = self._connection()
+        conn.execute(
+          "INSERT OR REPLACE INTO llm_response_cache (cache_key, agent, payload, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+          (key, agent, text, expires_at, now)
+        )
+        conn.execute(
+          "DELETE FROM llm_response_cache WHERE cache_key IN ("
+          "SELECT cache_key FROM llm_response_cache ORDER BY last_access ASC "
+          "LIMIT MAX(0, (SELECT COUNT(*) FROM llm_response_cache) - ?))",
+          (self.max_entries,)
+        )
+    except sqlite3.Error as e:
+      logger.warning(f"LLM response cache write failed: {e}")
+
+  def clear(self) -> None:
+    with self._lock:
+      self._connection().execute("DELETE FROM llm_response_cache")
+
+  def get_stats(self) -> Dict[str, Any]:
+    with self._lock:
+      rows = self._connection().execute("SELECT agent, COUNT(*) FROM llm_response_cache GROUP BY agent").fetchall()
+    return {"entries": sum(n for _, n in rows), "by_agent": dict(rows), "max_entries": self.max_entries}
+
+  def before_model(self, callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """before_model_callback: answers from the cache, or remembers the key of the miss"""
+    agent = callback_context.agent_name
+    state_keys = TheophrastusConfiguration.llm_cache_agents.get(agent)
+    if not TheophrastusConfiguration.llm_cache_enabled or state_keys is None:
+      return None
+
+    state = callback_context.state
+    key = self.make_key(
+      getattr(llm_request, "model", None) or "",
+      _instruction_text(callback_context, llm_request),
+      {k: state.get(k) for k in state_keys},
+      _user_text(callback_context) if agent in TheophrastusConfiguration.llm_cache_message_agents else ""
+    )
+    if not state.get("llm_cache_bypass"):
+      text = self.get(agent, key)
+      if text is not None:
+        logger.info(f"LLM response cache hit for {agent}.")
+        return LlmResponse(content=Content(role="model", parts=[Part(text=text)]))
+    with self._lock:
+      self._pending[(callback_context.invocation_id, agent)] = key
+      while len(self._pending) > MAX_PENDING:
+        self._pending.popitem(last=False)
+    return None
+
+  def after_model(self, callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """after_model_callback: stores complete text answers of the misses"""
+    if getattr(llm_response, "partial", False):
+      return None
+    with self._lock:
+      key = self._pending.pop((callback_context.invocation_id, callback_context.agent_name), None)
+    if key is None or getattr(llm_response, "error_code", None):
+      return None
+    content = getattr(llm_response, "content", None)
+    parts = getattr(content, "parts", None) or []
+    if not parts or any(getattr(part, "function_call", None) or not getattr(part, "text", None) for part in parts):
+      return None
+    self.set(callback_context.agent_name, key, "".join(part.text for part in parts))
+    return None
+
+
+Theophrastus_ResponseCache = TheophrastusResponseCache(
+  db_path=TheophrastusConfiguration.llm_cache_path,
+  ttl_seconds=TheophrastusConfiguration.llm_cache_ttl_seconds,
+  max_entries=TheophrastusConfiguration.llm_cache_max_entries
+)
+
+def llm_cache_before_model(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+  return Theophrastus_ResponseCache.before_model(callback_context, llm_request)
+
+def llm_cache_after_model(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+  return Theophrastus_ResponseCache.after_model(callback_context, llm_response)
@@ -6,6 +6,8 @@ Useful for debbuging strange behaviours of agents when running tests without UI.
 import logging
 import time
 import json
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 
@@ -21,6 +23,10 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+BYTES_PER_TOKEN = 4
+MAX_TRACKED_TURNS = 4096
+MAX_TRACKED_SESSIONS = 1024
+
 @dataclass
 class TraceSpan:
   name: str
@@ -58,6 +64,9 @@ class TraceSpan:
 class TheophrastusMetrics:
   def __init__(self):
     self.start_time = datetime.now()
+    # Reentrant so get_summary can hold it around the per-section summaries. The record_* methods
+    # below take it, they are reached from the fetch workers, refresh and cache-warmer threads
+    self._lock = threading.RLock()
     
     self.agent_invocations = 0
     self.tool_calls = 0
@@ -70,14 +79,33 @@ class TheophrastusMetrics:
     self.error_counts: Dict[str, int] = {}
     self.agent_durations: Dict[str, List[float]] = {}
     self.tool_durations: Dict[str, List[float]] = {}
+    self.cache_hits: Dict[str, int] = {}
+    self.cache_misses: Dict[str, int] = {}
+    self.http_requests = 0
+    self.http_new_connections = 0
+    self.http_connections_by_host: Dict[str, Dict[str, int]] = {}
+    self.single_flight_calls: Dict[str, int] = {}
+    self.coalesced_waiters: Dict[str, int] = {}
+    self.state_bytes_full = 0
+    self.state_bytes_compact = 0
+    self.state_bytes_by_turn: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+    self.intent_routes: Dict[str, Dict[str, float]] = {}
+    self.model_calls_by_agent: Dict[str, Dict[str, Any]] = {}
+    # Least recently active sessions are dropped past MAX_TRACKED_SESSIONS
+    self.model_calls_by_session: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    self.warm_cycles = 0
+    self.warm_set_size = 0
+    self.warm_requests = 0
+    self.warm_hits = 0
     
   def increment_agent_calls(self, agent_name: str):
     self.agent_invocations += 1
     self.agent_call_counts[agent_name] = self.agent_call_counts.get(agent_name, 0) + 1
 
   def increment_tool_calls(self, tool_name: str):
-    self.tool_calls += 1
-    self.tool_call_counts[tool_name] = self.tool_call_counts.get(tool_name, 0) + 1
+    with self._lock:
+      self.tool_calls += 1
+      self.tool_call_counts[tool_name] = self.tool_call_counts.get(tool_name, 0) + 1
   
   def record_agent_duration(self, agent_name: str, duration_ms: float):
     if agent_name not in self.agent_durations:
@@ -85,15 +113,171 @@ class TheophrastusMetrics:
     self.agent_durations[agent_name].append(duration_ms)
   
   def record_tool_duration(self, tool_name: str, duration_ms: float):
-    if tool_name not in self.tool_durations:
-      self.tool_durations[tool_name] = []
-    self.tool_durations[tool_name].append(duration_ms)
+    with self._lock:
+      self.tool_durations.setdefault(tool_name, []).append(duration_ms)
+  
+  def record_cache_access(self, cache_name: str, hit: bool):
+    with self._lock:
+      if hit:
+        self.cache_hits[cache_name] = self.cache_hits.get(cache_name, 0) + 1
+      else:
+        self.cache_misses[cache_name] = self.cache_misses.get(cache_name, 0) + 1
+  
+  def record_http_connection(self, host: str, reused: bool):
+    with self._lock:
+      self.http_requests += 1
+      if not reused:
+        self.http_new_connections += 1
+      host_stats = self.http_connections_by_host.setdefault(host, {"reused": 0, "new": 0})
+      host_stats["reused" if reused else "new"] += 1
+  
+  def record_single_flight(self, name: str, coalesced: bool):
+    with self._lock:
+      if coalesced:
+        self.coalesced_waiters[name] = self.coalesced_waiters.get(name, 0) + 1
+      else:
+        self.single_flight_calls[name] = self.single_flight_calls.get(name, 0) + 1
+  
+  def record_snapshot_compaction(self, turn_id: str, full_bytes: int, compact_bytes: int):
+    # Called from the fetch worker threads, only the most recent turns are kept
+    with self._lock:
+      self.state_bytes_full += full_bytes
+      self.state_bytes_compact += compact_bytes
+      turn = self.state_bytes_by_turn.setdefault(turn_id, {"snapshots": 0, "bytes_saved": 0, "tokens_saved": 0})
+      turn["snapshots"] += 1
+      turn["bytes_saved"] += full_bytes - compact_bytes
+      turn["tokens_saved"] = turn["bytes_saved"] // BYTES_PER_TOKEN
+      while len(self.state_bytes_by_turn) > MAX_TRACKED_TURNS:
+        self.state_bytes_by_turn.popitem(last=False)
+  
+  def get_turn_compaction(self, turn_id: str) -> Optional[Dict[str, int]]:
+    with self._lock:
+      turn = self.state_bytes_by_turn.get(turn_id)
+      return dict(turn) if turn else None
+  
+  def record_intent_route(self, intent: str, confidence: float, dispatched: bool):
+    route = self.intent_routes.setdefault(intent, {"turns": 0, "dispatched": 0, "fallback": 0, "confidence_sum": 0.0})
+    route["turns"] += 1
+    route["dispatched" if dispatched else "fallback"] += 1
+    route["confidence_sum"] += confidence
+  
+  def record_model_call(self, agent_name: str, session_id: str, model: str, prompt_tokens: int, response_tokens: int, ttft_ms: float, latency_ms: float, cost_usd: Optional[float]):
+    with self._lock:
+      self._add_model_call(agent_name, session_id, model, prompt_tokens, response_tokens, ttft_ms, latency_ms, cost_usd)
+      self.model_calls_by_session.move_to_end(session_id)
+      while len(self.model_calls_by_session) > MAX_TRACKED_SESSIONS:
+        self.model_calls_by_session.popitem(last=False)
+  
+  def _add_model_call(self, agent_name: str, session_id: str, model: str, prompt_tokens: int, response_tokens: int, ttft_ms: float, latency_ms: float, cost_usd: Optional[float]):
+    for stats in (self.model_calls_by_agent.setdefault(agent_name, {"models": {}}), self.model_calls_by_session.setdefault(session_id, {"models": {}})):
+      stats["calls"] = stats.get("calls", 0) + 1
+      stats["prompt_tokens"] = stats.get("prompt_tokens", 0) + prompt_tokens
+      stats["response_tokens"] = stats.get("response_tokens", 0) + response_tokens
+      stats["ttft_ms_sum"] = stats.get("ttft_ms_sum", 0.0) + ttft_ms
+      stats["latency_ms_sum"] = stats.get("latency_ms_sum", 0.0) + latency_ms
+      stats["max_prompt_tokens"] = max(stats.get("max_prompt_tokens", 0), prompt_tokens)
+      stats["cost_usd"] = stats.get("cost_usd", 0.0) + (cost_usd or 0.0)
+      if cost_usd is None:
+        stats["unpriced_calls"] = stats.get("unpriced_calls", 0) + 1
+      stats["models"][model] = stats["models"].get(model, 0) + 1
+  
+  @staticmethod
+  def _model_call_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    calls = stats["calls"]
+    return {
+      "calls": calls,
+      "prompt_tokens": stats["prompt_tokens"],
+      "response_tokens": stats["response_tokens"],
+      "avg_prompt_tokens": round(stats["prompt_tokens"] / calls, 1),
+      "max_prompt_tokens": stats["max_prompt_tokens"],
+      "avg_ttft_ms": round(stats["ttft_ms_sum"] / calls, 2),
+      "avg_latency_ms": round(stats["latency_ms_sum"] / calls, 2),
+      "cost_usd": round(stats["cost_usd"], 6),
+      "unpriced_calls": stats.get("unpriced_calls", 0),
+      "models": stats["models"]
+    }
+  
+  def get_model_call_summary(self) -> Dict[str, Any]:
+    with self._lock:
+      agents = self.model_calls_by_agent.values()
+      return {
+        "calls": sum(a["calls"] for a in agents),
+        "prompt_tokens": sum(a["prompt_tokens"] for a in agents),
+        "response_tokens": sum(a["response_tokens"] for a in agents),
+        "cost_usd": round(sum(a["cost_usd"] for a in agents), 6),
+        "by_agent": {name: self._model_call_stats(stats) for name, stats in sorted(self.model_calls_by_agent.items())},
+        "by_session": {session: self._model_call_stats(stats) for session, stats in self.model_calls_by_session.items()}
+      }
+  
+  def record_cache_warm(self, warm_set_size: int, requests: int):
+    with self._lock:
+      self.warm_cycles += 1
+      self.warm_set_size = warm_set_size
+      self.warm_requests += requests
+  
+  def record_warm_hit(self):
+    with self._lock:
+      self.warm_hits += 1
+  
+  def get_cache_warmer_summary(self) -> Dict[str, Any]:
+    snapshot_hits = self.cache_hits.get("snapshot", 0)
+    return {
+      "cycles": self.warm_cycles,
+      "warm_set_size": self.warm_set_size,
+      "requests": self.warm_requests,
+      "warm_hits": self.warm_hits,
+      "hit_contribution_percent": round(self.warm_hits / snapshot_hits * 100, 2) if snapshot_hits > 0 else 0
+    }
+  
+  def _state_compaction_summary(self) -> Dict[str, Any]:
+    with self._lock:
+      return {
+        "full_bytes": self.state_bytes_full,
+        "compact_bytes": self.state_bytes_compact,
+        "bytes_saved": self.state_bytes_full - self.state_bytes_compact,
+        "tokens_saved": (self.state_bytes_full - self.state_bytes_compact) // BYTES_PER_TOKEN,
+        "by_turn": {turn_id: dict(turn) for turn_id, turn in self.state_bytes_by_turn.items()}
+      }
+  
+  def get_intent_router_summary(self) -> Dict[str, Any]:
+    turns = sum(r["turns"] for r in self.intent_routes.values())
+    fallback = sum(r["fallback"] for r in self.intent_routes.values())
+    return {
+      "turns": turns,
+      "dispatched": turns - fallback,
+      "fallback_rate_percent": round(fallback / turns * 100, 2) if turns > 0 else 0,
+      "by_intent": {
+        intent: {
+          "turns": r["turns"],
+          "dispatched": r["dispatched"],
+          "fallback": r["fallback"],
+          "avg_confidence": round(r["confidence_sum"] / r["turns"], 3),
+          "fallback_rate_percent": round(r["fallback"] / r["turns"] * 100, 2)
+        }
+        for intent, r in sorted(self.intent_routes.items())
+      }
+    }
+  
+  def get_http_pool_summary(self) -> Dict[str, Any]:
+    reused = self.http_requests - self.http_new_connections
+    return {
+      "requests": self.http_requests,
+      "new_connections": self.http_new_connections,
+      "reused_connections": reused,
+      "reuse_rate_percent": round(reused / self.http_requests * 100, 2) if self.http_requests > 0 else 0,
+      "by_host": self.http_connections_by_host
+    }
   
   def record_error(self, error_type: str):
-    self.failed_operations += 1
-    self.error_counts[error_type] = self.error_counts.get(error_type, 0) + 1
+    with self._lock:
+      self.failed_operations += 1
+      self.error_counts[error_type] = self.error_counts.get(error_type, 0) + 1
   
   def get_summary(self) -> Dict[str, Any]:
+    with self._lock:
+      return self._summary()
+  
+  def _summary(self) -> Dict[str, Any]:
     runtime = (datetime.now() - self.start_time).total_seconds()
 
     avg_agent_durations = {name: sum(durations) / len(durations) for name, durations in self.agent_durations.items()if durations}
@@ -101,6 +285,16 @@ class TheophrastusMetrics:
     total_operations = self.successful_operations + self.failed_operations
     
     success_rate = ((self.successful_operations / total_operations * 100) if total_operations > 0 else 0)
+
+    cache_breakdown = {}
+    for name in sorted(set(self.cache_hits) | set(self.cache_misses)):
+      hits = self.cache_hits.get(name, 0)
+      misses = self.cache_misses.get(name, 0)
+      cache_breakdown[name] = {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate_percent": round(hits / (hits + misses) * 100, 2) if hits + misses > 0 else 0
+      }
     
     return {
         "runtime_seconds": round(runtime, 2),
@@ -115,7 +309,17 @@ class TheophrastusMetrics:
         "tool_call_breakdown": self.tool_call_counts,
         "error_breakdown": self.error_counts,
         "avg_agent_durations_ms": avg_agent_durations,
-        "avg_tool_durations_ms": avg_tool_durations
+        "avg_tool_durations_ms": avg_tool_durations,
+        "cache_breakdown": cache_breakdown,
+        "http_pool": self.get_http_pool_summary(),
+        "single_flight_breakdown": {
+          name: {"upstream_calls": self.single_flight_calls.get(name, 0), "coalesced_waiters": self.coalesced_waiters.get(name, 0)}
+          for name in sorted(set(self.single_flight_calls) | set(self.coalesced_waiters))
+        },
+        "state_compaction": self._state_compaction_summary(),
+        "intent_router": self.get_intent_router_summary(),
+        "model_calls": self.get_model_call_summary(),
+        "cache_warmer": self.get_cache_warmer_summary()
     }
   
   def print_summary(self):
@@ -139,6 +343,35 @@ class TheophrastusMetrics:
       for tool, count in sorted(summary['tool_call_breakdown'].items()):
         print(f"  *{tool}: {count}")
     
+    if summary['cache_breakdown']:
+      print("\n -Caches:")
+      for cache, stats in sorted(summary['cache_breakdown'].items()):
+        print(f"  *{cache}: {stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate_percent']}%)")
+    
+    if summary['http_pool']['requests']:
+      pool = summary['http_pool']
+      print(f"\n -HTTP Pool: {pool['requests']} requests, {pool['reused_connections']} reused, {pool['new_connections']} new connections")
+    
+    if summary['state_compaction']['full_bytes']:
+      compaction = summary['state_compaction']
+      print(f"\n -Snapshot State: {compaction['bytes_saved']} bytes (~{compaction['tokens_saved']} tokens) saved over {len(compaction['by_turn'])} turns")
+    
+    if summary['intent_router']['turns']:
+      router = summary['intent_router']
+      print(f"\n -Intent Router: {router['dispatched']}/{router['turns']} turns dispatched locally ({router['fallback_rate_percent']}% LLM fallback)")
+      for intent, stats in router['by_intent'].items():
+        print(f"  *{intent}: {stats['turns']} turns, avg confidence {stats['avg_confidence']}, {stats['fallback_rate_percent']}% fallback")
+    
+    if summary['model_calls']['calls']:
+      model_calls = summary['model_calls']
+      print(f"\n -Model Calls: {model_calls['calls']} calls, {model_calls['prompt_tokens']} prompt / {model_calls['response_tokens']} response tokens, ~${model_calls['cost_usd']:.4f}")
+      for agent, stats in model_calls['by_agent'].items():
+        print(f"  *{agent}: {stats['calls']} calls, avg {stats['avg_prompt_tokens']} prompt tokens, ttft {stats['avg_ttft_ms']}ms, latency {stats['avg_latency_ms']}ms, ~${stats['cost_usd']:.4f}")
+    
+    if summary['cache_warmer']['cycles']:
+      warmer = summary['cache_warmer']
+      print(f"\n -Cache Warmer: {warmer['warm_set_size']} warm locations, {warmer['requests']} requests over {warmer['cycles']} cycles, {warmer['warm_hits']} hits ({warmer['hit_contribution_percent']}% of snapshot hits)")
+    
     if summary['error_breakdown']:
       print("\n -Errors:")
       for error, count in sorted(summary['error_breakdown'].items()):
@@ -198,6 +431,43 @@ class TheophrastusObservability:
 
       self.logger.info(f"[--VALIDATION--] {checker_name} | {status} |\n")
   
+    def log_cache_access(self, cache_name: str, hit: bool, key: str = ""):
+      self.metrics.record_cache_access(cache_name, hit)
+      status = "HIT" if hit else "MISS"
+      self.logger.debug(f"[--CACHE--] {cache_name} | {status} | {key[:80]} |\n")
+  
+    def log_http_connection(self, host: str, reused: bool):
+      self.metrics.record_http_connection(host, reused)
+      status = "REUSED" if reused else "NEW"
+      self.logger.debug(f"[--HTTP--] {host} | {status} connection |\n")
+  
+    def log_single_flight(self, name: str, coalesced: bool):
+      self.metrics.record_single_flight(name, coalesced)
+      if coalesced:
+        self.logger.debug(f"[--COALESCED--] {name} | joined in-flight call |\n")
+  
+    def log_snapshot_compaction(self, turn_id: str, full_bytes: int, compact_bytes: int):
+      self.metrics.record_snapshot_compaction(turn_id, full_bytes, compact_bytes)
+      self.logger.debug(f"[--STATE--] snapshot compacted {full_bytes} -> {compact_bytes} bytes | turn {turn_id} |\n")
+  
+    def log_intent_route(self, intent: str, confidence: float, dispatched: bool):
+      self.metrics.record_intent_route(intent, confidence, dispatched)
+      route = "DISPATCHED" if dispatched else "LLM FALLBACK"
+      self.logger.info(f"[--ROUTER--] {intent} | confidence {confidence:.2f} | {route} |\n")
+  
+    def log_model_call(self, agent_name: str, session_id: str, model: str, prompt_tokens: int, response_tokens: int, ttft_ms: float, latency_ms: float, cost_usd: Optional[float]):
+      self.metrics.record_model_call(agent_name, session_id, model, prompt_tokens, response_tokens, ttft_ms, latency_ms, cost_usd)
+      cost = f"${cost_usd:.5f}" if cost_usd is not None else "unpriced"
+      self.logger.info(f"[--MODEL--] {agent_name} | {model} | {prompt_tokens} in / {response_tokens} out tokens | ttft {ttft_ms:.0f}ms | {latency_ms:.0f}ms | {cost} |\n")
+  
+    def log_cache_warm(self, warm_set_size: int, requests: int, candidates: int):
+      self.metrics.record_cache_warm(warm_set_size, requests)
+      self.logger.info(f"[--WARMER--] {warm_set_size}/{candidates} locations warm | {requests} requests |\n")
+  
+    def log_warm_hit(self, key: str = ""):
+      self.metrics.record_warm_hit()
+      self.logger.debug(f"[--WARMER--] hit on warmed cell {key} |\n")
+  
     def log_error(self, context: str, error: Exception, details: Optional[str] = None):
       error_type = type(error).__name__
       self.metrics.record_error(error_type)
@@ -0,0 +1,74 @@
+"""
+before_model / after_model callbacks that time every model call and count its tokens and cost.
+"""
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from typing import Dict, Any, Optional
+
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.agents.callback_context import CallbackContext
+
+from weather_advisor_agent.config import TheophrastusConfiguration
+from weather_advisor_agent.utils.local_observability import Theophrastus_Observability
+
+logger = logging.getLogger(__name__)
+
+# (invocation_id, agent) -> call in flight. A call that raises never reaches after_model (ADK 1.18
+# agents have no model error callback), its entry is dropped oldest first past MAX_PENDING
+MAX_PENDING = 1024
+_pending: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_lock = threading.Lock()
+
+def _session_id(callback_context: CallbackContext) -> str:
+  session = getattr(callback_context, "session", None)
+  return getattr(session, "id", None) or "unknown"
+
+def estimate_cost(model: str, prompt_tokens: int, response_tokens: int) -> Optional[float]:
+  """USD for one call, None when the model has no entry in the pricing table"""
+  pricing = TheophrastusConfiguration.model_pricing_usd_per_million.get(model)
+  if pricing is None:
+    return None
+  return (prompt_tokens * pricing["input"] + response_tokens * pricing["output"]) / 1_000_000
+
+def model_metrics_before_model(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+  with _lock:
+    _pending[(callback_context.invocation_id, callback_context.agent_name)] = {
+      "model": getattr(llm_request, "model", None) or "unknown",
+      "start": time.perf_counter(),
+      "first_token": None
+    }
+    while len(_pending) > MAX_PENDING:
+      _pending.popitem(last=False)
+  return None
+
+def model_metrics_after_model(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+  key = (callback_context.invocation_id, callback_context.agent_name)
+  now = time.perf_counter()
+  with _lock:
+    call = _pending.get(key)
+    if call is None:
+      return None
+    if call["first_token"] is None:
+      call["first_token"] = now
+    if getattr(llm_response, "partial", False):
+      return None
+    del _pending[key]
+
+  usage = getattr(llm_response, "usage_metadata", None)
+  prompt_tokens = getattr(usage, "prompt_token_count", None) or 0
+  # Thinking tokens are billed as output
+  response_tokens = (getattr(usage, "candidates_token_count", None) or 0) + (getattr(usage, "thoughts_token_count", None) or 0)
+  Theophrastus_Observability.log_model_call(
+    agent_name=callback_context.agent_name,
+    session_id=_session_id(callback_context),
+    model=call["model"],
+    prompt_tokens=prompt_tokens,
+    response_tokens=response_tokens,
+    ttft_ms=(call["first_token"] - call["start"]) * 1000,
+    latency_ms=(now - call["start"]) * 1000,
+    cost_usd=estimate_cost(call["model"], prompt_tokens, response_tokens)
+  )
+  return None
@@ -0,0 +1,116 @@
+"""
+Rule-based risk classification of the snapshots, thresholds per activity from TheophrastusConfiguration.risk_thresholds.
+"""
+import logging
+
+from typing import Dict, Any, List, Union
+
+import numpy as np
+
+from weather_advisor_agent.config import TheophrastusConfiguration
+from weather_advisor_agent.utils.env_snapshot import snapshot_location_id
+
+logger = logging.getLogger(__name__)
+
+LEVELS = np.array(["low", "moderate", "high"])
+UNKNOWN = "unknown"
+RISKS = ["heat_risk", "cold_risk", "wind_risk", "air_quality_risk"]
+
+def resolve_activity(activity_profile: Any) -> str:
+  """Activity key of the thresholds table from env_activity_profile (dict or plain string)"""
+  if isinstance(activity_profile, dict):
+    activity_profile = activity_profile.get("activity")
+  activity = str(activity_profile or "").strip().lower()
+  return activity if activity in TheophrastusConfiguration.risk_thresholds else "default"
+
+def _thresholds(activity: str) -> Dict[str, List[float]]:
+  table = TheophrastusConfiguration.risk_thresholds
+  return {**table["default"], **table.get(activity, {})}
+
+def _column(snapshots: List[Dict[str, Any]], *path: str) -> np.ndarray:
+  values = []
+  for snapshot in snapshots:
+    value: Any = snapshot
+    for key in path:
+      value = value.get(key) if isinstance(value, dict) else None
+    values.append(value if isinstance(value, (int, float)) else np.nan)
+  return np.asarray(values, dtype=float)
+
+def _worst(snapshots: List[Dict[str, Any]], pollutant: str) -> np.ndarray:
+  """Worst of the current value and the next 6 hours"""
+  return np.fmax(_column(snapshots, "air_quality", pollutant, "current"), _column(snapshots, "air_quality", pollutant, "next_6h", "max"))
+
+def _classify(values: np.ndarray, bounds: List[float], descending: bool = False) -> np.ndarray:
+  """0 low, 1 moderate, 2 high, -1 when there is no value. Bounds are [moderate, high],
+  descending bounds (cold) trigger at or below the value"""
+  levels = np.digitize(-values, [-b for b in bounds]) if descending else np.digitize(values, bounds)
+  return np.where(np.isnan(values), -1, levels)
+
+def _labels(levels: np.ndarray) -> List[str]:
+  return np.where(levels < 0, UNKNOWN, LEVELS[np.clip(levels, 0, 2)]).tolist()
+
+def _fmt(value: float, unit: str, digits: int = 0) -> str:
+  return "n/a" if np.isnan(value) else f"{value:.{digits}f}{unit}"
+
+def classify_snapshots(snapshots: List[Dict[str, Any]], activity: str = "default") -> List[Dict[str, Any]]:
+  """Risk levels for every snapshot in one pass"""
+  thresholds = _thresholds(activity)
+
+  temperature = _column(snapshots, "current", "temperature_c")
+  feels_like = np.where(np.isnan(_column(snapshots, "current", "apparent_temperature_c")), temperature, _column(snapshots, "current", "apparent_temperature_c"))
+  wind = _column(snapshots, "current", "wind_speed_10m_ms")
+  pm2_5 = _worst(snapshots, "pm2_5")
+  pm10 = _worst(snapshots, "pm10")
+
+  levels = {
+    "heat_risk": _classify(feels_like, thresholds["heat_c"]),
+    "cold_risk": _classify(feels_like, thresholds["cold_c"], descending=True),
+    "wind_risk": _classify(wind, thresholds["wind_ms"]),
+    "air_quality_risk": np.maximum(_classify(pm2_5, thresholds["pm2_5"]), _classify(pm10, thresholds["pm10"]))
+  }
+  overall = np.max(np.stack(list(levels.values())), axis=0)
+  labels = {risk: _labels(values) for risk, values in levels.items()}
+  overall_labels = _labels(overall)
+
+  reports = []
+  for i, snapshot in enumerate(snapshots):
+    report = {risk: labels[risk][i] for risk in RISKS}
+    report["overall_risk"] = overall_labels[i]
+    drivers = [risk.replace("_risk", "").replace("_", " ") for risk in RISKS if report[risk] == report["overall_risk"] and report[risk] in ("moderate", "high")]
+    report["rationale"] = (
+      f"Feels like {_fmt(feels_like[i], '°C')}, wind {_fmt(wind[i], ' m/s')}, "
+      f"PM2.5 up to {_fmt(pm2_5[i], ' µg/m³', 1)} and PM10 up to {_fmt(pm10[i], ' µg/m³', 1)} in the next 6h "
+      f"({activity} thresholds). "
+      + (f"Overall risk is {report['overall_risk']}, driven by {', '.join(drivers)}." if drivers else f"Overall risk is {report['overall_risk']}.")
+    )
+    if snapshot.get("stale"):
+      report["rationale"] += f" Data is {snapshot.get('age_seconds', 0) // 60} min old."
+    name = (snapshot.get("location") or {}).get("name")
+    if name:
+      report["location"] = name
+    report["location_id"] = snapshot_location_id(snapshot)
+    reports.append(report)
+  return reports
+
+def build_risk_report(snapshot: Union[Dict[str, Any], List[Dict[str, Any]], None], activity: str = "default") -> Dict[str, Any]:
+  """env_risk_report for one snapshot (flat) or several (overall plus a "locations" list)"""
+  snapshots = snapshot if isinstance(snapshot, list) else [snapshot] if isinstance(snapshot, dict) else []
+  snapshots = [s for s in snapshots if isinstance(s, dict)]
+  if not snapshots:
+    return {**{risk: UNKNOWN for risk in RISKS}, "overall_risk": UNKNOWN, "rationale": "No environmental snapshot available.", "activity": activity, "source": "risk_engine"}
+
+  reports = classify_snapshots(snapshots, activity)
+  if len(reports) == 1:
+    return {**reports[0], "activity": activity, "source": "risk_engine"}
+
+  order = {UNKNOWN: -1, "low": 0, "moderate": 1, "high": 2}
+  overall = max((r["overall_risk"] for r in reports), key=order.__getitem__)
+  worst = [r.get("location", f"location {i + 1}") for i, r in enumerate(reports) if r["overall_risk"] == overall]
+  return {
+    **{risk: max((r[risk] for r in reports), key=order.__getitem__) for risk in RISKS},
+    "overall_risk": overall,
+    "rationale": f"Worst overall risk across {len(reports)} locations is {overall} ({', '.join(worst)}).",
+    "activity": activity,
+    "source": "risk_engine",
+    "locations": reports
+  }
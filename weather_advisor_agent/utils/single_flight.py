@@ -0,0 +1,95 @@
+"""
+Single-flight helper: concurrent identical calls (threads or asyncio) share one upstream call and its result.
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from weather_advisor_agent.utils.local_observability import Theophrastus_Observability
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+@dataclass
+class AsyncFlight:
+  task: asyncio.Task
+  waiters: int = 0
+
+
+class SingleFlight:
+  """Coalesces concurrent identical calls into one."""
+  def __init__(self, name: str):
+    self.name = name
+    self._lock = threading.Lock()
+    self._calls: Dict[Hashable, Future] = {}
+    self._async_calls: Dict[Tuple[int, Hashable], AsyncFlight] = {}
+
+  def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+    """Run fn once for all concurrent callers with the same key (threaded callers)"""
+    with self._lock:
+      future = self._calls.get(key)
+      leader = future is None
+      if leader:
+        future = Future()
+        self._calls[key] = future
+
+    Theophrastus_Observability.log_single_flight(self.name, coalesced=not leader)
+    if not leader:
+      logger.debug(f"Coalesced {self.name} call for {key}.")
+      return future.result()
+
+    try:
+      result = fn()
+      future.set_result(result)
+      return result
+    except BaseException as e:
+      future.set_exception(e)
+      raise
+    finally:
+      with self._lock:
+        self._calls.pop(key, None)
+
+  async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+    """Await fn once for all concurrent callers with the same key on this event loop.
+    The shared call is only cancelled when every waiter has been cancelled."""
+    loop = asyncio.get_running_loop()
+    flight_key = (id(loop), key)
+
+    with self._lock:
+      flight = self._async_calls.get(flight_key)
+      leader = flight is None
+      if leader:
+        flight = AsyncFlight(task=loop.create_task(fn()))
+        self._async_calls[flight_key] = flight
+        flight.task.add_done_callback(lambda _: self._forget(flight_key, flight))
+      flight.waiters += 1
+
+    Theophrastus_Observability.log_single_flight(self.name, coalesced=not leader)
+    if not leader:
+      logger.debug(f"Coalesced {self.name} call for {key}.")
+
+    try:
+      return await asyncio.shield(flight.task)
+    except asyncio.CancelledError:
+      with self._lock:
+        flight.waiters -= 1
+        abandoned = flight.waiters == 0
+      if abandoned and not flight.task.done():
+        flight.task.cancel()
+      raise
+
+  def _forget(self, flight_key: Tuple[int, Hashable], flight: AsyncFlight) -> None:
+    with self._lock:
+      if self._async_calls.get(flight_key) is flight:
+        del self._async_calls[flight_key]
+    if not flight.task.cancelled():
+      flight.task.exception()
+
+  def in_flight(self) -> int:
+    with self._lock:
+      return len(self._calls) + len(self._async_calls)
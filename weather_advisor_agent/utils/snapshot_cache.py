@@ -0,0 +1,193 @@
+"""
+In-memory forecast snapshot cache keyed by grid cell, entries expire at the next upstream model refresh.
+Memory capped with LRU eviction, slightly expired entries can be served stale while one background refresh runs.
+"""
+import json
+import math
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from typing import Dict, Any, Optional
+
+from weather_advisor_agent.config import TheophrastusConfiguration
+from weather_advisor_agent.utils.local_observability import Theophrastus_Observability
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_KEYS = 4096
+
+@dataclass
+class SnapshotCacheEntry:
+  snapshot: Dict[str, Any]
+  size_bytes: int
+  fetched_at: float
+  expires_at: float
+  warmed: bool = False
+
+  @property
+  def age_seconds(self) -> float:
+    return time.time() - self.fetched_at
+
+
+class TheophrastusSnapshotCache:
+  """Grid-quantized LRU cache for environmental snapshots."""
+  def __init__(self, grid_degrees: float, max_bytes: int, update_interval_minutes: int, update_offset_minutes: int):
+    self.grid_degrees = grid_degrees
+    self.max_bytes = max_bytes
+    self.update_interval_seconds = update_interval_minutes * 60
+    self.update_offset_seconds = update_offset_minutes * 60
+    self._lock = threading.Lock()
+    self._entries: "OrderedDict[str, SnapshotCacheEntry]" = OrderedDict()
+    self._key_stats: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+    self._bytes = 0
+    self._refreshing: set = set()
+
+  def _snap(self, value: float) -> float:
+    return round(round(value / self.grid_degrees) * self.grid_degrees, 6)
+
+  def grid_key(self, latitude: float, longitude: float) -> str:
+    """Key of the grid cell containing the coordinates"""
+    return f"{self._snap(latitude):.4f},{self._snap(longitude):.4f}"
+
+  def next_model_refresh(self, now: Optional[float] = None) -> float:
+    """Epoch seconds of the next upstream model update after `now`"""
+    now = time.time() if now is None else now
+    interval = self.update_interval_seconds
+    cycles = math.floor((now - self.update_offset_seconds) / interval) + 1
+    return cycles * interval + self.update_offset_seconds
+
+  def _track(self, key: str, hit: bool) -> None:
+    stats = self._key_stats.pop(key, None) or {"hits": 0, "misses": 0}
+    stats["hits" if hit else "misses"] += 1
+    self._key_stats[key] = stats
+    while len(self._key_stats) > MAX_TRACKED_KEYS:
+      self._key_stats.popitem(last=False)
+
+  def _remove(self, key: str) -> None:
+    entry = self._entries.pop(key, None)
+    if entry is not None:
+      self._bytes -= entry.size_bytes
+
+  @staticmethod
+  def _for_location(snapshot: Dict[str, Any], latitude: float, longitude: float) -> Dict[str, Any]:
+    """Cached data belongs to the grid cell, the location (and any label on it) is always the caller's"""
+    return dict(snapshot, location={"latitude": latitude, "longitude": longitude}, age_seconds=0, stale=False)
+
+  def get(self, latitude: float, longitude: float, stale_window_seconds: float = 0) -> Optional[Dict[str, Any]]:
+    """Cached snapshot for the grid cell marked with `age_seconds` and `stale`.
+    None on a miss or once the entry is older than its model refresh plus the stale window."""
+    key = self.grid_key(latitude, longitude)
+    now = time.time()
+
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is not None and now >= entry.expires_at + stale_window_seconds:
+        self._remove(key)
+        entry = None
+      if entry is not None:
+        self._entries.move_to_end(key)
+      self._track(key, hit=entry is not None)
+
+    Theophrastus_Observability.log_cache_access("snapshot", hit=entry is not None, key=key)
+    if entry is None:
+      return None
+    if entry.warmed:
+      Theophrastus_Observability.log_warm_hit(key)
+
+    logger.debug(f"Snapshot cache hit for cell {key} (age {entry.age_seconds:.0f}s).")
+    snapshot = self._for_location(entry.snapshot, latitude, longitude)
+    snapshot["age_seconds"] = round(now - entry.fetched_at)
+    snapshot["stale"] = now >= entry.expires_at
+    return snapshot
+
+  def contains(self, latitude: float, longitude: float) -> bool:
+    """True when the cell holds an unexpired entry, without touching LRU order or hit stats"""
+    with self._lock:
+      entry = self._entries.get(self.grid_key(latitude, longitude))
+      return entry is not None and time.time() < entry.expires_at
+
+  def mark_warm(self, latitude: float, longitude: float) -> None:
+    """Flags the cell as filled by the cache warmer, its hits are reported as warm hits"""
+    with self._lock:
+      entry = self._entries.get(self.grid_key(latitude, longitude))
+      if entry is not None:
+        entry.warmed = True
+
+  def begin_refresh(self, latitude: float, longitude: float) -> bool:
+    """Claims the background refresh of a cell, False if one is already in flight"""
+    key = self.grid_key(latitude, longitude)
+    with self._lock:
+      if key in self._refreshing:
+        return False
+      self._refreshing.add(key)
+      return True
+
+  def end_refresh(self, latitude: float, longitude: float) -> None:
+    with self._lock:
+      self._refreshing.discard(self.grid_key(latitude, longitude))
+
+  def set(self, latitude: float, longitude: float, snapshot: Dict[str, Any]) -> None:
+    """Store a freshly fetched snapshot until the next model refresh"""
+    key = self.grid_key(latitude, longitude)
+    now = time.time()
+    snapshot = self._for_location(snapshot, latitude, longitude)
+    size_bytes = len(json.dumps(snapshot, default=str))
+
+    if size_bytes > self.max_bytes:
+      logger.warning(f"Snapshot for cell {key} is larger than the cache ({size_bytes} bytes), not cached.")
+      return
+
+    with self._lock:
+      self._remove(key)
+      self._entries[key] = SnapshotCacheEntry(
+        snapshot=snapshot,
+        size_bytes=size_bytes,
+        fetched_at=now,
+        expires_at=self.next_model_refresh(now)
+      )
+      self._bytes += size_bytes
+      while self._bytes > self.max_bytes and self._entries:
+        evicted, _ = next(iter(self._entries.items()))
+        self._remove(evicted)
+        logger.debug(f"Evicted snapshot cell {evicted}.")
+
+  def clear(self) -> None:
+    with self._lock:
+      self._entries.clear()
+      self._key_stats.clear()
+      self._bytes = 0
+
+  def get_key_stats(self) -> Dict[str, Dict[str, Any]]:
+    """Per-cell hits, misses, age and time left until expiry"""
+    now = time.time()
+    with self._lock:
+      stats = {}
+      for key, counters in self._key_stats.items():
+        entry = self._entries.get(key)
+        stats[key] = dict(counters)
+        stats[key]["cached"] = entry is not None
+        if entry is not None:
+          stats[key]["age_seconds"] = round(now - entry.fetched_at, 1)
+          stats[key]["expires_in_seconds"] = round(entry.expires_at - now, 1)
+      return stats
+
+  def get_stats(self) -> Dict[str, Any]:
+    with self._lock:
+      return {
+        "entries": len(self._entries),
+        "refreshing": len(self._refreshing),
+        "bytes": self._bytes,
+        "max_bytes": self.max_bytes,
+        "grid_degrees": self.grid_degrees
+      }
+
+
+Theophrastus_SnapshotCache = TheophrastusSnapshotCache(
+  grid_degrees=TheophrastusConfiguration.snapshot_cache_grid_degrees,
+  max_bytes=TheophrastusConfiguration.snapshot_cache_max_bytes,
+  update_interval_minutes=TheophrastusConfiguration.forecast_model_update_interval_minutes,
+  update_offset_minutes=TheophrastusConfiguration.forecast_model_update_offset_minutes
+)
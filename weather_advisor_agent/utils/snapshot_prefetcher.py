@@ -0,0 +1,119 @@
+"""
+Background prefetch of the snapshots of validated location options, capped per search.
+Pending prefetches from an earlier turn are cancelled by `prefetch_after_turn_callback`.
+"""
+import asyncio
+import logging
+
+from typing import Dict, Any, List, Set, Tuple, Callable, Awaitable, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+
+from weather_advisor_agent.config import TheophrastusConfiguration
+from weather_advisor_agent.utils.snapshot_cache import Theophrastus_SnapshotCache
+
+logger = logging.getLogger(__name__)
+
+
+class TheophrastusSnapshotPrefetcher:
+  """Per-session speculative snapshot prefetch with a cap and cancellation."""
+  def __init__(self, max_per_session: int, max_concurrency: int):
+    self.max_per_session = max_per_session
+    self.max_concurrency = max_concurrency
+    self._tasks: Dict[str, Set[asyncio.Task]] = {}
+    self._cells: Dict[str, Set[str]] = {}
+    # session -> invocation that scheduled its pending prefetches
+    self._owners: Dict[str, str] = {}
+    self._stats = {"scheduled": 0, "fetched": 0, "already_cached": 0, "failed": 0, "cancelled": 0, "capped": 0}
+
+  def schedule(self, session_id: str, invocation_id: str, locations: List[Tuple[float, float]], fetch: Callable[[float, float], Awaitable[bool]]) -> int:
+    """Starts background fetches for the locations, returns how many were scheduled.
+    `fetch` returns False when the cell was already cached. Needs a running event loop"""
+    if self._owners.get(session_id, invocation_id) != invocation_id:
+      # A new search supersedes the previous one's leftovers and budget
+      self.cancel_session(session_id)
+    self._owners[session_id] = invocation_id
+    cells = self._cells.setdefault(session_id, set())
+    tasks = self._tasks.setdefault(session_id, set())
+    semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+    loop = asyncio.get_running_loop()
+
+    scheduled = 0
+    for latitude, longitude in locations:
+      cell = Theophrastus_SnapshotCache.grid_key(latitude, longitude)
+      if cell in cells:
+        continue
+      if len(cells) >= self.max_per_session:
+        self._stats["capped"] += 1
+        continue
+      cells.add(cell)
+      task = loop.create_task(self._prefetch(latitude, longitude, fetch, semaphore))
+      tasks.add(task)
+      task.add_done_callback(lambda done, session_id=session_id: self._task_done(session_id, done))
+      scheduled += 1
+
+    self._stats["scheduled"] += scheduled
+    if scheduled:
+      logger.info(f"Prefetching {scheduled} snapshot(s) for session {session_id} ({len(cells)}/{self.max_per_session} used).")
+    else:
+      self._task_done(session_id, None)
+    return scheduled
+
+  def _task_done(self, session_id: str, task: Optional[asyncio.Task]) -> None:
+    """Forgets the session once nothing is pending, the snapshots live on in the snapshot cache"""
+    tasks = self._tasks.get(session_id)
+    if tasks is None:
+      return
+    tasks.discard(task)
+    if not tasks:
+      self._forget(session_id)
+
+  def _forget(self, session_id: str) -> Set[asyncio.Task]:
+    self._cells.pop(session_id, None)
+    self._owners.pop(session_id, None)
+    return self._tasks.pop(session_id, set())
+
+  async def _prefetch(self, latitude: float, longitude: float, fetch: Callable[[float, float], Awaitable[bool]], semaphore: asyncio.Semaphore) -> None:
+    async with semaphore:
+      try:
+        fetched = await fetch(latitude, longitude)
+        self._stats["fetched" if fetched else "already_cached"] += 1
+      except asyncio.CancelledError:
+        raise
+      except Exception as e:
+        self._stats["failed"] += 1
+        logger.warning(f"Prefetch failed for ({latitude}, {longitude}): {e}")
+
+  def cancel_session(self, session_id: str) -> int:
+    """Cancels the session's pending prefetches and forgets its budget, returns how many were cancelled"""
+    tasks = [task for task in self._forget(session_id) if not task.done()]
+    for task in tasks:
+      task.cancel()
+    self._stats["cancelled"] += len(tasks)
+    if tasks:
+      logger.info(f"Cancelled {len(tasks)} pending prefetch(es) for session {session_id}.")
+    return len(tasks)
+
+  def end_turn(self, session_id: str, invocation_id: str) -> int:
+    """Called when an invocation ends. Prefetches scheduled by this turn are for the next one and
+    keep running, anything left over from an earlier turn is no longer useful and is cancelled"""
+    if self._owners.get(session_id) == invocation_id:
+      return 0
+    return self.cancel_session(session_id)
+
+  def pending(self, session_id: str) -> int:
+    return sum(1 for task in self._tasks.get(session_id, ()) if not task.done())
+
+  def get_stats(self) -> Dict[str, Any]:
+    return dict(self._stats, sessions=len(self._cells), pending=sum(self.pending(s) for s in self._tasks))
+
+
+Theophrastus_SnapshotPrefetcher = TheophrastusSnapshotPrefetcher(
+  max_per_session=TheophrastusConfiguration.snapshot_prefetch_max_per_session,
+  max_concurrency=TheophrastusConfiguration.parallel_fetch_max_concurrency
+)
+
+def prefetch_after_turn_callback(callback_context: CallbackContext):
+  """after_agent_callback of the root agent: ends the turn for the session's prefetches"""
+  Theophrastus_SnapshotPrefetcher.end_turn(callback_context.session.id, callback_context.invocation_id)
+  return None
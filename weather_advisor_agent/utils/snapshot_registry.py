@@ -0,0 +1,52 @@
+"""
+Per-invocation registry of the snapshots fetched by the tools, so several sessions can share the process.
+"""
+import logging
+import threading
+from collections import OrderedDict
+
+from typing import Dict, Any, List, Tuple
+
+from weather_advisor_agent.config import TheophrastusConfiguration
+
+logger = logging.getLogger(__name__)
+
+class TheophrastusSnapshotRegistry:
+  """Per-invocation store of the snapshots fetched by the tools."""
+  def __init__(self, max_invocations: int):
+    self.max_invocations = max_invocations
+    self._lock = threading.Lock()
+    self._snapshots: "OrderedDict[str, OrderedDict[Tuple[float, float], Dict[str, Any]]]" = OrderedDict()
+
+  @staticmethod
+  def _location_key(snapshot: Dict[str, Any]) -> Tuple[float, float]:
+    location = snapshot.get("location") or {}
+    return (round(float(location.get("latitude", 0.0)), 4), round(float(location.get("longitude", 0.0)), 4))
+
+  def add(self, invocation_id: str, snapshot: Dict[str, Any]) -> None:
+    """Register a snapshot for the invocation, a refetch of the same location replaces the old one"""
+    with self._lock:
+      snapshots = self._snapshots.setdefault(invocation_id, OrderedDict())
+      snapshots[self._location_key(snapshot)] = snapshot
+      self._snapshots.move_to_end(invocation_id)
+      while len(self._snapshots) > self.max_invocations:
+        dropped, _ = self._snapshots.popitem(last=False)
+        logger.warning(f"Dropped unclaimed snapshots of invocation {dropped}.")
+
+  def peek(self, invocation_id: str) -> List[Dict[str, Any]]:
+    with self._lock:
+      return list(self._snapshots.get(invocation_id, {}).values())
+
+  def pop(self, invocation_id: str) -> List[Dict[str, Any]]:
+    """Take every snapshot registered for the invocation"""
+    with self._lock:
+      return list(self._snapshots.pop(invocation_id, {}).values())
+
+  def pending_invocations(self) -> int:
+    with self._lock:
+      return len(self._snapshots)
+
+
+Theophrastus_SnapshotRegistry = TheophrastusSnapshotRegistry(
+  max_invocations=TheophrastusConfiguration.snapshot_registry_max_invocations
+)
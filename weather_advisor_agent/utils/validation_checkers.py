@@ -1,7 +1,7 @@
 import json
 import logging
 
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Dict, Any, List, Optional
 
 from google.genai.types import Content,Part
 from google.adk.agents import BaseAgent, Agent
@@ -14,6 +14,25 @@ from weather_advisor_agent.utils import Theophrastus_Observability
 
 logger = logging.getLogger(__name__)
 
+def failure_record(invocation_id: str, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+  """State value with the items a checker rejected, scoped to the invocation, for the next loop iteration"""
+  return {"invocation_id": invocation_id, "items": items}
+
+def failed_items(state: Dict[str, Any], key: str, invocation_id: str) -> List[Dict[str, Any]]:
+  """Items the checker rejected earlier in this invocation, empty on the first iteration or a new turn"""
+  failures = state.get(key)
+  if not isinstance(failures, dict) or failures.get("invocation_id") != invocation_id:
+    return []
+  return [item for item in failures.get("items") or [] if isinstance(item, dict)]
+
+def _coordinates(item: Any) -> Optional[tuple]:
+  if not isinstance(item, dict):
+    return None
+  lat, lon = item.get("latitude"), item.get("longitude")
+  if isinstance(lat, (int, float)) and isinstance(lon, (int, float)) and -90 <= lat <= 90 and -180 <= lon <= 180:
+    return float(lat), float(lon)
+  return None
+
 class EnvSnapshotValidationChecker(BaseAgent):
   """Validates environmental snapshot data stored in session state."""
   async def _run_async_impl(self, context: InvocationContext) -> AsyncGenerator[Event, None]:
@@ -50,6 +69,19 @@ class EnvSnapshotValidationChecker(BaseAgent):
     
     is_valid = False
     validation_details = ""
+    failures: Dict[tuple, Dict[str, Any]] = {}
+    
+    # Locations whose fetch failed or came back without data, the next iteration refetches only these
+    snapshots = snapshot if isinstance(snapshot, list) else [snapshot] if isinstance(snapshot, dict) else []
+    for snap in snapshots:
+      location = (snap.get("location") if isinstance(snap, dict) else None) or {}
+      coordinates = _coordinates(location)
+      if coordinates and not is_valid_snapshot(snap):
+        failures[coordinates] = {"name": location.get("name"), "latitude": coordinates[0], "longitude": coordinates[1], "reason": "no_current_data"}
+    for error in context.session.state.get("env_snapshot_errors") or []:
+      coordinates = _coordinates(error)
+      if coordinates:
+        failures[coordinates] = {"name": error.get("name"), "latitude": coordinates[0], "longitude": coordinates[1], "reason": error.get("error") or "fetch_failed"}
     
     if isinstance(snapshot, dict):
       is_valid = is_valid_snapshot(snapshot)
@@ -69,10 +101,17 @@ class EnvSnapshotValidationChecker(BaseAgent):
     else:
       logger.error(f"Unexpected snapshot type: {type(snapshot).__name__}.")
     
+    if failures:
+      validation_details = f"{len(failures)} location(s) to refetch: {[f['name'] for f in failures.values()]}"
+      logger.info(validation_details)
+    
     Theophrastus_Observability.log_validation("EnvSnapshotValidationChecker", passed=is_valid, details=validation_details)
     Theophrastus_Observability.log_agent_complete("EnvSnapshotValidationChecker", "env_snapshot", success=is_valid)
     
-    yield Event(author=self.name, actions=EventActions(escalate=is_valid))
+    yield Event(author=self.name, actions=EventActions(
+      escalate=is_valid and not failures,
+      state_delta={"env_snapshot_failures": failure_record(context.invocation_id, list(failures.values()))}
+    ))
 
 
 class EnvRiskValidationChecker(BaseAgent):
@@ -144,6 +183,7 @@ class EnvLocationGeoValidationChecker(BaseAgent):
       locations = []
     
     cleaned = []
+    failures = []
     seen_coords = set()
     invalid_count = 0
     
@@ -160,6 +200,8 @@ class EnvLocationGeoValidationChecker(BaseAgent):
       if lat is None or lon is None:
         logger.debug(f"Skipping location without coordinates: {name}")
         invalid_count += 1
+        if name:
+          failures.append({"name": name, "region_hint": loc.get("region_hint") or loc.get("admin1"), "activity": loc.get("activity"), "reason": "no_coordinates"})
         continue
       
       try:
@@ -169,10 +211,14 @@ class EnvLocationGeoValidationChecker(BaseAgent):
         if not (-90 <= lat_f <= 90) or not (-180 <= lon_f <= 180):
           logger.warning(f"Invalid coordinates for {name}: lat={lat_f}, lon={lon_f}")
           invalid_count += 1
+          if name:
+            failures.append({"name": name, "region_hint": loc.get("region_hint") or loc.get("admin1"), "activity": loc.get("activity"), "reason": "invalid_coordinates"})
           continue    
       except (TypeError, ValueError) as e:
         logger.warning(f"Could not parse coordinates for {name}: {e}")
         invalid_count += 1
+        if name:
+          failures.append({"name": name, "region_hint": loc.get("region_hint") or loc.get("admin1"), "activity": loc.get("activity"), "reason": "invalid_coordinates"})
         continue
 
       key = (round(lat_f, 4), round(lon_f, 4))
@@ -194,16 +240,20 @@ class EnvLocationGeoValidationChecker(BaseAgent):
         "source": loc.get("source", "atlas+geocode")
       })
     
-    state["env_location_options"] = cleaned
+    # Only the locations that failed to geocode are retried, discovery does not run again
+    state_delta = {
+      "env_location_options": cleaned,
+      "env_location_failures": failure_record(context.invocation_id, failures)
+    }
     
-    validation_details = (f"Cleaned location list: {len(cleaned)} valid, {invalid_count} invalid/duplicate")
+    validation_details = (f"Cleaned location list: {len(cleaned)} valid, {invalid_count} invalid/duplicate, {len(failures)} to geocode again")
     
     passed = len(cleaned) > 0
 
     Theophrastus_Observability.log_validation("EnvLocationGeoValidationChecker", passed=passed, details=validation_details)
     Theophrastus_Observability.log_agent_complete("EnvLocationGeoValidationChecker", "env_location_options", success=passed)
 
-    yield Event(author=self.name, actions=EventActions(escalate=passed))
+    yield Event(author=self.name, actions=EventActions(escalate=passed and not failures, state_delta=state_delta))
 
 #Deprecated functionality, keeping for documentation and test purposes.
 #Prevented Aurora malfunction, current configuration allows it to work.